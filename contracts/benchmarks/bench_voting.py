@@ -0,0 +1,131 @@
+"""
+Stamp-cost and wall-clock benchmarks for the exported voting functions
+
+Sweeps the number of voters on a single proposal and, for each tally configuration,
+measures one call each of vote, get_vote_count, update_current_tallies and
+finalize_proposal with metering enabled, along with the storage reads and writes of each call
+by key prefix. Results are written as JSON so runs can be compared before a change ships.
+Proposals are restored from the large fixtures in contracts/tests/fixtures.py, so each voter
+count and configuration is only generated through contract calls on the first run.
+
+Usage:
+    python contracts/benchmarks/bench_voting.py --voters 10 100 1000 10000
+"""
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+from contracting.client import ContractingClient
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests')))
+
+import fixtures  # noqa: E402
+import harness  # noqa: E402
+from storage_meter import StorageMeter  # noqa: E402
+
+DEFAULT_VOTER_COUNTS = [10, 100, 1000, 10000]
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "bench_voting.json")
+STAMPS = 10_000_000
+CALLER = "bench_caller"
+
+# Settings of the benchmark proposal. Revalidate configs also have the currency report balance changes
+CONFIGS = {
+    "recount": {},
+    "recount_auto": {"auto_update_tallies": 1},
+    "recount_batched": {"max_tally_batch": 1000},
+    "incremental": {"tally_mode": "incremental"},
+    "revalidate": {"tally_mode": "revalidate"},
+    "snapshot": {"vote_weighting": "snapshot"},
+}
+
+
+def measure(meter, contract, function, signer, environment=None, **kwargs):
+    """Call an exported function with metering on and return stamps used, wall time and storage I/O"""
+    start = time.perf_counter()
+    output = meter.call(
+        contract,
+        function,
+        signer=signer,
+        environment=environment or {},
+        stamps=STAMPS,
+        metering=True,
+        return_full_output=True,
+        **kwargs
+    )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "function": function,
+        "stamps_used": output["stamps_used"],
+        "wall_time_ms": round(elapsed * 1000, 3),
+        "storage": meter.totals(function),
+        "storage_by_prefix": meter.counts(function),
+    }
+
+
+def run_case(config_name, voter_count):
+    """Restore a proposal with voter_count votes and measure each exported function"""
+    fixture, proposal_id = fixtures.large_proposal_fixture(voter_count, CONFIGS[config_name])
+
+    client = ContractingClient()
+    fixture.restore(client)
+    currency = client.get_contract("currency")
+    voting = client.get_contract(harness.VOTING_CONTRACT_NAME)
+    currency.transfer(amount=10_000, to=CALLER, signer=harness.OWNER)
+
+    meter = StorageMeter(client)
+    measurements = [
+        measure(meter, voting, "vote", CALLER, proposal_id=proposal_id, choice="y"),
+        measure(meter, voting, "get_vote_count", CALLER, proposal_id=proposal_id),
+        measure(meter, voting, "update_current_tallies", CALLER, proposal_id=proposal_id),
+        measure(meter, voting, "finalize_proposal", CALLER, fixtures.large_proposal_expired_environment(),
+                proposal_id=proposal_id),
+    ]
+    meter.detach()
+
+    client.flush()
+
+    for measurement in measurements:
+        measurement["config"] = config_name
+        measurement["voters"] = voter_count
+
+    return measurements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--voters", type=int, nargs="+", default=DEFAULT_VOTER_COUNTS,
+                        help="voter counts to sweep")
+    parser.add_argument("--configs", nargs="+", choices=sorted(CONFIGS), default=list(CONFIGS),
+                        help="tally configurations to benchmark")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="path of the JSON report")
+    args = parser.parse_args()
+
+    results = []
+    for config_name in args.configs:
+        for voter_count in args.voters:
+            for measurement in run_case(config_name, voter_count):
+                results.append(measurement)
+                print(f"{config_name:>13} {voter_count:>6} voters  {measurement['function']:<24}"
+                      f"{measurement['stamps_used']:>12} stamps  {measurement['wall_time_ms']:>10} ms"
+                      f"{measurement['storage']['reads']:>8} reads{measurement['storage']['writes']:>8} writes")
+
+    report = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "voter_counts": args.voters,
+        "configs": args.configs,
+        "results": results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Deterministic load generator for voting scenarios
+
+Drives create_proposal, vote, vote changes and currency transfers through ContractingClient
+in a configurable mix, then finalizes every proposal. Operations are drawn from a seeded
+random generator and run against a simulated clock, so the same arguments always produce the
+same operations and the same final state.
+
+Writes to the output directory:
+    report.json   latency and stamp histograms per operation type
+    state.jsonl   the final contract state as {"key", "value"} entries, without contract code
+    events.jsonl  every event emitted, in order
+
+The state dump and event log can be fed to `python -m indexer verify`, and the state dump
+can be restored in tests with fixtures.StateFixture.load_dump(path, fixtures.base_fixture()).
+
+Usage:
+    python contracts/benchmarks/loadgen.py --seed 1 --voters 20000 --operations 50000 \\
+        --mix create_proposal=1 vote=12 change_vote=3 transfer=4
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import time
+
+from contracting.client import ContractingClient
+from contracting.stdlib.bridge.time import Datetime
+from contracting.storage.encoder import encode
+
+from bench_voting import CONFIGS
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'tests')))
+
+import fixtures  # noqa: E402
+import harness  # noqa: E402
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "results", "loadgen")
+DEFAULT_MIX = {"create_proposal": 1, "vote": 12, "change_vote": 3, "transfer": 4}
+OPERATIONS = ["create_proposal", "vote", "change_vote", "transfer"]
+STAMPS = 10_000_000
+CHOICES = ["y", "n", "-"]
+CLOCK_START = datetime.datetime(2030, 1, 1)
+PROPOSAL_DURATION = datetime.timedelta(days=30)
+VOTER_SHARE = 0.9  # Share of the owner's remaining balance spread across voters
+
+
+def parse_mix(entries):
+    """Parse ["vote=12", "transfer=4"] into a weight per operation"""
+    mix = {}
+    for entry in entries:
+        name, _, weight = entry.partition("=")
+        assert name in OPERATIONS, f"Unknown operation {name}, expected one of {OPERATIONS}"
+        mix[name] = float(weight)
+    return mix
+
+
+def environment_at(moment):
+    return {"now": Datetime(moment.year, moment.month, moment.day, moment.hour, moment.minute, moment.second)}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def histogram(values):
+    """Bucket values by powers of two, keyed by each bucket's upper bound"""
+    buckets = {}
+    for value in values:
+        bound = 1
+        while bound < value:
+            bound *= 2
+        buckets[bound] = buckets.get(bound, 0) + 1
+    return {f"<={bound}": buckets[bound] for bound in sorted(buckets)}
+
+
+def summarize(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        "min": ordered[0],
+        "p50": percentile(ordered, 0.5),
+        "p90": percentile(ordered, 0.9),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "histogram": histogram(ordered),
+    }
+
+
+class LoadGenerator:
+    def __init__(self, seed, voter_count, creator_count, proposal_count, config):
+        self.rng = random.Random(seed)
+        self.clock = CLOCK_START
+        self.client = ContractingClient()
+        fixtures.base_fixture().restore(self.client)
+        self.currency = self.client.get_contract("currency")
+        self.voting = self.client.get_contract(harness.VOTING_CONTRACT_NAME)
+
+        self.samples = {}
+        self.failures = {}
+        self.events = []
+
+        if CONFIGS[config].get("tally_mode") == "revalidate":
+            harness.enable_balance_listener(self.currency)
+        for setting_name, value in CONFIGS[config].items():
+            self.voting.update_settings(setting_name=setting_name, value=value, signer=harness.OWNER)
+        self.proposal_fee = self.voting.get_settings()["proposal_fee"]
+
+        # Creators can pay every fee they may owe, and voters share most of what is left
+        self.balances = {}
+        self.creators = [f"load_creator_{i}" for i in range(creator_count)]
+        for creator in self.creators:
+            self.fund(creator, self.proposal_fee * (proposal_count // creator_count + 1))
+
+        voter_funds = int(self.currency.balance_of(account=harness.OWNER) * VOTER_SHARE)
+        assert voter_funds >= voter_count, "The owner cannot fund this many voters"
+        self.voters = [f"load_voter_{i}" for i in range(voter_count)]
+        for voter in self.voters:
+            self.fund(voter, self.rng.randint(1, max(1, 2 * voter_funds // voter_count - 1)))
+
+        self.proposals = []
+        self.votes = {}
+        self.voted_pairs = []
+
+    def fund(self, account, amount):
+        self.currency.transfer(amount=amount, to=account, signer=harness.OWNER)
+        self.balances[account] = self.balances.get(account, 0) + amount
+
+    def tick(self):
+        self.clock += datetime.timedelta(seconds=1)
+        return environment_at(self.clock)
+
+    def call(self, operation, contract, function, signer, environment, **kwargs):
+        """
+        Run one measured call, recording its latency, stamps and events. Returns its output, or None
+        if the contract rejected it with a failed assertion. Any other error is raised, since it
+        points to a bug rather than to an operation the generated load made invalid
+        """
+        start = time.perf_counter()
+        try:
+            output = getattr(contract, function)(
+                signer=signer,
+                environment=environment,
+                stamps=STAMPS,
+                metering=True,
+                return_full_output=True,
+                **kwargs
+            )
+        except AssertionError as e:
+            output = {"status_code": 1, "result": e}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if output.get("status_code", 0) != 0:
+            error = output.get("result")
+            if not isinstance(error, AssertionError):
+                raise RuntimeError(f"{operation} ({function}) failed with {type(error).__name__}: {error}")
+            self.failures[operation] = self.failures.get(operation, 0) + 1
+            return None
+
+        self.samples.setdefault(operation, {"latency_ms": [], "stamps": []})
+        self.samples[operation]["latency_ms"].append(round(elapsed_ms, 3))
+        self.samples[operation]["stamps"].append(output["stamps_used"])
+        for event in output.get("events", []):
+            self.events.append(event)
+        return output
+
+    def create_proposal(self):
+        creator = self.rng.choice(self.creators)
+        environment = self.tick()
+        if self.proposal_fee > 0:
+            self.currency.approve(amount=self.proposal_fee, to=harness.VOTING_CONTRACT_NAME, signer=creator)
+
+        expires_at = (self.clock + PROPOSAL_DURATION).strftime("%Y-%m-%d %H:%M:%S")
+        output = self.call(
+            "create_proposal", self.voting, "create_proposal", creator, environment,
+            title=f"Load test proposal {len(self.proposals)}",
+            description=harness.PROPOSAL_DESCRIPTION,
+            expires_at=expires_at,
+            metadata={"seeded": True}
+        )
+        if output is not None:
+            self.proposals.append(output["result"])
+
+    def vote(self):
+        proposal_id = self.rng.choice(self.proposals)
+        voter = self.rng.choice(self.voters)
+        if (proposal_id, voter) in self.votes:
+            self.change_vote(proposal_id, voter)
+            return
+
+        choice = self.rng.choice(CHOICES)
+        if self.call("vote", self.voting, "vote", voter, self.tick(), proposal_id=proposal_id, choice=choice):
+            self.votes[proposal_id, voter] = choice
+            self.voted_pairs.append((proposal_id, voter))
+
+    def change_vote(self, proposal_id=None, voter=None):
+        if proposal_id is None:
+            proposal_id, voter = self.rng.choice(self.voted_pairs)
+
+        choice = self.rng.choice([c for c in CHOICES if c != self.votes[proposal_id, voter]])
+        if self.call("change_vote", self.voting, "vote", voter, self.tick(), proposal_id=proposal_id, choice=choice):
+            self.votes[proposal_id, voter] = choice
+
+    def transfer(self):
+        sender = self.rng.choice(self.voters)
+        receiver = self.rng.choice(self.voters)
+        if self.balances[sender] < 2 or sender == receiver:
+            return
+
+        amount = self.rng.randint(1, self.balances[sender] // 2)
+        if self.call("transfer", self.currency, "transfer", sender, self.tick(), amount=amount, to=receiver):
+            self.balances[sender] -= amount
+            self.balances[receiver] += amount
+
+    def run(self, operation_count, mix):
+        names = [name for name in OPERATIONS if mix.get(name, 0) > 0]
+        weights = [mix[name] for name in names]
+
+        for _ in range(operation_count):
+            operation = self.rng.choices(names, weights)[0]
+            if not self.proposals:
+                operation = "create_proposal"
+            elif operation == "change_vote" and not self.voted_pairs:
+                operation = "vote"
+            getattr(self, operation)()
+
+    def finalize_all(self):
+        environment = environment_at(self.clock + PROPOSAL_DURATION + datetime.timedelta(days=1))
+        for proposal_id in self.proposals:
+            # Each call counts at most max_tally_batch voters
+            finalized = False
+            while not finalized:
+                output = self.call("finalize_proposal", self.voting, "finalize_proposal", harness.OWNER, environment,
+                                   proposal_id=proposal_id)
+                finalized = output is None or output["result"]["finalized"]
+
+    def report(self):
+        operations = {}
+        for operation, samples in self.samples.items():
+            operations[operation] = {
+                "count": len(samples["latency_ms"]),
+                "failures": self.failures.get(operation, 0),
+                "latency_ms": summarize(samples["latency_ms"]),
+                "stamps": summarize(samples["stamps"]),
+            }
+        return operations
+
+    def write_state(self, path):
+        fixtures.StateFixture.capture(self.client).save_dump(path)
+
+    def write_events(self, path):
+        with open(path, "w") as f:
+            for index, event in enumerate(self.events):
+                record = dict(event)
+                record["tx_hash"] = f"loadgen-{index}"
+                f.write(encode(record) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1, help="seed of the operation sequence")
+    parser.add_argument("--voters", type=int, default=1000, help="number of funded voters")
+    parser.add_argument("--creators", type=int, default=20, help="number of accounts that create proposals")
+    parser.add_argument("--operations", type=int, default=10_000, help="number of operations to run")
+    parser.add_argument("--mix", nargs="+", default=[f"{k}={v}" for k, v in DEFAULT_MIX.items()],
+                        help="operation weights, e.g. vote=12 transfer=4")
+    parser.add_argument("--config", choices=sorted(CONFIGS), default="recount",
+                        help="tally configuration applied before any proposal is created")
+    parser.add_argument("--no-finalize", action="store_true", help="leave every proposal active")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="directory of the report and dumps")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    expected_proposals = int(args.operations * mix.get("create_proposal", 0) / sum(mix.values())) + 1
+    generator = LoadGenerator(args.seed, args.voters, args.creators, expected_proposals * 2, args.config)
+    generator.run(args.operations, mix)
+    if not args.no_finalize:
+        generator.finalize_all()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    report = {
+        "generated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "voters": args.voters,
+        "operations": args.operations,
+        "mix": mix,
+        "config": args.config,
+        "proposals": len(generator.proposals),
+        "votes": len(generator.votes),
+        "results": generator.report(),
+    }
+    with open(os.path.join(args.output_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    generator.write_state(os.path.join(args.output_dir, "state.jsonl"))
+    generator.write_events(os.path.join(args.output_dir, "events.jsonl"))
+
+    for operation, result in report["results"].items():
+        latency = result["latency_ms"]
+        stamps = result["stamps"]
+        print(f"{operation:<18}{result['count']:>8} calls{result['failures']:>6} failed  "
+              f"latency p50 {latency['p50']:>8} ms p99 {latency['p99']:>8} ms  "
+              f"stamps p50 {stamps['p50']:>8} p99 {stamps['p99']:>8}")
+    print(f"Report, state and events written to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Snapshot and restore fixtures for the contract tests and benchmarks
+
+Deploying the contracts and funding voters through contract calls is the slowest part of a
+test. A StateFixture captures every storage entry once, and restoring it flushes the driver
+and writes the entries back, without re-submitting or re-running any contract code.
+
+Large fixtures, such as one proposal with 10,000 votes, are built once and saved to
+contracts/tests/.fixtures/ as JSON. Only contract state is saved, not contract code. A
+fixture is rebuilt when voting.py, the currency stand-in or its parameters change.
+"""
+import hashlib
+import json
+import os
+
+from contracting.client import ContractingClient
+from contracting.stdlib.bridge.time import Datetime
+from contracting.storage.encoder import decode, encode
+
+import harness
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), ".fixtures")
+TEST_VOTERS = ["voter1", "voter2", "voter3"]
+TEST_AMOUNTS = [1000, 2000, 3000]
+LARGE_VOTER_COUNT = 10_000
+CHOICES = ["y", "n", "-"]
+
+# Settings each proposal records when it is created. Other settings are applied once the votes
+# are cast, so that auto_update_tallies does not recount every earlier voter on each vote
+CREATION_SETTINGS = ["tally_mode", "vote_weighting"]
+
+# Saved fixtures outlive the day they were built, so large proposals get a fixed expiry
+LARGE_PROPOSAL_EXPIRY = "2099-01-01 00:00:00"
+
+
+def is_code_key(key):
+    """Return True for the entries that hold a submitted contract's code and metadata"""
+    variable = key.split(":", 1)[0].partition(".")[2]
+    return variable.startswith("__")
+
+
+class StateFixture:
+    """A copy of every storage entry of a driver"""
+
+    def __init__(self, items):
+        self.items = items
+
+    @classmethod
+    def capture(cls, client):
+        client.raw_driver.commit()
+        return cls(dict(client.raw_driver.items()))
+
+    def restore(self, client):
+        """Replace the client's state with this fixture"""
+        driver = client.raw_driver
+        driver.flush_full()
+        for key, value in self.items.items():
+            driver.set(key, value)
+        driver.commit()
+
+    def save(self, path, fingerprint):
+        """Write the fixture's contract state, without code entries, to path as JSON"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        state = {key: value for key, value in self.items.items() if not is_code_key(key)}
+        with open(path, "w") as f:
+            f.write(encode({"fingerprint": fingerprint, "state": state}))
+
+    @classmethod
+    def load(cls, path, fingerprint, code_fixture):
+        """
+        Read a fixture saved with the same fingerprint, taking code entries from code_fixture.
+        Returns None if there is no such fixture.
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as f:
+            saved = decode(f.read())
+
+        if saved.get("fingerprint") != fingerprint:
+            return None
+
+        items = {key: value for key, value in code_fixture.items.items() if is_code_key(key)}
+        items.update(saved["state"])
+        return cls(items)
+
+    def save_dump(self, path):
+        """Write the fixture's contract state as JSON Lines of {"key", "value"} entries, sorted by key"""
+        with open(path, "w") as f:
+            for key in sorted(self.items):
+                if not is_code_key(key):
+                    f.write(json.dumps({"key": key, "value": json.loads(encode(self.items[key]))}) + "\n")
+
+    @classmethod
+    def load_dump(cls, path, code_fixture):
+        """Read a state dump written by save_dump, taking code entries from code_fixture"""
+        items = {key: value for key, value in code_fixture.items.items() if is_code_key(key)}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    items[entry["key"]] = decode(json.dumps(entry["value"]))
+        return cls(items)
+
+
+def fingerprint(*parts):
+    """Hash the contract sources and the parameters a fixture was built with"""
+    digest = hashlib.sha256()
+    digest.update(harness.read_voting_code().encode())
+    digest.update(harness.CURRENCY_CODE.encode())
+    digest.update(json.dumps(parts, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+BASE_FIXTURE = None
+
+
+def base_fixture():
+    """Return the deployed currency and voting contracts with the test voters funded, built once per process"""
+    global BASE_FIXTURE
+
+    if BASE_FIXTURE is None:
+        client = ContractingClient()
+        client.flush()
+        currency, voting = harness.deploy(client)
+        for voter, amount in zip(TEST_VOTERS, TEST_AMOUNTS):
+            currency.transfer(amount=amount, to=voter, signer=harness.OWNER)
+        BASE_FIXTURE = StateFixture.capture(client)
+        client.flush()
+
+    return BASE_FIXTURE
+
+
+def large_proposal_expired_environment():
+    """Return an execution environment in which large fixture proposals have expired"""
+    return {"now": Datetime(2099, 1, 2, 0, 0)}
+
+
+def large_proposal_fixture(voter_count=LARGE_VOTER_COUNT, settings=None, creator=TEST_VOTERS[2],
+                           fixtures_dir=FIXTURES_DIR):
+    """
+    Return (fixture, proposal_id) for one proposal voted on by voter_count funded voters and
+    expiring at LARGE_PROPOSAL_EXPIRY, with settings applied. CREATION_SETTINGS are applied
+    before the proposal is created and the others after the votes are cast. Fixtures are
+    loaded from fixtures_dir when present and otherwise built through contract calls and
+    saved there.
+    """
+    settings = settings or {}
+    key = fingerprint("large_proposal", voter_count, settings, creator)
+    path = os.path.join(fixtures_dir, f"large_proposal_{voter_count}_{key[:12]}.json")
+
+    fixture = StateFixture.load(path, key, base_fixture())
+    if fixture is None:
+        fixture = build_large_proposal(voter_count, settings, creator)
+        fixture.save(path, key)
+
+    proposal_id = fixture.items[f"{harness.VOTING_CONTRACT_NAME}.current_proposal_id"] - 1
+    return fixture, proposal_id
+
+
+def build_large_proposal(voter_count, settings, creator):
+    """Build a large proposal fixture through contract calls"""
+    client = ContractingClient()
+    base_fixture().restore(client)
+    currency = client.get_contract("currency")
+    voting = client.get_contract(harness.VOTING_CONTRACT_NAME)
+
+    if settings.get("tally_mode") == "revalidate":
+        harness.enable_balance_listener(currency)
+    for setting_name, value in settings.items():
+        if setting_name in CREATION_SETTINGS:
+            voting.update_settings(setting_name=setting_name, value=value, signer=harness.OWNER)
+
+    proposal_id = harness.create_proposal(currency, voting, creator, expires_at=LARGE_PROPOSAL_EXPIRY)
+    for i in range(voter_count):
+        voter = f"fixture_voter_{i}"
+        currency.transfer(amount=10 + i % 90, to=voter, signer=harness.OWNER)
+        voting.vote(proposal_id=proposal_id, choice=CHOICES[i % len(CHOICES)], signer=voter)
+
+    for setting_name, value in settings.items():
+        if setting_name not in CREATION_SETTINGS:
+            voting.update_settings(setting_name=setting_name, value=value, signer=harness.OWNER)
+
+    fixture = StateFixture.capture(client)
+    client.flush()
+    return fixture
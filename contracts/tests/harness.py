@@ -0,0 +1,127 @@
+"""
+Shared helpers for deploying the voting contract in tests and benchmarks
+"""
+import datetime
+import os
+
+from contracting.stdlib.bridge.time import Datetime
+
+CONTRACTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+VOTING_CONTRACT_NAME = "con_voting"
+OWNER = "contract_owner"
+
+PROPOSAL_TITLE = "Test Proposal Title That Is Long Enough"
+PROPOSAL_DESCRIPTION = (
+    "This is a very detailed description that meets the minimum length requirement. It contains specific details about what the proposal aims to achieve." +
+    " Adding more context and information to ensure it's comprehensive."
+)
+
+# Stand-in for the network currency contract. Once a balance listener is set, every transfer
+# reports the sender and receiver to it, as revalidated voting tallies expect
+CURRENCY_CODE = """
+currency = Variable()
+balances = Hash(default_value=0)
+allowances = Hash(default_value=0)
+balance_listener = Variable()
+
+@construct
+def seed():
+    balances['contract_owner'] = 1_000_000
+    balances['dao'] = 0  # Initialize dao account
+    currency.set('xian')
+
+@export
+def set_balance_listener(contract: str):
+    assert ctx.caller == 'contract_owner', 'Only the owner can set the balance listener'
+    balance_listener.set(contract)
+
+def notify_balance_changed(account: str):
+    listener = balance_listener.get()
+    if listener:
+        importlib.import_module(listener).balance_changed(account=account)
+
+@export
+def transfer(amount: float, to: str):
+    assert amount > 0, 'Cannot send negative amounts!'
+    sender = ctx.caller
+    assert balances[sender] >= amount, 'Not enough currency to send!'
+    balances[sender] -= amount
+    balances[to] += amount
+    notify_balance_changed(sender)
+    notify_balance_changed(to)
+
+@export
+def approve(amount: float, to: str):
+    assert amount > 0, 'Cannot approve negative amounts!'
+    sender = ctx.caller
+    assert balances[sender] >= amount, 'Not enough currency to approve!'
+    allowances[sender, to] = amount
+
+@export
+def transfer_from(amount: float, to: str, main_account: str):
+    assert amount > 0, 'Cannot send negative amounts!'
+    sender = ctx.caller
+    assert allowances[main_account, sender] >= amount, 'Not enough allowance to send!'
+    assert balances[main_account] >= amount, 'Not enough currency to send!'
+    balances[main_account] -= amount
+    balances[to] += amount
+    allowances[main_account, sender] -= amount
+    notify_balance_changed(main_account)
+    notify_balance_changed(to)
+
+@export
+def balance_of(account: str):
+    return balances[account]
+"""
+
+
+def read_voting_code():
+    """Return the source of the voting contract"""
+    with open(os.path.join(CONTRACTS_DIR, "voting.py")) as f:
+        return f.read()
+
+
+def deploy(client, owner=OWNER, voting_contract_name=VOTING_CONTRACT_NAME):
+    """Submit the currency stand-in and the voting contract, returning both contracts"""
+    client.submit(CURRENCY_CODE, name='currency')
+    client.submit(read_voting_code(), name=voting_contract_name, signer=owner)
+    return client.get_contract('currency'), client.get_contract(voting_contract_name)
+
+
+def enable_balance_listener(currency, voting_contract_name=VOTING_CONTRACT_NAME):
+    """Have the currency stand-in report every balance change to the voting contract, as revalidated tallies need"""
+    currency.set_balance_listener(contract=voting_contract_name, signer=OWNER)
+
+
+def future_expiry(days=1):
+    """Return an expiry string the given number of days from now"""
+    future_time = datetime.datetime.now() + datetime.timedelta(days=days)
+    return future_time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def expired_environment(days=3):
+    """Return an execution environment whose `now` is past any proposal created with future_expiry()"""
+    expired_time = datetime.datetime.now() + datetime.timedelta(days=days)
+    return {"now": Datetime(
+        expired_time.year,
+        expired_time.month,
+        expired_time.day,
+        expired_time.hour,
+        expired_time.minute
+    )}
+
+
+def create_proposal(currency, voting, creator, title=PROPOSAL_TITLE, metadata=None,
+                    voting_contract_name=VOTING_CONTRACT_NAME, expires_at=None):
+    """Approve the proposal fee and create a proposal, expiring in one day unless expires_at is given"""
+    proposal_fee = voting.get_settings()["proposal_fee"]
+    if proposal_fee > 0:
+        currency.approve(amount=proposal_fee, to=voting_contract_name, signer=creator)
+
+    return voting.create_proposal(
+        title=title,
+        description=PROPOSAL_DESCRIPTION,
+        expires_at=expires_at or future_expiry(),
+        metadata=metadata,
+        signer=creator
+    )
@@ -0,0 +1,96 @@
+"""
+Storage read/write instrumentation for tests and benchmarks
+
+Wraps the get and set methods of a ContractingClient's driver and counts each access by key
+prefix while an exported function runs. Keys of the voting contract are reported by variable
+name, such as "proposals" or "proposal_votes". Keys of other contracts keep their contract
+name, such as "currency.balances".
+
+Usage:
+    meter = StorageMeter(client)
+    meter.call(voting, "vote", proposal_id=proposal_id, choice="y", signer="voter1")
+    print(meter.format_report())
+"""
+from harness import VOTING_CONTRACT_NAME
+
+
+def key_prefix(key, voting_contract_name=VOTING_CONTRACT_NAME):
+    """Return the reporting prefix of a storage key, e.g. "con_voting.proposals:1" -> "proposals\""""
+    name = key.split(":", 1)[0]
+    contract, _, variable = name.partition(".")
+    if contract == voting_contract_name and variable:
+        return variable
+    return name
+
+
+class StorageMeter:
+    """Counts driver reads and writes by key prefix for each metered call"""
+
+    def __init__(self, client, voting_contract_name=VOTING_CONTRACT_NAME):
+        self.driver = client.raw_driver
+        self.voting_contract_name = voting_contract_name
+        self.reports = {}
+        self.active = None
+
+        self.original_get = self.driver.get
+        self.original_set = self.driver.set
+        self.driver.get = self.counting_get
+        self.driver.set = self.counting_set
+
+    def detach(self):
+        """Restore the driver's own get and set"""
+        self.driver.get = self.original_get
+        self.driver.set = self.original_set
+
+    def counting_get(self, key, *args, **kwargs):
+        self.record(key, "reads")
+        return self.original_get(key, *args, **kwargs)
+
+    def counting_set(self, key, *args, **kwargs):
+        self.record(key, "writes")
+        return self.original_set(key, *args, **kwargs)
+
+    def record(self, key, kind):
+        if self.active is None:
+            return
+        prefix = key_prefix(key, self.voting_contract_name)
+        counts = self.active.setdefault(prefix, {"reads": 0, "writes": 0})
+        counts[kind] += 1
+
+    def call(self, contract, function, label=None, **kwargs):
+        """
+        Call an exported function and record its storage accesses under label, which defaults
+        to the function name. Returns the function's result.
+        """
+        counts = {}
+        self.active = counts
+        try:
+            result = getattr(contract, function)(**kwargs)
+        finally:
+            self.active = None
+            self.reports[label or function] = counts
+        return result
+
+    def counts(self, label, prefix=None):
+        """Return the {prefix: {"reads", "writes"}} counts of a call, or the totals of one prefix"""
+        counts = self.reports[label]
+        if prefix is not None:
+            return counts.get(prefix, {"reads": 0, "writes": 0})
+        return counts
+
+    def totals(self, label):
+        """Return the total reads and writes of a call across all prefixes"""
+        return {
+            "reads": sum(c["reads"] for c in self.reports[label].values()),
+            "writes": sum(c["writes"] for c in self.reports[label].values()),
+        }
+
+    def format_report(self):
+        """Render every recorded call as a table of reads and writes per prefix"""
+        lines = []
+        for label, counts in self.reports.items():
+            totals = self.totals(label)
+            lines.append(f"{label}: {totals['reads']} reads, {totals['writes']} writes")
+            for prefix in sorted(counts):
+                lines.append(f"    {prefix:<28}{counts[prefix]['reads']:>8} reads{counts[prefix]['writes']:>8} writes")
+        return "\n".join(lines)
@@ -3,89 +3,40 @@ from contracting.stdlib.bridge.time import Datetime
 from contracting.stdlib.bridge.decimal import ContractingDecimal
 from contracting.client import ContractingClient
 import datetime
-import os
+import hashlib
+import tempfile
+
+import fixtures
+import harness
+from storage_meter import StorageMeter
 
 class TestVotingContract(unittest.TestCase):
     def setUp(self):
         self.client = ContractingClient()
-        self.client.flush()
-        
+
         # Setup test data
         self.owner = "contract_owner"
         self.voting_contract_name = "con_voting"
-        self.test_voters = ["voter1", "voter2", "voter3"]
-        self.test_amounts = [1000, 2000, 3000]  # Increased amounts to cover proposal fees
-        
-        # Deploy currency contract first
-        currency_code = """
-currency = Variable()
-balances = Hash(default_value=0)
-allowances = Hash(default_value=0)
-
-@construct
-def seed():
-    balances['contract_owner'] = 1_000_000
-    balances['dao'] = 0  # Initialize dao account
-    currency.set('xian')
-
-@export
-def transfer(amount: float, to: str):
-    assert amount > 0, 'Cannot send negative amounts!'
-    sender = ctx.caller
-    assert balances[sender] >= amount, 'Not enough currency to send!'
-    balances[sender] -= amount
-    balances[to] += amount
-
-@export
-def approve(amount: float, to: str):
-    assert amount > 0, 'Cannot approve negative amounts!'
-    sender = ctx.caller
-    assert balances[sender] >= amount, 'Not enough currency to approve!'
-    allowances[sender, to] = amount
-
-@export
-def transfer_from(amount: float, to: str, main_account: str):
-    assert amount > 0, 'Cannot send negative amounts!'
-    sender = ctx.caller
-    assert allowances[main_account, sender] >= amount, 'Not enough allowance to send!'
-    assert balances[main_account] >= amount, 'Not enough currency to send!'
-    balances[main_account] -= amount
-    balances[to] += amount
-    allowances[main_account, sender] -= amount
-
-@export
-def balance_of(account: str):
-    return balances[account]
-"""
-        # Submit currency contract
-        self.client.submit(currency_code, name='currency')
+        self.test_voters = list(fixtures.TEST_VOTERS)
+        self.test_amounts = list(fixtures.TEST_AMOUNTS)  # Increased amounts to cover proposal fees
+
+        # Restore the deployed contracts with funded test voters instead of re-submitting them
+        fixtures.base_fixture().restore(self.client)
         self.currency = self.client.get_contract('currency')
-        
-        # Deploy voting contract
-        self.contracts_dir = os.path.abspath(os.path.join(os.path.dirname(__file__),'..' ))
-        voting_path = os.path.join(self.contracts_dir, "voting.py")
-        with open(voting_path) as f:
-            code = f.read()
-            self.client.submit(code, name=self.voting_contract_name, signer=self.owner)
-        
         self.voting = self.client.get_contract(self.voting_contract_name)
-        
-        # Fund test voters with more tokens
-        for voter, amount in zip(self.test_voters, self.test_amounts):
-            self.currency.transfer(amount=amount, to=voter, signer=self.owner)
 
     def approve_proposal_fee(self, voter):
         """Helper method to approve proposal fee for a voter"""
         proposal_fee = self.voting.get_settings()["proposal_fee"]
         self.currency.approve(amount=proposal_fee, to=self.voting_contract_name, signer=voter)
 
-    def create_test_proposal(self, voter, title="Test Proposal Title That Is Long Enough", metadata=None):
+    def create_test_proposal(self, voter, title="Test Proposal Title That Is Long Enough", metadata=None, days=1, options=None):
         """Helper method to create a test proposal with proper approvals"""
         # Approve fee
         self.approve_proposal_fee(voter)
         
         # Create proposal
-        future_time = datetime.datetime.now() + datetime.timedelta(days=1)
+        future_time = datetime.datetime.now() + datetime.timedelta(days=days)
         expires_at = future_time.strftime("%Y-%m-%d %H:%M:%S")
         
         return self.voting.create_proposal(
@@ -94,6 +45,7 @@ def balance_of(account: str):
                        " Adding more context and information to ensure it's comprehensive.",
             expires_at=expires_at,
             metadata=metadata,
+            options=options,
             signer=voter
         )
 
@@ -148,6 +100,32 @@ def balance_of(account: str):
         second_proposal = self.voting.get_proposal(proposal_id=second_proposal_id)
         self.assertEqual(second_proposal["title"], "Second Test Proposal")
 
+    def test_list_proposals_by_status(self):
+        # GIVEN three proposals
+        proposal_ids = [self.create_test_proposal(self.test_voters[0]) for _ in range(3)]
+
+        # WHEN the first one is finalized
+        expired_env = harness.expired_environment()
+        self.voting.finalize_proposal(proposal_id=proposal_ids[0], signer=self.test_voters[0], environment=expired_env)
+
+        # THEN it should be listed as finalized
+        finalized = self.voting.list_proposals(status="finalized", offset=0, limit=10)
+        self.assertEqual(finalized["total"], 1)
+        self.assertEqual(finalized["proposals"][0]["proposal_id"], proposal_ids[0])
+        self.assertEqual(finalized["proposals"][0]["status"], "finalized")
+        self.assertNotIn("description", finalized["proposals"][0])
+
+        # AND the others should remain listed as active, in pages
+        active = self.voting.list_proposals(status="active", offset=0, limit=1)
+        self.assertEqual(active["total"], 2)
+        self.assertEqual(len(active["proposals"]), 1)
+        next_page = self.voting.list_proposals(status="active", offset=1, limit=1)
+        listed_ids = {active["proposals"][0]["proposal_id"], next_page["proposals"][0]["proposal_id"]}
+        self.assertEqual(listed_ids, set(proposal_ids[1:]))
+
+        # AND pages past the end should be empty
+        self.assertEqual(self.voting.list_proposals(status="active", offset=2, limit=10)["proposals"], [])
+
     def test_vote_on_proposal(self):
         # GIVEN a proposal
         proposal_id = self.create_test_proposal(self.test_voters[0])
@@ -211,6 +189,283 @@ def balance_of(account: str):
         self.assertEqual(final_tally["pow_against"], 2000)  # voter2's 2000 tokens
         self.assertEqual(final_tally["pow_abstain"], 3000)  # voter3's 3000 tokens
 
+    def test_finalize_step_in_batches(self):
+        # GIVEN a proposal with three votes
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        proposal_fee = self.voting.get_settings()["proposal_fee"]
+
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[1])
+        self.voting.vote(proposal_id=proposal_id, choice='-', signer=self.test_voters[2])
+
+        expired_env = harness.expired_environment()
+
+        # WHEN finalizing two voters at a time
+        progress = self.voting.finalize_step(
+            proposal_id=proposal_id,
+            batch_size=2,
+            signer=self.test_voters[1],
+            environment=expired_env
+        )
+
+        # THEN the proposal should stay active until every voter is counted
+        self.assertFalse(progress["finalized"])
+        self.assertEqual(progress["next_index"], 2)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["status"], "active")
+
+        # WHEN any caller processes the last batch
+        progress = self.voting.finalize_step(
+            proposal_id=proposal_id,
+            batch_size=2,
+            signer=self.test_voters[2],
+            environment=expired_env
+        )
+
+        # THEN the proposal should be finalized with the full tally
+        self.assertTrue(progress["finalized"])
+        self.assertEqual(progress["tally"]["for"], 1)
+        self.assertEqual(progress["tally"]["against"], 1)
+        self.assertEqual(progress["tally"]["abstain"], 1)
+        self.assertEqual(progress["tally"]["pow_for"], 1000 - proposal_fee)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["status"], "finalized")
+        self.assertEqual(self.voting.get_vote_count(proposal_id=proposal_id)["pow_abstain"], 3000)
+
+        # AND further steps should be rejected
+        with self.assertRaises(AssertionError) as cm:
+            self.voting.finalize_step(
+                proposal_id=proposal_id,
+                batch_size=2,
+                signer=self.test_voters[2],
+                environment=expired_env
+            )
+        self.assertEqual(str(cm.exception), "Proposal already finalized")
+
+    def test_finalize_proposal_resumes_finalize_step(self):
+        # GIVEN a proposal partially finalized in batches
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter in self.test_voters:
+            self.voting.vote(proposal_id=proposal_id, choice='y', signer=voter)
+
+        expired_env = harness.expired_environment()
+        self.voting.finalize_step(proposal_id=proposal_id, batch_size=1, signer=self.test_voters[0], environment=expired_env)
+
+        # WHEN finalizing the rest in one call
+        final_tally = self.voting.finalize_proposal(
+            proposal_id=proposal_id,
+            signer=self.test_voters[0],
+            environment=expired_env
+        )
+
+        # THEN every voter should be counted exactly once
+        self.assertEqual(final_tally["for"], 3)
+        self.assertEqual(final_tally["against"], 0)
+
+    def test_finalize_proposal_respects_max_tally_batch(self):
+        # GIVEN an expired proposal with three voters and a tally batch of two
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter in self.test_voters:
+            self.voting.vote(proposal_id=proposal_id, choice='y', signer=voter)
+        self.voting.update_settings(setting_name="max_tally_batch", value=2, signer=self.owner)
+        expired_env = harness.expired_environment()
+
+        # WHEN finalizing it
+        first = self.voting.finalize_proposal(proposal_id=proposal_id, signer=self.test_voters[0], environment=expired_env)
+
+        # THEN the first call stops after two voters and reports where to resume
+        self.assertFalse(first["finalized"])
+        self.assertEqual((first["next_index"], first["voter_count"]), (2, 3))
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["status"], "active")
+
+        # AND the next call counts the last voter and finalizes the proposal
+        second = self.voting.finalize_proposal(proposal_id=proposal_id, signer=self.test_voters[0], environment=expired_env)
+        self.assertTrue(second["finalized"])
+        self.assertEqual(second["for"], 3)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["status"], "finalized")
+
+    def test_finalize_step_counts_tokens_moved_between_batches_twice(self):
+        # GIVEN a proposal whose first voter has been counted by a batched finalization
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])  # 2000 tokens
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[2])  # 3000 tokens
+        expired_env = harness.expired_environment()
+        self.voting.finalize_step(proposal_id=proposal_id, batch_size=1, signer=self.test_voters[0], environment=expired_env)
+
+        # WHEN that voter moves their tokens to a voter who has not been counted yet
+        self.currency.transfer(amount=2000, to=self.test_voters[2], signer=self.test_voters[1])
+
+        # THEN the tokens are counted for both voters, since each balance is read when its batch is counted
+        final_tally = self.voting.finalize_step(proposal_id=proposal_id, batch_size=1, signer=self.test_voters[0], environment=expired_env)["tally"]
+        self.assertEqual((final_tally["pow_for"], final_tally["pow_against"]), (2000, 5000))
+
+    def test_vote_many(self):
+        # GIVEN two proposals, one already voted on
+        first_id = self.create_test_proposal(self.test_voters[0])
+        second_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=second_id, choice='y', signer=self.test_voters[1])
+
+        # WHEN voting on both in one call
+        recorded = self.voting.vote_many(
+            votes=[[first_id, 'y'], [second_id, 'n']],
+            signer=self.test_voters[1]
+        )
+
+        # THEN both votes should be recorded
+        self.assertEqual(recorded, 2)
+        self.assertEqual(self.voting.get_vote_count(proposal_id=first_id)["for"], 1)
+        second_tally = self.voting.get_vote_count(proposal_id=second_id)
+        self.assertEqual(second_tally["for"], 0)
+        self.assertEqual(second_tally["against"], 1)
+
+    def test_vote_many_validates_all_votes_first(self):
+        # GIVEN two proposals
+        first_id = self.create_test_proposal(self.test_voters[0])
+        second_id = self.create_test_proposal(self.test_voters[0])
+
+        # WHEN one of the votes is invalid
+        # THEN the call should fail without recording any vote
+        with self.assertRaises(AssertionError):
+            self.voting.vote_many(
+                votes=[[first_id, 'y'], [second_id, 'maybe']],
+                signer=self.test_voters[1]
+            )
+        self.assertIsNone(self.voting.proposal_votes[first_id, self.test_voters[1]])
+
+        # AND voting twice on the same proposal should be rejected
+        with self.assertRaises(AssertionError) as cm:
+            self.voting.vote_many(
+                votes=[[first_id, 'y'], [first_id, 'n']],
+                signer=self.test_voters[1]
+            )
+        self.assertEqual(str(cm.exception), "Each proposal can only be voted on once per call")
+
+    def test_finalize_expired_in_expiry_order(self):
+        # GIVEN proposals created out of expiry order
+        late_id = self.create_test_proposal(self.test_voters[0], days=5)
+        second_id = self.create_test_proposal(self.test_voters[0], days=2)
+        first_id = self.create_test_proposal(self.test_voters[0], days=1)
+        self.voting.vote(proposal_id=second_id, choice='y', signer=self.test_voters[1])
+
+        # WHEN sweeping after the first two have expired
+        expired_env = harness.expired_environment()
+        finalized_ids = self.voting.finalize_expired(limit=10, signer=self.test_voters[2], environment=expired_env)
+
+        # THEN only the expired proposals should be finalized, earliest first
+        self.assertEqual(finalized_ids, [first_id, second_id])
+        self.assertEqual(self.voting.get_proposal(proposal_id=second_id)["pow_for"], 2000)
+        self.assertEqual(self.voting.get_proposal(proposal_id=late_id)["status"], "active")
+
+        # AND a second sweep should have nothing left to do
+        self.assertEqual(self.voting.finalize_expired(limit=10, signer=self.test_voters[2], environment=expired_env), [])
+
+    def test_finalize_expired_respects_batch_size(self):
+        # GIVEN an expired proposal with three voters
+        first_id = self.create_test_proposal(self.test_voters[0], days=1)
+        second_id = self.create_test_proposal(self.test_voters[0], days=2)
+        for voter in self.test_voters:
+            self.voting.vote(proposal_id=first_id, choice='n', signer=voter)
+
+        expired_env = harness.expired_environment()
+
+        # AND a later proposal that was already finalized directly
+        self.voting.finalize_proposal(proposal_id=second_id, signer=self.test_voters[0], environment=expired_env)
+
+        # WHEN sweeping with room for only two voters
+        finalized_ids = self.voting.finalize_expired(limit=10, batch_size=2, signer=self.test_voters[0], environment=expired_env)
+
+        # THEN the large proposal should be counted in part and left active
+        self.assertEqual(finalized_ids, [])
+        self.assertEqual(self.voting.get_proposal(proposal_id=first_id)["status"], "active")
+
+        # AND the next sweep should complete it and skip the finalized proposal
+        finalized_ids = self.voting.finalize_expired(limit=10, batch_size=2, signer=self.test_voters[0], environment=expired_env)
+        self.assertEqual(finalized_ids, [first_id])
+        self.assertEqual(self.voting.get_proposal(proposal_id=first_id)["total_against"], 3)
+        self.assertEqual(self.voting.expiry_queue_size.get(), 0)
+
+    def test_finalize_expired_reaches_indexed_legacy_proposals(self):
+        # GIVEN an expired proposal with a vote, created before the expiry queue and the status index existed
+        proposal_id = self.create_test_proposal(self.test_voters[0], days=1)
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+        self.voting.expiry_queue[0] = None
+        self.voting.expiry_queue_size.set(0)
+        self.voting.status_proposals["active", 0] = None
+        self.voting.proposal_status_index[proposal_id] = None
+        self.voting.status_counts["active"] = 0
+        expired_env = harness.expired_environment()
+
+        # THEN a sweep does not reach it
+        self.assertEqual(self.voting.finalize_expired(limit=10, signer=self.test_voters[2], environment=expired_env), [])
+
+        # WHEN it is indexed
+        self.voting.index_legacy_proposal(proposal_id=proposal_id, signer=self.test_voters[2])
+
+        # THEN the next sweep finalizes it
+        finalized_ids = self.voting.finalize_expired(limit=10, signer=self.test_voters[2], environment=expired_env)
+        self.assertEqual(finalized_ids, [proposal_id])
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_for"], 2000)
+        self.assertEqual(self.voting.list_proposals(status="active", offset=0, limit=10)["total"], 0)
+
+    def test_get_voter_history(self):
+        # GIVEN a voter who voted on two of three proposals and changed one vote
+        proposal_ids = [self.create_test_proposal(self.test_voters[0]) for _ in range(3)]
+        self.voting.vote(proposal_id=proposal_ids[2], choice='y', signer=self.test_voters[1])
+        self.voting.vote(proposal_id=proposal_ids[0], choice='n', signer=self.test_voters[1])
+        self.voting.vote(proposal_id=proposal_ids[2], choice='-', signer=self.test_voters[1])
+
+        # WHEN reading their history
+        history = self.voting.get_voter_history(voter=self.test_voters[1], offset=0, limit=10)
+
+        # THEN each proposal should appear once with the current choice
+        self.assertEqual(history["total"], 2)
+        self.assertEqual(history["votes"], [
+            {"proposal_id": proposal_ids[2], "choice": '-'},
+            {"proposal_id": proposal_ids[0], "choice": 'n'}
+        ])
+
+        # AND it should be readable in pages
+        page = self.voting.get_voter_history(voter=self.test_voters[1], offset=1, limit=1)
+        self.assertEqual(page["votes"], [{"proposal_id": proposal_ids[0], "choice": 'n'}])
+        self.assertEqual(self.voting.get_voter_history(voter=self.test_voters[2])["total"], 0)
+
+    def test_bulk_vote_lookups(self):
+        # GIVEN two proposals with some votes
+        first_id = self.create_test_proposal(self.test_voters[0])
+        second_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=first_id, choice='y', signer=self.test_voters[0])
+        self.voting.vote(proposal_id=first_id, choice='n', signer=self.test_voters[1])
+        self.voting.vote(proposal_id=second_id, choice='-', signer=self.test_voters[1])
+
+        # WHEN looking up several voters on one proposal
+        choices = self.voting.get_choices(proposal_id=first_id, voters=self.test_voters)
+
+        # THEN each voter's choice should be returned
+        self.assertEqual(choices, {"voter1": 'y', "voter2": 'n', "voter3": None})
+
+        # WHEN looking up one voter on several proposals
+        choices = self.voting.has_voted_many(voter=self.test_voters[1], proposal_ids=[first_id, second_id, 99])
+
+        # THEN each proposal's choice should be returned
+        self.assertEqual(choices, {str(first_id): 'n', str(second_id): '-', "99": None})
+
+    def test_get_voters_in_pages(self):
+        # GIVEN a proposal with three voters
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', '-']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+
+        # WHEN exporting the roll two voters at a time
+        first_page = self.voting.get_voters(proposal_id=proposal_id, start=0, count=2)
+        second_page = self.voting.get_voters(proposal_id=proposal_id, start=2, count=2)
+
+        # THEN every voter should be returned once, in voting order
+        self.assertEqual(first_page["total"], 3)
+        self.assertEqual(first_page["voters"], [[0, "voter1", 'y'], [1, "voter2", 'n']])
+        self.assertEqual(second_page["voters"], [[2, "voter3", '-']])
+
+        # AND page sizes should be bounded
+        with self.assertRaises(AssertionError):
+            self.voting.get_voters(proposal_id=proposal_id, start=0, count=501)
+
     def test_cannot_vote_after_expiry(self):
         # GIVEN a proposal
         proposal_id = self.create_test_proposal(self.test_voters[0])
@@ -286,6 +541,119 @@ def balance_of(account: str):
         self.assertEqual(current_tally["pow_against"], 0)
         self.assertEqual(current_tally["pow_abstain"], 0)
 
+    def test_update_current_tallies_reuses_fresh_tallies(self):
+        # GIVEN a proposal whose tallies were just recounted
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+
+        recount_time = datetime.datetime.now()
+        recount_env = {"now": Datetime(
+            recount_time.year,
+            recount_time.month,
+            recount_time.day,
+            recount_time.hour,
+            recount_time.minute
+        )}
+        self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1], environment=recount_env)
+
+        # WHEN a balance changes without a vote being cast
+        self.currency.transfer(amount=500, to=self.test_voters[2], signer=self.test_voters[1])
+
+        # THEN the stored tallies should be reused within the max age
+        current_tally = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1], environment=recount_env)
+        self.assertEqual(current_tally["pow_for"], 2000)
+        self.assertEqual(self.voting.get_vote_count(proposal_id=proposal_id, environment=recount_env)["pow_for"], 2000)
+
+        # AND a recount should be forced once they are older than the max age
+        max_age = self.voting.get_settings()["tally_max_age"]
+        stale_time = recount_time + datetime.timedelta(seconds=max_age + 60)
+        stale_env = {"now": Datetime(
+            stale_time.year,
+            stale_time.month,
+            stale_time.day,
+            stale_time.hour,
+            stale_time.minute
+        )}
+        current_tally = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1], environment=stale_env)
+        self.assertEqual(current_tally["pow_for"], 1500)
+
+    def test_vote_invalidates_recounted_tallies(self):
+        # GIVEN a proposal whose tallies were just recounted
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+        self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1])
+
+        # WHEN another vote is cast
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[2])
+
+        # THEN the next tally should include it
+        current_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.assertEqual(current_tally["for"], 1)
+        self.assertEqual(current_tally["against"], 1)
+
+    def test_metrics_stored_as_single_record(self):
+        # GIVEN a proposal with recounted tallies
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[1])
+        self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1])
+
+        # THEN all counts and power should be held in one packed entry
+        self.assertEqual(self.voting.proposal_metrics[proposal_id], [0, 1, 0, 0, 2000, 0])
+        self.assertIsNone(self.voting.proposal_metrics[proposal_id, "total_against"])
+
+    def test_legacy_proposals_outside_the_status_index(self):
+        # GIVEN two proposals, the first created before proposals were indexed by status
+        legacy_id = self.create_test_proposal(self.test_voters[0])
+        indexed_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.status_proposals["active", 0] = indexed_id
+        self.voting.status_proposals["active", 1] = None
+        self.voting.proposal_status_index[indexed_id] = 0
+        self.voting.proposal_status_index[legacy_id] = None
+        self.voting.status_counts["active"] = 1
+
+        # WHEN the legacy proposal is finalized
+        expired_env = harness.expired_environment()
+        self.voting.finalize_proposal(proposal_id=legacy_id, signer=self.test_voters[0], environment=expired_env)
+
+        # THEN the active index is left untouched and the proposal is listed as finalized
+        active = self.voting.list_proposals(status="active", offset=0, limit=10)
+        self.assertEqual(active["total"], 1)
+        self.assertEqual(active["proposals"][0]["proposal_id"], indexed_id)
+        finalized = self.voting.list_proposals(status="finalized", offset=0, limit=10)
+        self.assertEqual([p["proposal_id"] for p in finalized["proposals"]], [legacy_id])
+
+        # AND another legacy proposal can be added to its index once
+        other_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.status_proposals["active", 1] = None
+        self.voting.proposal_status_index[other_id] = None
+        self.voting.status_counts["active"] = 1
+        self.assertEqual(self.voting.index_legacy_proposal(proposal_id=other_id, signer=self.test_voters[1]),
+                         {"proposal_id": other_id, "status": "active"})
+        self.assertEqual(self.voting.list_proposals(status="active", offset=0, limit=10)["total"], 2)
+        with self.assertRaises(AssertionError) as cm:
+            self.voting.index_legacy_proposal(proposal_id=other_id, signer=self.test_voters[1])
+        self.assertEqual(str(cm.exception), "Proposal is already indexed")
+
+    def test_migrate_per_field_metrics(self):
+        # GIVEN a proposal whose metrics use the per-field layout
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.proposal_metrics[proposal_id] = None
+        legacy_values = {"total_for": 2, "total_against": 1, "total_abstain": 0, "pow_for": 300, "pow_against": 50, "pow_abstain": 0}
+        for field, value in legacy_values.items():
+            self.voting.proposal_metrics[proposal_id, field] = value
+
+        # THEN the per-field metrics should still be readable
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_for"], 300)
+
+        # WHEN migrating them
+        migrated = self.voting.migrate_metrics(proposal_id=proposal_id, signer=self.test_voters[1])
+
+        # THEN they should be packed into one record and the per-field entries removed
+        self.assertEqual(migrated["for"], 2)
+        self.assertEqual(self.voting.proposal_metrics[proposal_id], [2, 1, 0, 300, 50, 0])
+        self.assertIsNone(self.voting.proposal_metrics[proposal_id, "pow_for"])
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_against"], 1)
+
     def test_title_minimum_length(self):
         # GIVEN a proposal with a short title
         future_time = datetime.datetime.now() + datetime.timedelta(days=1)
@@ -516,8 +884,8 @@ def balance_of(account: str):
         self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
 
         # THEN tallies should not be automatically updated
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "total_for"], 0)
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "pow_for"], 0)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 0)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_for"], 0)
 
     def test_auto_update_tallies_when_enabled(self):
         # GIVEN auto-update is enabled
@@ -531,8 +899,8 @@ def balance_of(account: str):
         self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
 
         # THEN tallies should be automatically updated
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "total_for"], 1)
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "pow_for"], 1000 - proposal_fee)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 1)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_for"], 1000 - proposal_fee)
 
     def test_auto_update_on_vote_change(self):
         # GIVEN auto-update is enabled
@@ -548,10 +916,580 @@ def balance_of(account: str):
         self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[0])
 
         # THEN tallies should be automatically updated
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "total_for"], 0)
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "total_against"], 1)
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "pow_for"], 0)
-        self.assertEqual(self.voting.proposal_metrics[proposal_id, "pow_against"], 1000 - proposal_fee)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 0)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_against"], 1)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_for"], 0)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_against"], 1000 - proposal_fee)
+
+    def test_incremental_tallies_apply_vote_delta(self):
+        # GIVEN incremental tallies are enabled
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+
+        # AND a new proposal with votes
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        proposal_fee = self.voting.get_settings()["proposal_fee"]
+
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[1])
+
+        # WHEN a voter changes their vote
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[0])
+
+        # THEN the stored tallies should reflect the change without a recount
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 0)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_against"], 2)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_for"], 0)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["pow_against"], 3000 - proposal_fee)
+
+        # AND they should match a full recount
+        self.assertTrue(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+    def test_reconcile_tallies_after_balance_change(self):
+        # GIVEN an incremental proposal with a vote
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+
+        # WHEN the voter's balance changes after voting
+        self.currency.transfer(amount=500, to=self.test_voters[2], signer=self.test_voters[1])
+
+        # THEN reconciliation should report the drift
+        report = self.voting.reconcile_tallies(proposal_id=proposal_id)
+        self.assertFalse(report["in_sync"])
+        self.assertEqual(report["stored"]["pow_for"], 2000)
+        self.assertEqual(report["recount"]["pow_for"], 1500)
+
+        # AND updating tallies should bring incremental tallies back in sync
+        self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[1])
+        report = self.voting.reconcile_tallies(proposal_id=proposal_id)
+        self.assertTrue(report["in_sync"])
+        self.assertEqual(report["stored"]["pow_against"], 1500)
+
+    def test_snapshot_weighting_uses_balance_at_vote_time(self):
+        # GIVEN snapshot weighting is enabled
+        self.voting.update_settings(setting_name="vote_weighting", value="snapshot", signer=self.owner)
+
+        # AND a proposal with votes
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])  # 2000 tokens
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[2])  # 3000 tokens
+
+        # WHEN balances change after voting
+        self.currency.transfer(amount=2000, to=self.test_voters[2], signer=self.test_voters[1])
+
+        # THEN the current tally should use the balances recorded at vote time
+        current_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.assertEqual(current_tally["for"], 1)
+        self.assertEqual(current_tally["pow_for"], 2000)
+        self.assertEqual(current_tally["pow_against"], 3000)
+
+        # AND finalization should use them too
+        expired_env = harness.expired_environment()
+        final_tally = self.voting.finalize_proposal(
+            proposal_id=proposal_id,
+            signer=self.test_voters[0],
+            environment=expired_env
+        )
+        self.assertEqual(final_tally["pow_for"], 2000)
+        self.assertEqual(final_tally["pow_against"], 3000)
+        self.assertTrue(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+    def test_vote_weighting_recorded_per_proposal(self):
+        # GIVEN a proposal created with the default weighting
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+
+        # WHEN the weighting setting changes afterwards
+        self.voting.update_settings(setting_name="vote_weighting", value="snapshot", signer=self.owner)
+        self.assertEqual(self.voting.get_settings()["vote_weighting"], "snapshot")
+
+        # THEN the existing proposal should keep balance-at-finalization weighting
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["vote_weighting"], "finalization")
+
+    def test_archive_votes_in_pages(self):
+        # GIVEN a finalized proposal with three votes and an exported voter roll
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', 'y']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+
+        expired_env = harness.expired_environment()
+        final_tally = self.voting.finalize_proposal(proposal_id=proposal_id, signer=self.test_voters[0], environment=expired_env)
+        roll = self.voting.get_voters(proposal_id=proposal_id)["voters"]
+
+        # WHEN the owner archives its votes two voters at a time
+        first = self.voting.archive_votes(proposal_id=proposal_id, batch_size=2, signer=self.owner)
+        second = self.voting.archive_votes(proposal_id=proposal_id, batch_size=2, signer=self.owner)
+
+        # THEN the first call only archives part of the roll
+        self.assertFalse(first["complete"])
+        self.assertEqual(first["next_index"], 2)
+
+        # AND the finished archive commits to the exported roll
+        expected_digest = ""
+        for _, voter, choice in roll:
+            expected_digest = hashlib.sha3_256(f"{expected_digest}:{voter}:{choice}".encode()).hexdigest()
+        self.assertTrue(second["complete"])
+        self.assertEqual(second["digest"], expected_digest)
+        self.assertEqual(second["ballots"], {"y": 2, "n": 1, "-": 0})
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["archive"], second)
+
+        # AND no per-voter entries of the proposal remain, while the final tally is kept
+        state = fixtures.StateFixture.capture(self.client).items
+        self.assertEqual([k for k in state if k.startswith(f"con_voting.proposal_votes:{proposal_id}:")], [])
+        self.assertEqual([k for k in state if k.startswith(f"con_voting.proposal_voters:{proposal_id}:")], [])
+        self.assertEqual([k for k in state if k.startswith(f"con_voting.choice_voters:{proposal_id}:")], [])
+        stored_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.assertEqual(stored_tally, {field: final_tally[field] for field in stored_tally})
+
+        with self.assertRaises(Exception):
+            self.voting.archive_votes(proposal_id=proposal_id, batch_size=2, signer=self.owner)
+        with self.assertRaises(Exception):
+            self.voting.get_voters(proposal_id=proposal_id)
+
+    def test_archived_choices_read_as_archive_marker(self):
+        # GIVEN a voter who voted on two proposals, the first of which is finalized
+        archived_id = self.create_test_proposal(self.test_voters[0])
+        open_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=archived_id, choice='y', signer=self.test_voters[0])
+        self.voting.vote(proposal_id=archived_id, choice='n', signer=self.test_voters[1])
+        self.voting.vote(proposal_id=open_id, choice='n', signer=self.test_voters[1])
+        self.voting.finalize_proposal(proposal_id=archived_id, signer=self.test_voters[0],
+                                      environment=harness.expired_environment())
+
+        # WHEN only the first voter's entry has been archived
+        self.voting.archive_votes(proposal_id=archived_id, batch_size=1, signer=self.owner)
+
+        # THEN their choice reads as an unfinished archive, while the other voter's is still stored
+        choices = self.voting.get_choices(proposal_id=archived_id, voters=self.test_voters[:2])
+        self.assertEqual(choices[self.test_voters[0]]["complete"], False)
+        self.assertEqual(choices[self.test_voters[1]], 'n')
+
+        # WHEN the archive is finished
+        archive = self.voting.archive_votes(proposal_id=archived_id, batch_size=10, signer=self.owner)
+
+        # THEN the history keeps the proposal, with the marker and final digest in place of the choice
+        marker = {"archived": True, "voted": True, "digest": archive["digest"], "complete": True}
+        history = self.voting.get_voter_history(voter=self.test_voters[1])
+        self.assertEqual(history["votes"], [
+            {"proposal_id": archived_id, "choice": marker},
+            {"proposal_id": open_id, "choice": 'n'}
+        ])
+
+        # AND the bulk lookup returns the marker without claiming a vote, since archived entries are gone
+        unknown = {**marker, "voted": "unknown"}
+        choices = self.voting.has_voted_many(voter=self.test_voters[1], proposal_ids=[archived_id, open_id])
+        self.assertEqual(choices, {str(archived_id): unknown, str(open_id): 'n'})
+
+        # AND an address that voted elsewhere reads as unknown, while one that never voted reads as None
+        self.voting.vote(proposal_id=open_id, choice='y', signer=self.test_voters[2])
+        choices = self.voting.get_choices(proposal_id=archived_id, voters=[self.test_voters[2], "never_voted"])
+        self.assertEqual(choices, {self.test_voters[2]: unknown, "never_voted": None})
+
+    def test_archive_votes_requires_owner_and_finalized_proposal(self):
+        # GIVEN an active proposal with a vote
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+
+        # WHEN archiving it before finalization
+        # THEN it should fail
+        with self.assertRaises(Exception):
+            self.voting.archive_votes(proposal_id=proposal_id, batch_size=10, signer=self.owner)
+
+        # AND only the owner can archive a finalized proposal
+        expired_env = harness.expired_environment()
+        self.voting.finalize_proposal(proposal_id=proposal_id, signer=self.test_voters[0], environment=expired_env)
+        with self.assertRaises(Exception):
+            self.voting.archive_votes(proposal_id=proposal_id, batch_size=10, signer=self.test_voters[0])
+
+    def test_ballot_buckets_follow_vote_changes(self):
+        # GIVEN three voters voting for a proposal
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter in self.test_voters:
+            self.voting.vote(proposal_id=proposal_id, choice='y', signer=voter)
+
+        # WHEN the first voter changes their vote
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[0])
+
+        # THEN the counters move the ballot without a recount
+        self.assertEqual(self.voting.get_ballot_counts(proposal_id=proposal_id), {"y": 2, "n": 1, "-": 0})
+
+        # AND the last voter of the old bucket takes the freed slot
+        self.assertEqual(self.voting.choice_voters[proposal_id, 'y', 0], self.test_voters[2])
+        self.assertEqual(self.voting.choice_voter_index[proposal_id, self.test_voters[2]], 0)
+        self.assertIsNone(self.voting.choice_voters[proposal_id, 'y', 2])
+
+        # AND each choice's power matches the full recount
+        current_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.assertEqual(self.voting.tally_choice(proposal_id=proposal_id, choice='y')["power"], current_tally["pow_for"])
+        self.assertEqual(self.voting.tally_choice(proposal_id=proposal_id, choice='n')["power"], current_tally["pow_against"])
+
+    def test_tally_choice_reads_only_its_bucket(self):
+        # GIVEN a proposal with two votes for and one against
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'y', 'n']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+
+        # WHEN the power against is recomputed and the ballots are counted under the meter
+        meter = StorageMeter(self.client)
+        against = meter.call(self.voting, "tally_choice", proposal_id=proposal_id, choice='n')
+        meter.call(self.voting, "get_ballot_counts", proposal_id=proposal_id)
+        meter.detach()
+
+        # THEN only the against voter's balance is read, and no per-voter entries at all for the counts
+        self.assertEqual((against["ballots"], against["count"]), (1, 1))
+        self.assertEqual(meter.counts("tally_choice", "currency.balances")["reads"], 1)
+        self.assertEqual(meter.counts("tally_choice", "proposal_votes")["reads"], 0)
+        self.assertEqual(meter.counts("get_ballot_counts", "choice_voter_counts")["reads"], 3)
+        self.assertEqual(meter.counts("get_ballot_counts", "proposal_votes")["reads"], 0)
+        self.assertEqual(meter.counts("get_ballot_counts", "proposal_voters")["reads"], 0)
+
+    def test_proposal_created_event_lists_options(self):
+        # GIVEN an approved proposal fee
+        self.approve_proposal_fee(self.test_voters[0])
+
+        # WHEN an option proposal is created
+        output = self.voting.create_proposal(
+            title="Test Proposal Title That Is Long Enough",
+            description=harness.PROPOSAL_DESCRIPTION,
+            expires_at=harness.future_expiry(),
+            options=["red", "green", "blue"],
+            signer=self.test_voters[0],
+            return_full_output=True
+        )
+
+        # THEN its creation event names the options in order, so indexers know them before any vote
+        created = [event for event in output["events"] if event["event"] == "ProposalCreated"]
+        self.assertEqual(created[0]["data"]["options"], "red,green,blue")
+
+    def test_options_are_kept_out_of_the_proposal_record(self):
+        # GIVEN an option proposal
+        options = ["red", "green", "blue"]
+        proposal_id = self.create_test_proposal(self.test_voters[0], options=options)
+
+        # THEN the proposal record read by every vote only holds the number of options
+        record = self.voting.proposals[proposal_id]
+        self.assertNotIn("options", record)
+        self.assertEqual(record["option_count"], 3)
+        self.assertEqual(self.voting.proposal_options[proposal_id], options)
+
+        # AND get_proposal still lists them in order
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["options"], options)
+
+    def test_option_proposal_tallies(self):
+        # GIVEN a proposal with three options
+        options = ["Alice", "Bob", "Carol"]
+        proposal_id = self.create_test_proposal(self.test_voters[0], options=options)
+        proposal_fee = self.voting.get_settings()["proposal_fee"]
+
+        # WHEN voters pick options and one changes their vote
+        self.voting.vote(proposal_id=proposal_id, choice="Bob", signer=self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice="Carol", signer=self.test_voters[1])
+        self.voting.vote(proposal_id=proposal_id, choice="Bob", signer=self.test_voters[2])
+        self.voting.vote(proposal_id=proposal_id, choice="Alice", signer=self.test_voters[1])
+
+        # THEN counts and power are reported per option, in the order of the options
+        current_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.assertEqual(current_tally["options"], options)
+        self.assertEqual(current_tally["counts"], [1, 2, 0])
+        self.assertEqual(current_tally["power"], [2000, 4000 - proposal_fee, 0])
+        self.assertEqual(self.voting.get_ballot_counts(proposal_id=proposal_id), {"Alice": 1, "Bob": 2, "Carol": 0})
+
+        # AND yes/no choices are rejected
+        with self.assertRaises(AssertionError):
+            self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
+
+        # AND finalization stores the same packed tally
+        final_tally = self.voting.finalize_proposal(
+            proposal_id=proposal_id,
+            signer=self.test_voters[0],
+            environment=harness.expired_environment()
+        )
+        self.assertEqual((final_tally["counts"], final_tally["power"]), (current_tally["counts"], current_tally["power"]))
+        proposal = self.voting.get_proposal(proposal_id=proposal_id)
+        self.assertEqual((proposal["counts"], proposal["power"]), (current_tally["counts"], current_tally["power"]))
+        self.assertEqual(self.voting.proposal_metrics[proposal_id], [1, 2, 0, 2000, 4000 - proposal_fee, 0])
+
+    def test_incremental_option_vote_touches_one_vector(self):
+        # GIVEN an incremental proposal with many options and a vote on it
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+        options = [f"Option {i}" for i in range(20)]
+        proposal_id = self.create_test_proposal(self.test_voters[0], options=options)
+        self.voting.vote(proposal_id=proposal_id, choice="Option 3", signer=self.test_voters[1])
+
+        # WHEN the vote is changed under the meter
+        meter = StorageMeter(self.client)
+        meter.call(self.voting, "vote", proposal_id=proposal_id, choice="Option 17", signer=self.test_voters[1])
+        meter.detach()
+
+        # THEN the packed tally is read and written once, whatever the number of options
+        self.assertEqual(meter.counts("vote", "proposal_metrics"), {"reads": 1, "writes": 1})
+        counts = self.voting.get_proposal(proposal_id=proposal_id)["counts"]
+        self.assertEqual((counts[3], counts[17], sum(counts)), (0, 1, 1))
+        self.assertTrue(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+    def test_invalid_options(self):
+        # WHEN creating proposals with too few, repeated or malformed options
+        # THEN it should fail
+        for options in [["Only"], ["Same", "Same"], ["a:b", "c"], ["", "c"], [f"{i}" for i in range(21)]]:
+            with self.assertRaises(AssertionError):
+                self.create_test_proposal(self.test_voters[0], options=options)
+
+    def test_options_cannot_contain_key_separators(self):
+        # WHEN creating a proposal with an option containing a storage key separator
+        # THEN it should fail, since votes for it could never be stored
+        for options in [["v1.2", "v2"], ["a,b", "c"], ["a:b", "c"]]:
+            with self.assertRaises(AssertionError) as context:
+                self.create_test_proposal(self.test_voters[0], options=options)
+            self.assertIn("Options cannot contain", str(context.exception))
+
+    def test_vote_digest_tracks_current_votes(self):
+        # GIVEN a proposal without votes
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["vote_digest"], "0x0")
+
+        # WHEN voters vote and one of them changes their vote
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[2])
+        before_change = self.voting.get_proposal(proposal_id=proposal_id)["vote_digest"]
+        self.voting.vote(proposal_id=proposal_id, choice='-', signer=self.test_voters[1])
+
+        # THEN the digest is the modular sum over the current votes only
+        def term(voter, choice):
+            return int(hashlib.sha3_256(f"{proposal_id}:{voter}:{choice}".encode()).hexdigest(), 16)
+
+        expected = (term(self.test_voters[1], '-') + term(self.test_voters[2], 'n')) % 2 ** 256
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["vote_digest"], hex(expected))
+
+        # AND switching back restores the earlier digest
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["vote_digest"], before_change)
+
+    def test_large_proposal_fixture_round_trip(self):
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            # GIVEN a large proposal fixture built and saved to disk
+            built, proposal_id = fixtures.large_proposal_fixture(voter_count=30, fixtures_dir=fixtures_dir)
+
+            # WHEN it is requested again
+            loaded, loaded_proposal_id = fixtures.large_proposal_fixture(voter_count=30, fixtures_dir=fixtures_dir)
+
+            # THEN the saved state is loaded unchanged
+            self.assertEqual(loaded_proposal_id, proposal_id)
+            self.assertEqual(loaded.items, built.items)
+
+        # AND restoring it gives a proposal with every vote in place
+        loaded.restore(self.client)
+        current_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.assertEqual((current_tally["for"], current_tally["against"], current_tally["abstain"]), (10, 10, 10))
+
+        final_tally = self.voting.finalize_proposal(
+            proposal_id=proposal_id,
+            signer=self.test_voters[0],
+            environment=fixtures.large_proposal_expired_environment()
+        )
+        self.assertEqual(final_tally["for"], 10)
+
+    def test_large_proposal_fixture_applies_settings_after_voting(self):
+        with tempfile.TemporaryDirectory() as fixtures_dir:
+            # GIVEN a large proposal fixture built with a creation setting and auto-updated tallies
+            settings = {"tally_mode": "incremental", "auto_update_tallies": 1}
+            fixture, proposal_id = fixtures.large_proposal_fixture(voter_count=6, settings=settings, fixtures_dir=fixtures_dir)
+
+        # WHEN it is restored
+        fixture.restore(self.client)
+
+        # THEN the proposal was created with the tally mode, and the other setting applied afterwards
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["tally_mode"], "incremental")
+        self.assertEqual(self.voting.get_settings()["auto_update_tallies"], 1)
+        self.assertTrue(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+    def test_state_dump_round_trip(self):
+        # GIVEN a proposal with a vote
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+        proposal = self.voting.get_proposal(proposal_id=proposal_id)
+
+        with tempfile.TemporaryDirectory() as dump_dir:
+            # WHEN the state is dumped and loaded back into a flushed client
+            dump_path = f"{dump_dir}/state.jsonl"
+            fixtures.StateFixture.capture(self.client).save_dump(dump_path)
+            self.client.flush()
+            fixtures.StateFixture.load_dump(dump_path, fixtures.base_fixture()).restore(self.client)
+
+        # THEN the proposal and its vote are unchanged
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id), proposal)
+        self.assertEqual(self.voting.get_vote_count(proposal_id=proposal_id)["pow_for"], 2000)
+
+    def test_storage_meter_counts_recount_reads(self):
+        # GIVEN a proposal with three votes
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', '-']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+
+        # WHEN a vote and a recount are metered
+        meter = StorageMeter(self.client)
+        meter.call(self.voting, "vote", proposal_id=proposal_id, choice='n', signer=self.test_voters[0])
+        meter.call(self.voting, "get_vote_count", proposal_id=proposal_id)
+        meter.detach()
+
+        # THEN a vote without auto-update should not read balances or touch metrics
+        self.assertEqual(meter.counts("vote", "currency.balances")["reads"], 0)
+        self.assertEqual(meter.counts("vote", "proposal_metrics"), {"reads": 0, "writes": 0})
+        self.assertEqual(meter.counts("vote", "proposal_votes")["writes"], 1)
+
+        # AND the recount should read each voter's balance and vote once without writing
+        self.assertEqual(meter.counts("get_vote_count", "currency.balances")["reads"], 3)
+        self.assertEqual(meter.counts("get_vote_count", "proposal_votes")["reads"], 3)
+        self.assertEqual(meter.counts("get_vote_count", "proposal_voters")["reads"], 3)
+        self.assertEqual(meter.totals("get_vote_count")["writes"], 0)
+
+    def test_storage_meter_incremental_vote_is_constant(self):
+        # GIVEN an incremental proposal with three votes
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter in self.test_voters:
+            self.voting.vote(proposal_id=proposal_id, choice='y', signer=voter)
+
+        # WHEN a vote change is metered
+        meter = StorageMeter(self.client)
+        meter.call(self.voting, "vote", proposal_id=proposal_id, choice='n', signer=self.test_voters[2])
+        meter.detach()
+
+        # THEN only the voter's own balance is read and the voter roll is untouched
+        self.assertEqual(meter.counts("vote", "currency.balances")["reads"], 1)
+        self.assertEqual(meter.counts("vote", "proposal_voters"), {"reads": 0, "writes": 0})
+        self.assertEqual(meter.counts("vote", "proposal_metrics")["writes"], 1)
+
+    def test_revalidated_tallies_follow_balance_changes(self):
+        # GIVEN a revalidated proposal with two votes and a currency reporting balance changes
+        self.currency.set_balance_listener(contract=self.voting_contract_name, signer=self.owner)
+        self.voting.update_settings(setting_name="tally_mode", value="revalidate", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])  # 2000 tokens
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[2])  # 3000 tokens
+
+        # WHEN one voter sends tokens to someone who has not voted
+        self.currency.transfer(amount=500, to="someone_else", signer=self.test_voters[1])
+        self.assertFalse(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+        # THEN revalidation applies only the logged changes, one entry per call here
+        meter = StorageMeter(self.client)
+        first = meter.call(self.voting, "revalidate_tallies", proposal_id=proposal_id, limit=1)
+        meter.detach()
+        self.assertEqual(first["pending"], 1)
+        self.assertEqual(first["tally"]["pow_for"], 1500)
+        self.assertEqual(meter.counts("revalidate_tallies", "currency.balances")["reads"], 1)
+        self.assertEqual(meter.counts("revalidate_tallies", "proposal_voters"), {"reads": 0, "writes": 0})
+
+        second = self.voting.revalidate_tallies(proposal_id=proposal_id, limit=10)
+        self.assertEqual(second["pending"], 0)
+        self.assertTrue(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+        # AND a fully revalidated tally is read and finalized without a recount
+        self.assertEqual(self.voting.get_vote_count(proposal_id=proposal_id), second["tally"])
+        final_tally = self.voting.finalize_proposal(
+            proposal_id=proposal_id,
+            signer=self.test_voters[0],
+            environment=harness.expired_environment()
+        )
+        self.assertEqual((final_tally["pow_for"], final_tally["pow_against"]), (1500, 3000))
+
+    def test_update_current_tallies_revalidates_pending_changes(self):
+        # GIVEN a revalidated proposal whose voter's balance changed after voting
+        self.currency.set_balance_listener(contract=self.voting_contract_name, signer=self.owner)
+        self.voting.update_settings(setting_name="tally_mode", value="revalidate", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+        self.currency.transfer(amount=250, to=self.test_voters[2], signer=self.test_voters[1])
+
+        # WHEN tallies are updated
+        tally = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1])
+
+        # THEN the pending change is applied
+        self.assertEqual(tally["pow_for"], 1750)
+        self.assertTrue(self.voting.reconcile_tallies(proposal_id=proposal_id)["in_sync"])
+
+    def test_revalidate_mode_requires_balance_listener(self):
+        # WHEN enabling revalidated tallies while the currency reports balance changes to no one
+        # THEN it should fail
+        with self.assertRaises(AssertionError):
+            self.voting.update_settings(setting_name="tally_mode", value="revalidate", signer=self.owner)
+
+        # AND it should succeed once the voting contract is the currency's balance listener
+        harness.enable_balance_listener(self.currency, self.voting_contract_name)
+        self.voting.update_settings(setting_name="tally_mode", value="revalidate", signer=self.owner)
+        self.assertEqual(self.voting.get_settings()["tally_mode"], "revalidate")
+
+    def test_revalidated_tallies_are_recounted_without_balance_listener(self):
+        # GIVEN a revalidated proposal with a vote
+        harness.enable_balance_listener(self.currency, self.voting_contract_name)
+        self.voting.update_settings(setting_name="tally_mode", value="revalidate", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])  # 2000 tokens
+
+        # WHEN the currency stops reporting balance changes and the voter moves tokens
+        self.currency.set_balance_listener(contract="", signer=self.owner)
+        self.currency.transfer(amount=500, to="someone_else", signer=self.test_voters[1])
+
+        # THEN reads and finalization recount with current balances instead of trusting the log
+        self.assertEqual(self.voting.get_vote_count(proposal_id=proposal_id)["pow_for"], 1500)
+        self.assertEqual(self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[1])["pow_for"], 1500)
+        final_tally = self.voting.finalize_proposal(
+            proposal_id=proposal_id,
+            signer=self.test_voters[0],
+            environment=harness.expired_environment()
+        )
+        self.assertEqual(final_tally["pow_for"], 1500)
+
+    def test_prune_balance_changes_applied_by_every_proposal(self):
+        # GIVEN two revalidated proposals and a transfer that logs two balance changes
+        harness.enable_balance_listener(self.currency, self.voting_contract_name)
+        self.voting.update_settings(setting_name="tally_mode", value="revalidate", signer=self.owner)
+        first_id = self.create_test_proposal(self.test_voters[0])
+        second_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=first_id, choice='y', signer=self.test_voters[1])
+        for proposal_id in [first_id, second_id]:
+            self.voting.revalidate_tallies(proposal_id=proposal_id, limit=10)
+        logged = self.voting.balance_change_count.get()
+        self.currency.transfer(amount=100, to=self.test_voters[2], signer=self.test_voters[1])
+        self.assertEqual(self.voting.balance_change_count.get(), logged + 2)
+
+        # WHEN the first proposal has applied the whole log and the second only one of the new entries
+        self.voting.revalidate_tallies(proposal_id=first_id, limit=10)
+        self.voting.revalidate_tallies(proposal_id=second_id, limit=1)
+
+        # THEN pruning keeps the entry the second proposal still needs
+        pruned = self.voting.prune_balance_changes(limit=100)
+        self.assertEqual(pruned, {"start": logged + 1, "pruned": logged + 1, "remaining": 1})
+        self.assertIsNone(self.voting.balance_changes[logged])
+        self.assertEqual(self.voting.balance_changes[logged + 1], self.test_voters[2])
+
+        # AND once both proposals are finalized, the rest of the log is pruned
+        expired_env = harness.expired_environment()
+        for proposal_id in [first_id, second_id]:
+            self.voting.finalize_proposal(proposal_id=proposal_id, signer=self.test_voters[0], environment=expired_env)
+        self.assertEqual(self.voting.revalidated_count.get(), 0)
+        self.assertEqual(self.voting.prune_balance_changes(limit=100), {"start": logged + 2, "pruned": 1, "remaining": 0})
+
+        # AND transfers are no longer logged while no revalidated proposal is open
+        self.currency.transfer(amount=100, to=self.test_voters[2], signer=self.test_voters[1])
+        self.assertEqual(self.voting.balance_change_count.get(), logged + 2)
+
+    def test_only_currency_reports_balance_changes(self):
+        # WHEN an account reports a balance change itself
+        # THEN it should fail
+        with self.assertRaises(AssertionError):
+            self.voting.balance_changed(account=self.test_voters[0], signer=self.test_voters[0])
+
+        # AND recount proposals cannot be revalidated
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        with self.assertRaises(AssertionError):
+            self.voting.revalidate_tallies(proposal_id=proposal_id, limit=10)
+
+    def test_invalid_tally_mode(self):
+        # WHEN trying to set an unknown tally mode
+        # THEN it should fail
+        with self.assertRaises(AssertionError):
+            self.voting.update_settings(setting_name="tally_mode", value="sometimes", signer=self.owner)
 
     def test_only_owner_can_update_settings(self):
         # WHEN non-owner tries to change settings
@@ -589,6 +1527,215 @@ def balance_of(account: str):
         settings = self.voting.get_settings()
         self.assertEqual(settings["proposal_fee"], 200)
 
+    def test_update_max_tally_batch(self):
+        # GIVEN the default of no limit
+        self.assertEqual(self.voting.get_settings()["max_tally_batch"], 0)
+
+        # WHEN owner sets a limit
+        self.voting.update_settings(setting_name="max_tally_batch", value=500, signer=self.owner)
+
+        # THEN it should be exposed
+        self.assertEqual(self.voting.get_settings()["max_tally_batch"], 500)
+
+        # AND negative limits should be rejected
+        with self.assertRaises(AssertionError):
+            self.voting.update_settings(setting_name="max_tally_batch", value=-1, signer=self.owner)
+
+    def test_settings_are_read_once_per_call(self):
+        # GIVEN a proposal open for voting
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.approve_proposal_fee(self.test_voters[1])
+
+        # WHEN a proposal is created, a vote is cast and the settings are read under the meter
+        meter = StorageMeter(self.client)
+        meter.call(
+            self.voting,
+            "create_proposal",
+            title="Test Proposal Title That Is Long Enough",
+            description="This is a very detailed description that meets the minimum length requirement. It contains specific details about what the proposal aims to achieve." +
+                        " Adding more context and information to ensure it's comprehensive.",
+            expires_at=(datetime.datetime.now() + datetime.timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"),
+            signer=self.test_voters[1]
+        )
+        meter.call(self.voting, "vote", proposal_id=proposal_id, choice='y', signer=self.test_voters[2])
+        meter.call(self.voting, "get_settings")
+        meter.detach()
+
+        # THEN each call reads the settings record once and never the per-key entries
+        for label in ["create_proposal", "vote", "get_settings"]:
+            self.assertEqual(meter.counts(label, "settings_record"), {"reads": 1, "writes": 0})
+            self.assertEqual(meter.counts(label, "settings"), {"reads": 0, "writes": 0})
+
+    def test_per_key_settings_are_read_until_updated(self):
+        # GIVEN a deployment that still stores one entry per setting
+        self.voting.settings_record.set(None)
+        self.voting.settings["proposal_fee"] = 25
+        self.voting.settings["tally_max_age"] = 60
+
+        # THEN they are read, with defaults for settings they do not have
+        settings = self.voting.get_settings()
+        self.assertEqual((settings["proposal_fee"], settings["tally_max_age"]), (25, 60))
+        self.assertEqual(settings["max_tally_batch"], 0)
+
+        # WHEN one setting is updated
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+
+        # THEN all of them are written to the settings record
+        record = self.voting.settings_record.get()
+        self.assertEqual((record["proposal_fee"], record["tally_mode"], record["version"]), (25, "incremental", 1))
+
+    def test_get_vote_count_pages_large_recounts(self):
+        # GIVEN a proposal with three voters and a tally batch of two
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', 'y']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+        full_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.voting.update_settings(setting_name="max_tally_batch", value=2, signer=self.owner)
+
+        # WHEN the vote count is read
+        first = self.voting.get_vote_count(proposal_id=proposal_id)
+        second = self.voting.get_vote_count(proposal_id=proposal_id, start=first["next_index"])
+
+        # THEN it comes back in pages that add up to the full recount
+        self.assertTrue(first["partial"])
+        self.assertEqual((first["next_index"], first["voter_count"]), (2, 3))
+        self.assertEqual(second["next_index"], 3)
+        summed = {field: first["tally"][field] + second["tally"][field] for field in full_tally}
+        self.assertEqual(summed, full_tally)
+
+    def test_get_vote_count_pages_follow_the_proposal_state(self):
+        # GIVEN a snapshot-weighted proposal with three voters, one of whom moved tokens after voting
+        self.voting.update_settings(setting_name="vote_weighting", value="snapshot", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', 'y']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+        self.currency.transfer(amount=900, to="someone_else", signer=self.test_voters[2])
+        self.voting.update_settings(setting_name="max_tally_batch", value=2, signer=self.owner)
+
+        # WHEN the vote count is read from the start and paged from the third voter
+        stored = self.voting.get_vote_count(proposal_id=proposal_id)
+        first = self.voting.get_vote_count(proposal_id=proposal_id, start=0)
+        page = self.voting.get_vote_count(proposal_id=proposal_id, start=2)
+
+        # THEN the page counts the weight recorded when they voted, like the stored tally
+        self.assertEqual(stored, first)
+        self.assertTrue(page["partial"])
+        self.assertEqual(page["tally"]["pow_for"], self.voting.proposal_vote_weights[proposal_id, self.test_voters[2]])
+
+        # AND once finalized, and once archived, only the final tally is returned
+        expired_env = harness.expired_environment()
+        final_tally = self.voting.finalize_proposal(proposal_id=proposal_id, signer=self.test_voters[0],
+                                                    environment=expired_env)
+        for archived in (False, True):
+            if archived:
+                self.voting.archive_votes(proposal_id=proposal_id, batch_size=10, signer=self.owner)
+            self.assertEqual(self.voting.get_vote_count(proposal_id=proposal_id)["pow_for"], final_tally["pow_for"])
+            with self.assertRaises(AssertionError) as cm:
+                self.voting.get_vote_count(proposal_id=proposal_id, start=2)
+            self.assertIn("Finalized proposals are not paged", str(cm.exception))
+
+    def test_update_current_tallies_in_batches(self):
+        # GIVEN a proposal with three voters and a tally batch of two
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', 'y']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+        full_tally = self.voting.get_vote_count(proposal_id=proposal_id)
+        self.voting.update_settings(setting_name="max_tally_batch", value=2, signer=self.owner)
+
+        # WHEN tallies are updated
+        first = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+
+        # THEN the first call stops after two voters without storing a tally
+        self.assertFalse(first["complete"])
+        self.assertEqual(first["next_index"], 2)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 0)
+
+        # AND the next call completes and stores the recount
+        second = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.assertEqual(second, full_tally)
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 2)
+
+        # AND a vote changed during a batched recount restarts it
+        self.voting.update_settings(setting_name="tally_max_age", value=0, signer=self.owner)
+        self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='-', signer=self.test_voters[1])
+        restarted = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.assertEqual(restarted["next_index"], 2)
+
+    def test_batched_recount_continues_past_new_votes(self):
+        # GIVEN a recount proposal with two voters and a tally batch of one
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[1])
+        self.voting.update_settings(setting_name="max_tally_batch", value=1, signer=self.owner)
+        self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+
+        # WHEN a new voter votes between batches
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[2])
+
+        # THEN the recount continues where it stopped and counts the new voter at the end
+        second = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.assertEqual((second["next_index"], second["voter_count"]), (2, 3))
+        final = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.assertEqual((final["for"], final["against"]), (2, 1))
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 2)
+
+    def test_batched_update_keeps_incremental_tallies_consistent(self):
+        # GIVEN an incremental proposal with three votes and a voter whose balance dropped since voting
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter in self.test_voters:
+            self.voting.vote(proposal_id=proposal_id, choice='y', signer=voter)
+        self.currency.transfer(amount=500, to="someone_else", signer=self.test_voters[1])
+        self.voting.update_settings(setting_name="max_tally_batch", value=2, signer=self.owner)
+
+        # WHEN the first batch reweighs that voter and they change their vote before the next batch
+        first = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.assertFalse(first["complete"])
+        self.voting.vote(proposal_id=proposal_id, choice='n', signer=self.test_voters[1])
+
+        # THEN the stored tallies already match the current balances
+        balances = [self.currency.balances[voter] for voter in self.test_voters]
+        proposal = self.voting.get_proposal(proposal_id=proposal_id)
+        self.assertEqual((proposal["pow_for"], proposal["pow_against"]), (balances[0] + balances[2], balances[1]))
+
+        # AND the last batch completes without changing them
+        final = self.voting.update_current_tallies(proposal_id=proposal_id, signer=self.test_voters[0])
+        self.assertEqual((final["pow_for"], final["pow_against"]), (balances[0] + balances[2], balances[1]))
+        self.assertIsNone(self.voting.tally_progress[proposal_id])
+
+    def test_auto_update_skips_proposals_larger_than_tally_batch(self):
+        # GIVEN automatic updates and a tally batch of one
+        self.voting.update_settings(setting_name="auto_update_tallies", value=1, signer=self.owner)
+        self.voting.update_settings(setting_name="max_tally_batch", value=1, signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+
+        # WHEN a second voter makes the proposal larger than one batch
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[0])
+        self.voting.vote(proposal_id=proposal_id, choice='y', signer=self.test_voters[1])
+
+        # THEN only the first vote updated the stored tallies, and no batched recount was started
+        self.assertEqual(self.voting.get_proposal(proposal_id=proposal_id)["total_for"], 1)
+        self.assertIsNone(self.voting.tally_progress[proposal_id])
+
+    def test_reconcile_tallies_pages_large_recounts(self):
+        # GIVEN an incremental proposal with three voters and a tally batch of two
+        self.voting.update_settings(setting_name="tally_mode", value="incremental", signer=self.owner)
+        proposal_id = self.create_test_proposal(self.test_voters[0])
+        for voter, choice in zip(self.test_voters, ['y', 'n', 'y']):
+            self.voting.vote(proposal_id=proposal_id, choice=choice, signer=voter)
+        self.voting.update_settings(setting_name="max_tally_batch", value=2, signer=self.owner)
+
+        # WHEN the stored tallies are reconciled
+        first = self.voting.reconcile_tallies(proposal_id=proposal_id)
+        second = self.voting.reconcile_tallies(proposal_id=proposal_id, start=first["next_index"])
+
+        # THEN the recount comes back in pages that add up to the stored tallies
+        self.assertTrue(first["partial"])
+        self.assertEqual((first["next_index"], second["next_index"]), (2, 3))
+        summed = {field: first["recount"][field] + second["recount"][field] for field in first["stored"]}
+        self.assertEqual(summed, first["stored"])
+
     def test_create_proposal_with_fee(self):
         # GIVEN a proposal fee is set
         proposal_fee = 50
@@ -769,6 +1916,22 @@ def balance_of(account: str):
                 self.assertTrue("Metadata values must be primitive types" in str(cm.exception) or 
                               "Metadata keys must be strings" in str(cm.exception))
 
+    def test_description_stored_apart_from_proposal_record(self):
+        # WHEN creating a proposal with metadata
+        proposal_id = self.create_test_proposal(self.test_voters[0], metadata={"category": "governance"})
+
+        # THEN the proposal record should only hold the small fields
+        record = self.voting.proposals[proposal_id]
+        self.assertNotIn("description", record)
+        self.assertNotIn("metadata", record)
+        self.assertEqual(record["status"], "active")
+
+        # AND get_proposal should still return the combined view
+        proposal = self.voting.get_proposal(proposal_id=proposal_id)
+        self.assertTrue(proposal["description"].startswith("This is a very detailed description"))
+        self.assertEqual(proposal["metadata"], {"category": "governance"})
+        self.assertEqual(proposal["title"], "Test Proposal Title That Is Long Enough")
+
     def test_create_proposal_with_empty_metadata(self):
         # WHEN creating a proposal with no metadata
         proposal_id = self.create_test_proposal(self.test_voters[0])
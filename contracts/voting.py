@@ -1,11 +1,37 @@
 # State Variables
 owner = Variable()
 current_proposal_id = Variable()  # Track the current proposal ID
-proposals = Hash(default_value=None)
+proposals = Hash(default_value=None)  # Stores small, frequently read proposal fields by proposal_id
+proposal_details = Hash(default_value=None)  # Stores proposal descriptions and metadata by proposal_id
 proposal_votes = Hash(default_value=None)  # Stores voter choices by proposal_id and voter
 proposal_voters = Hash(default_value=None)  # Stores voter addresses by proposal_id and index
 proposal_vote_counts = Hash(default_value=0)  # Stores number of voters per proposal
-proposal_metrics = Hash(default_value=0)  # Stores vote counts and power metrics for proposals
+voter_history = Hash(default_value=None)  # Stores proposal ids by voter and index, in the order first voted on
+voter_history_counts = Hash(default_value=0)  # Stores number of proposals each voter has voted on
+proposal_metrics = Hash(default_value=None)  # Stores packed vote counts then power per choice of each proposal (see METRIC_FIELDS)
+proposal_vote_weights = Hash(default_value=0)  # Stores the weight applied to each voter in incremental and snapshot tallies
+finalization_progress = Hash(default_value=None)  # Stores partial tallies and next voter index while finalizing in batches
+proposal_epochs = Hash(default_value=0)  # Counts votes cast per proposal, including changed votes
+tally_cache = Hash(default_value=None)  # Stores the vote epoch and time at which proposal_metrics were last recounted
+tally_progress = Hash(default_value=None)  # Stores the next voter index of recounts done in batches, with the partial tally of recount proposals
+status_proposals = Hash(default_value=None)  # Stores proposal ids by status and index
+status_counts = Hash(default_value=0)  # Stores number of proposals per status
+proposal_status_index = Hash(default_value=0)  # Stores the index of each proposal within its status list
+expiry_queue = Hash(default_value=None)  # Min-heap of [expires_at, proposal_id] entries, earliest expiry first
+expiry_queue_size = Variable()  # Number of entries in expiry_queue
+proposal_vote_digests = Hash(default_value="0x0")  # Stores an order-independent digest of each proposal's current votes
+proposal_archives = Hash(default_value=None)  # Stores archival progress, then the commitment replacing a finalized proposal's voter entries
+balance_changes = Hash(default_value=None)  # Log of accounts whose currency balance changed, by sequence number
+balance_change_count = Variable()  # Number of entries in balance_changes
+balance_change_start = Variable()  # Index of the first balance_changes entry that has not been pruned
+revalidated_proposals = Hash(default_value=None)  # Stores ids of active revalidated proposals by index
+revalidated_count = Variable()  # Number of entries in revalidated_proposals
+revalidated_index = Hash(default_value=0)  # Stores the index of each active revalidated proposal in revalidated_proposals
+revalidation_cursors = Hash(default_value=0)  # Stores the next balance_changes entry to apply to each revalidated proposal
+choice_voter_counts = Hash(default_value=0)  # Stores the number of voters currently on each choice, by proposal_id and choice
+choice_voters = Hash(default_value=None)  # Stores voter addresses by proposal_id, choice and index within the choice's bucket
+choice_voter_index = Hash(default_value=None)  # Stores each voter's index within the bucket of their current choice
+proposal_options = Hash(default_value=None)  # Stores the option labels of option proposals, kept out of the proposals record
 
 # Events for tracking contract operations
 ProposalCreatedEvent = LogEvent(
@@ -15,7 +41,8 @@ ProposalCreatedEvent = LogEvent(
         "creator": {'type': str, 'idx': True},
         "title": {'type': str},
         "expires_at": {'type': str},
-        "metadata": {'type': str}
+        "metadata": {'type': str},
+        "options": {'type': str}
     }
 )
 
@@ -42,8 +69,47 @@ ProposalFinalizedEvent = LogEvent(
     }
 )
 
-# Configurable parameters stored in a settings hash
-settings = Hash(default_value=None)
+OptionProposalFinalizedEvent = LogEvent(
+    event="OptionProposalFinalized",
+    params={
+        "proposal_id": {'type': str, 'idx': True},
+        "options": {'type': str},
+        "counts": {'type': str},
+        "power": {'type': str}
+    }
+)
+
+VotesArchivedEvent = LogEvent(
+    event="VotesArchived",
+    params={
+        "proposal_id": {'type': str, 'idx': True},
+        "digest": {'type': str},
+        "voter_count": {'type': int}
+    }
+)
+
+# Vote choices of yes/no proposals, in the order their counts and power are packed in proposal_metrics
+VOTE_CHOICES = ["y", "n", "-"]
+METRIC_FIELDS = ["total_for", "total_against", "total_abstain", "pow_for", "pow_against", "pow_abstain"]
+TALLY_FIELDS = ["for", "against", "abstain", "pow_for", "pow_against", "pow_abstain"]
+MAX_OPTIONS = 20
+MAX_OPTION_LENGTH = 64
+VOTE_DIGEST_MODULUS = 2 ** 256
+
+# Configurable parameters, stored together in settings_record so each call reads them once
+SETTINGS_VERSION = 1
+DEFAULT_SETTINGS = {
+    "min_title_length": 10,  # Default minimum title length
+    "max_title_length": 50,  # Default maximum title length
+    "proposal_fee": 100,  # Default proposal fee in currency tokens
+    "auto_update_tallies": False,  # Default to false for gas efficiency
+    "tally_mode": "recount",  # "recount", "incremental" or "revalidate", applied to new proposals
+    "vote_weighting": "finalization",  # "finalization" or "snapshot", applied to new proposals
+    "tally_max_age": 600,  # Seconds a recounted tally is reused while no votes are cast
+    "max_tally_batch": 0  # Most voters counted by one tally call, 0 for no limit
+}
+settings_record = Variable()  # Stores every setting and the record's SETTINGS_VERSION as one dict
+settings = Hash(default_value=None)  # Stores one entry per setting in deployments from before settings_record
 
 """
 TO DO :
@@ -60,12 +126,13 @@ def seed():
     """
     owner.set(ctx.caller)
     current_proposal_id.set(0)  # Initialize proposal ID counter
+    expiry_queue_size.set(0)
+    balance_change_count.set(0)
+    balance_change_start.set(0)
+    revalidated_count.set(0)
     
     # Initialize configurable parameters with default values
-    settings["min_title_length"] = 10  # Default minimum title length
-    settings["max_title_length"] = 50  # Default maximum title length
-    settings["proposal_fee"] = 100  # Default proposal fee in currency tokens
-    settings["auto_update_tallies"] = False  # Default to false for gas efficiency
+    settings_record.set({"version": SETTINGS_VERSION, **DEFAULT_SETTINGS})
 
 
 @export
@@ -86,42 +153,75 @@ def update_settings(setting_name: str, value: Any):
         value: New value for the setting
     """
     assert ctx.caller == owner.get(), "Only owner can change settings"
+
+    current_settings = load_settings()
     
     if setting_name == "title_length_limits":
         assert isinstance(value, list) and len(value) == 2, "Title length limits must be a list of [min, max]"
         min_length, max_length = value
         assert isinstance(min_length, int) and isinstance(max_length, int), "Lengths must be integers"
         assert 0 < min_length <= max_length, "Invalid length values"
-        settings["min_title_length"] = min_length
-        settings["max_title_length"] = max_length
+        current_settings["min_title_length"] = min_length
+        current_settings["max_title_length"] = max_length
     
     elif setting_name == "proposal_fee":
         assert isinstance(value, int) and value >= 0, "Fee must be a non-negative integer"
-        settings["proposal_fee"] = value
+        current_settings["proposal_fee"] = value
     
     elif setting_name == "auto_update_tallies":
         assert isinstance(value, int), "Auto update tallies must be an integer"
-        settings["auto_update_tallies"] = value
+        current_settings["auto_update_tallies"] = value
+    
+    elif setting_name == "tally_mode":
+        assert value in ["recount", "incremental", "revalidate"], "Tally mode must be 'recount', 'incremental' or 'revalidate'"
+        if value == "revalidate":
+            assert balance_listener_registered(), "Revalidated tallies need the currency contract to report balance changes to this contract"
+        current_settings["tally_mode"] = value
+    
+    elif setting_name == "vote_weighting":
+        assert value in ["finalization", "snapshot"], "Vote weighting must be 'finalization' or 'snapshot'"
+        current_settings["vote_weighting"] = value
+    
+    elif setting_name == "tally_max_age":
+        assert isinstance(value, int) and value >= 0, "Tally max age must be a non-negative integer"
+        current_settings["tally_max_age"] = value
+    
+    elif setting_name == "max_tally_batch":
+        assert isinstance(value, int) and value >= 0, "Max tally batch must be a non-negative integer"
+        current_settings["max_tally_batch"] = value
     
     else:
         raise Exception("Invalid setting name")
 
+    settings_record.set(current_settings)
+
 
 @export
 def get_settings():
     """
     Get the current contract settings
     """
-    return {
-        "min_title_length": settings["min_title_length"],
-        "max_title_length": settings["max_title_length"],
-        "proposal_fee": settings["proposal_fee"],
-        "auto_update_tallies": settings["auto_update_tallies"]
-    }
+    current_settings = load_settings()
+    return {name: current_settings[name] for name in DEFAULT_SETTINGS}
+
+
+def load_settings():
+    """
+    Private method reading every setting with a single storage read
+    Settings missing from an older record take their default value. Deployments from before
+    settings_record fall back to their per-key entries until update_settings writes the record
+    """
+    record = settings_record.get()
+    if record is None:
+        record = {"version": SETTINGS_VERSION}
+        for name, default in DEFAULT_SETTINGS.items():
+            value = settings[name]
+            record[name] = default if value is None else value
+    return {**DEFAULT_SETTINGS, **record, "version": SETTINGS_VERSION}
 
 
 @export
-def create_proposal(title: str, description: str, expires_at: str, metadata: dict = None):
+def create_proposal(title: str, description: str, expires_at: str, metadata: dict = None, options: list = None):
     """
     Create a new proposal
     Args:
@@ -129,6 +229,8 @@ def create_proposal(title: str, description: str, expires_at: str, metadata: dic
         description: Detailed description of the proposal (minimum 100 characters)
         expires_at: Datetime string in format 'YYYY-MM-DD HH:MM:SS'
         metadata: Optional dictionary of key-value pairs for additional proposal data
+        options: Optional list of 2 to MAX_OPTIONS distinct labels voters choose from,
+                 instead of 'y', 'n' and '-'
     """
 
     # Check if creator has tokens
@@ -142,12 +244,23 @@ def create_proposal(title: str, description: str, expires_at: str, metadata: dic
         for key, value in metadata.items():
             assert isinstance(key, str), "Metadata keys must be strings"
             assert isinstance(value, (str, int, bool, float)), "Metadata values must be primitive types"
+    if options is not None:
+        assert isinstance(options, list) and 2 <= len(options) <= MAX_OPTIONS, f"Options must be a list of 2 to {MAX_OPTIONS} labels"
+        for option in options:
+            assert isinstance(option, str) and 0 < len(option) <= MAX_OPTION_LENGTH, f"Options must be non-empty strings of at most {MAX_OPTION_LENGTH} characters"
+            # Options are part of storage keys, which cannot hold ':' or '.', and events join them with ','
+            assert ":" not in option and "," not in option and "." not in option, "Options cannot contain ':', ',' or '.'"
+        assert len(set(options)) == len(options), "Options must be distinct"
+
+    current_settings = load_settings()
 
     # Length checking
     assert title != "", "Title cannot be empty"
     title_len = len(title)
-    assert title_len >= settings["min_title_length"], f"Title must be at least {settings['min_title_length']} characters long"
-    assert title_len <= settings["max_title_length"], f"Title must be at most {settings['max_title_length']} characters long"
+    min_title_length = current_settings["min_title_length"]
+    max_title_length = current_settings["max_title_length"]
+    assert title_len >= min_title_length, f"Title must be at least {min_title_length} characters long"
+    assert title_len <= max_title_length, f"Title must be at most {max_title_length} characters long"
     assert description != "", "Description cannot be empty"
     assert len(description) >= 100, "Description must be at least 100 characters long"
 
@@ -156,7 +269,7 @@ def create_proposal(title: str, description: str, expires_at: str, metadata: dic
     assert expiry_datetime > now, "Expiry date must be in the future"
 
     # Handle proposal fee
-    proposal_fee = settings["proposal_fee"]
+    proposal_fee = current_settings["proposal_fee"]
     if proposal_fee > 0:
         # Transfer fee using the currency contract
         currency = importlib.import_module('currency')
@@ -166,28 +279,40 @@ def create_proposal(title: str, description: str, expires_at: str, metadata: dic
     proposal_id = current_proposal_id.get()
     current_proposal_id.set(proposal_id + 1)
 
-    # Store proposal details
-    proposals[proposal_id] = {
+    # Store proposal details, keeping the fields read by vote() and finalization apart from
+    # the description and metadata, which are only needed for display
+    proposal = {
         "title": title,
-        "description": description,
         "creator": ctx.caller,
         "created_at": now,
         "expires_at": expiry_datetime,
         "status": "active",
         "fee_paid": proposal_fee,
+        "tally_mode": current_settings["tally_mode"],
+        "vote_weighting": current_settings["vote_weighting"],
+        "ballot_buckets": True
+    }
+    if options is not None:
+        # The labels are only read by calls that need them, not by every read of the proposal
+        proposal["option_count"] = len(options)
+        proposal_options[proposal_id] = options
+    proposals[proposal_id] = proposal
+    proposal_details[proposal_id] = {
+        "description": description,
         "metadata": metadata or {}  # Store empty dict if no metadata provided
     }
     
     # Initialize vote count
     proposal_vote_counts[proposal_id] = 0
+    if is_revalidated(proposal):
+        # Balance changes logged before the first vote cannot affect this proposal's weights
+        revalidation_cursors[proposal_id] = balance_change_count.get()
+        add_to_revalidated_index(proposal_id)
+    add_to_status_index(proposal_id, "active")
+    push_expiry(expiry_datetime, proposal_id)
     
     # Initialize vote tallies and power in proposal_metrics
-    proposal_metrics[proposal_id, "total_for"] = 0
-    proposal_metrics[proposal_id, "total_against"] = 0
-    proposal_metrics[proposal_id, "total_abstain"] = 0
-    proposal_metrics[proposal_id, "pow_for"] = 0
-    proposal_metrics[proposal_id, "pow_against"] = 0
-    proposal_metrics[proposal_id, "pow_abstain"] = 0
+    store_tally(proposal_id, empty_tally(options or VOTE_CHOICES))
 
     # Emit proposal created event
     ProposalCreatedEvent({
@@ -195,7 +320,8 @@ def create_proposal(title: str, description: str, expires_at: str, metadata: dic
         "creator": ctx.caller,
         "title": title,
         "expires_at": expires_at,
-        "metadata": str(metadata) or str({})
+        "metadata": str(metadata) or str({}),
+        "options": ",".join(options or [])
     })
 
     return proposal_id
@@ -207,14 +333,57 @@ def vote(proposal_id: str, choice: str):
     Vote on a proposal or change an existing vote
     Args:
         proposal_id: The ID of the proposal
-        choice: Vote choice - 'y' for yes, 'n' for no, '-' for abstain
+        choice: Vote choice - 'y' for yes, 'n' for no, '-' for abstain, or one of the
+                labels of a proposal created with options
     """
-    # Check if proposal exists and is active
     proposal = proposals[proposal_id]
+    current_vote = check_vote(proposal_id, proposal, choice)
+    cast_vote(proposal_id, proposal, choice, current_vote, load_settings())
+
+
+@export
+def vote_many(votes: list):
+    """
+    Vote on, or change votes on, several proposals in one transaction
+    Every vote is validated before any of them is recorded
+    Args:
+        votes: List of [proposal_id, choice] pairs, at most one per proposal
+    Returns the number of votes recorded
+    """
+    assert isinstance(votes, list) and len(votes) > 0, "Votes must be a non-empty list"
+
+    checked_votes = []
+    seen_proposals = set()
+    for entry in votes:
+        assert isinstance(entry, (list, tuple)) and len(entry) == 2, "Each vote must be a [proposal_id, choice] pair"
+        proposal_id, choice = entry
+        assert str(proposal_id) not in seen_proposals, "Each proposal can only be voted on once per call"
+        seen_proposals.add(str(proposal_id))
+
+        proposal = proposals[proposal_id]
+        current_vote = check_vote(proposal_id, proposal, choice)
+        checked_votes.append([proposal_id, proposal, choice, current_vote])
+
+    current_settings = load_settings()
+    for proposal_id, proposal, choice, current_vote in checked_votes:
+        cast_vote(proposal_id, proposal, choice, current_vote, current_settings)
+
+    return len(checked_votes)
+
+
+def check_vote(proposal_id: str, proposal: dict, choice: str):
+    """
+    Private method validating a vote by the caller
+    Returns the caller's current choice, or None if they have not voted yet
+    """
+    # Check if proposal exists and is active
     assert proposal is not None, "Proposal does not exist"
     assert proposal["status"] == "active", "Proposal is not active"
     assert now <= proposal["expires_at"], "Proposal voting period has ended"
-    assert choice in ["y", "n", "-"], "Invalid vote choice. Must be 'y', 'n', or '-'"
+    if is_option_proposal(proposal):
+        assert choice in proposal_options[proposal_id], "Invalid vote choice. Must be one of the proposal's options"
+    else:
+        assert choice in VOTE_CHOICES, "Invalid vote choice. Must be 'y', 'n', or '-'"
 
     # Get current vote if exists
     current_vote = proposal_votes[proposal_id, ctx.caller]
@@ -222,14 +391,31 @@ def vote(proposal_id: str, choice: str):
     # If changing vote, verify it's different
     if current_vote is not None:
         assert current_vote != choice, "New vote must be different from current vote"
-    else:
+
+    return current_vote
+
+
+def cast_vote(proposal_id: str, proposal: dict, choice: str, current_vote: str, current_settings: dict):
+    """
+    Private method recording a validated vote by the caller and updating tallies
+    """
+    if current_vote is None:
         # New vote - increment vote count and store voter
         current_vote_count = proposal_vote_counts[proposal_id]
         proposal_voters[proposal_id, current_vote_count] = ctx.caller
         proposal_vote_counts[proposal_id] = current_vote_count + 1
 
-    # Store the vote
+        # Record the proposal in the voter's history
+        history_count = voter_history_counts[ctx.caller]
+        voter_history[ctx.caller, history_count] = proposal_id
+        voter_history_counts[ctx.caller] = history_count + 1
+
+    # Store the vote and mark previously recounted tallies as outdated
     proposal_votes[proposal_id, ctx.caller] = choice
+    proposal_epochs[proposal_id] += 1
+    update_vote_digest(proposal_id, ctx.caller, current_vote, choice)
+    if proposal.get("ballot_buckets"):
+        move_ballot(proposal_id, ctx.caller, current_vote, choice)
 
     # Emit vote event
     VoteEvent({
@@ -239,58 +425,367 @@ def vote(proposal_id: str, choice: str):
         "previous_choice": current_vote if current_vote else ""
     })
 
-    # Update tallies if auto-update is enabled
-    if settings["auto_update_tallies"] > 0:
-        update_current_tallies(proposal_id)
+    # Incremental proposals apply this vote as a delta, otherwise recount if auto-update is enabled,
+    # unless the recount would take more than one batch
+    batch_limit = current_settings["max_tally_batch"]
+    if is_incremental(proposal):
+        apply_vote_delta(proposal_id, proposal, ctx.caller, current_vote, choice)
+    elif current_settings["auto_update_tallies"] > 0 and (not batch_limit or proposal_vote_counts[proposal_id] <= batch_limit):
+        update_tallies(proposal_id, proposal, current_settings)
+
+
+def update_vote_digest(proposal_id: str, voter: str, previous_choice: str, choice: str):
+    """
+    Private method replacing a voter's term in the proposal's vote digest
+    The digest is the sum, modulo 2**256, of sha3("proposal_id:voter:choice") over every current
+    vote, so it depends only on the final set of votes and not on the order they were cast or changed
+    """
+    digest = int(proposal_vote_digests[proposal_id], 16)
+    if previous_choice is not None:
+        digest -= vote_digest_term(proposal_id, voter, previous_choice)
+    digest += vote_digest_term(proposal_id, voter, choice)
+    proposal_vote_digests[proposal_id] = hex(digest % VOTE_DIGEST_MODULUS)
+
+
+def vote_digest_term(proposal_id: str, voter: str, choice: str):
+    """
+    Private method returning the digest term of one vote
+    """
+    return int(hashlib.sha3(str(proposal_id) + ":" + voter + ":" + choice), 16)
+
+
+def move_ballot(proposal_id: str, voter: str, previous_choice: str, choice: str):
+    """
+    Private method moving a voter from the bucket of their previous choice to the bucket of choice
+    """
+    if previous_choice is not None:
+        remove_from_bucket(proposal_id, voter, previous_choice)
+
+    index = choice_voter_counts[proposal_id, choice]
+    choice_voters[proposal_id, choice, index] = voter
+    choice_voter_index[proposal_id, voter] = index
+    choice_voter_counts[proposal_id, choice] = index + 1
+
+
+def remove_from_bucket(proposal_id: str, voter: str, choice: str):
+    """
+    Private method removing a voter from a choice's bucket by moving the bucket's last voter into its place
+    """
+    last_index = choice_voter_counts[proposal_id, choice] - 1
+    index = choice_voter_index[proposal_id, voter]
+    if index != last_index:
+        moved_voter = choice_voters[proposal_id, choice, last_index]
+        choice_voters[proposal_id, choice, index] = moved_voter
+        choice_voter_index[proposal_id, moved_voter] = index
+
+    choice_voters[proposal_id, choice, last_index] = None
+    choice_voter_index[proposal_id, voter] = None
+    choice_voter_counts[proposal_id, choice] = last_index
+
+
+def proposal_choices(proposal_id: str, proposal: dict):
+    """
+    Private method returning a proposal's choices, in the order their counts and power are packed
+    """
+    if is_option_proposal(proposal):
+        return proposal_options[proposal_id]
+    return VOTE_CHOICES
+
+
+def is_option_proposal(proposal: dict):
+    """
+    Private method telling whether a proposal was created with a list of options
+    """
+    return proposal.get("option_count") is not None
+
+
+def is_incremental(proposal: dict):
+    """
+    Private method telling whether a proposal's tallies are maintained by vote()
+    Snapshot-weighted proposals always are, since their running sums are the final tally
+    """
+    return proposal.get("tally_mode") in ["incremental", "revalidate"] or uses_snapshot_weights(proposal)
+
+
+def is_revalidated(proposal: dict):
+    """
+    Private method telling whether a proposal's weights follow the balance change log
+    """
+    return proposal.get("tally_mode") == "revalidate" and not uses_snapshot_weights(proposal)
+
+
+def uses_snapshot_weights(proposal: dict):
+    """
+    Private method telling whether votes are weighted by the balance held when voting
+    """
+    return proposal.get("vote_weighting") == "snapshot"
+
+
+def apply_vote_delta(proposal_id: str, proposal: dict, voter: str, previous_choice: str, choice: str):
+    """
+    Private method to move a single voter's weight between choices in proposal_metrics
+    Removes the weight applied for the previous choice and adds the voter's current balance
+    to the new one, so the cost of a vote does not depend on how many voters came before
+    """
+    token_balances = ForeignHash(foreign_contract="currency", foreign_name="balances")
+
+    metrics = packed_metrics(proposal_id)
+    move_vote_weight(metrics, proposal_choices(proposal_id, proposal), proposal_id, voter, previous_choice, choice, token_balances[voter])
+    proposal_metrics[proposal_id] = metrics
+
+
+def move_vote_weight(metrics: list, choices: list, proposal_id: str, voter: str, previous_choice: str, choice: str,
+                     voter_weight: Any):
+    """
+    Private method replacing the weight applied for a voter's previous choice in packed metrics
+    with voter_weight on choice, and recording it in proposal_vote_weights
+    """
+    choice_count = len(choices)
+
+    previous_weight = proposal_vote_weights[proposal_id, voter]
+    if previous_choice is not None and previous_weight > 0:
+        index = choices.index(previous_choice)
+        metrics[index] -= 1
+        metrics[choice_count + index] -= previous_weight
+
+    # Only count votes from users who currently hold tokens
+    if voter_weight > 0:
+        index = choices.index(choice)
+        metrics[index] += 1
+        metrics[choice_count + index] += voter_weight
+
+    proposal_vote_weights[proposal_id, voter] = voter_weight
+
+
+@export
+def balance_changed(account: str):
+    """
+    Record that an account's currency balance changed
+    Called by the currency contract on every transfer, so revalidated proposals can reweigh
+    only the voters whose balance changed instead of recounting every voter
+    """
+    assert ctx.caller == "currency", "Only the currency contract can report balance changes"
+
+    # Only open revalidated proposals read the log
+    if revalidated_count.get() == 0:
+        return
 
+    index = balance_change_count.get()
+    balance_changes[index] = account
+    balance_change_count.set(index + 1)
 
-def tally_current_votes(proposal_id: str):
+
+@export
+def revalidate_tallies(proposal_id: str, limit: int = 100):
+    """
+    Apply the next balance changes to the tallies of a proposal with tally_mode "revalidate"
+    Each logged account that voted on the proposal is reweighed with its current balance, so the
+    cost follows the number of balance changes rather than the number of voters
+    Args:
+        proposal_id: The ID of the proposal
+        limit: Maximum number of balance change entries to apply in this call
+    Returns the next log index, the number of entries still pending and the stored tally
+    """
+    assert isinstance(limit, int) and limit > 0, "Limit must be a positive integer"
+
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert proposal["status"] == "active", "Proposal is not active"
+    assert is_revalidated(proposal), "Proposal does not revalidate tallies"
+
+    return revalidate_batch(proposal_id, proposal, limit)
+
+
+def revalidate_batch(proposal_id: str, proposal: dict, limit: int):
+    """
+    Private method reweighing the voters of up to limit balance change entries from the proposal's cursor
+    """
+    token_balances = ForeignHash(foreign_contract="currency", foreign_name="balances")
+
+    start = revalidation_cursors[proposal_id]
+    change_count = balance_change_count.get()
+    end = min(start + limit, change_count)
+
+    metrics = packed_metrics(proposal_id)
+    if end > start:
+        choices = proposal_choices(proposal_id, proposal)
+        for i in range(start, end):
+            account = balance_changes[i]
+            choice = proposal_votes[proposal_id, account]
+            if choice is not None:
+                move_vote_weight(metrics, choices, proposal_id, account, choice, choice, token_balances[account])
+        proposal_metrics[proposal_id] = metrics
+        revalidation_cursors[proposal_id] = end
+
+    return {"next_index": end, "pending": change_count - end, "tally": tally_result(proposal_id, proposal, metrics)}
+
+
+def tallies_are_revalidated(proposal_id: str, proposal: dict):
+    """
+    Private method telling whether a revalidated proposal has applied every logged balance change,
+    so its stored tallies match a recount with current balances
+    The log is only complete while the currency contract reports balance changes to this contract
+    """
+    return (is_revalidated(proposal) and revalidation_cursors[proposal_id] == balance_change_count.get() and
+            balance_listener_registered())
+
+
+def balance_listener_registered():
+    """
+    Private method telling whether the currency contract reports balance changes to this contract
+    """
+    listener = ForeignVariable(foreign_contract="currency", foreign_name="balance_listener")
+    return listener.get() == ctx.this
+
+
+@export
+def prune_balance_changes(limit: int = 100):
+    """
+    Delete balance change entries that every active revalidated proposal has already applied
+    Reads the cursor of each active revalidated proposal, then deletes up to limit entries
+    from the start of the log
+    Args:
+        limit: Maximum number of entries to delete in this call
+    Returns the index of the first entry kept, the number of entries deleted and the number kept
+    """
+    assert isinstance(limit, int) and limit > 0, "Limit must be a positive integer"
+
+    start = balance_change_start.get()
+    change_count = balance_change_count.get()
+    applied = change_count
+    for i in range(revalidated_count.get()):
+        applied = min(applied, revalidation_cursors[revalidated_proposals[i]])
+
+    end = max(start, min(start + limit, applied))
+    for i in range(start, end):
+        balance_changes[i] = None
+    balance_change_start.set(end)
+
+    return {"start": end, "pruned": end - start, "remaining": change_count - end}
+
+
+def add_to_revalidated_index(proposal_id: int):
+    """
+    Private method appending a proposal to the index of active revalidated proposals
+    """
+    index = revalidated_count.get()
+    revalidated_proposals[index] = proposal_id
+    revalidated_index[proposal_id] = index
+    revalidated_count.set(index + 1)
+
+
+def remove_from_revalidated_index(proposal_id: int):
+    """
+    Private method removing a proposal from the revalidated index by moving the last entry into its place
+    """
+    last_index = revalidated_count.get() - 1
+    index = revalidated_index[proposal_id]
+    if index != last_index:
+        moved_id = revalidated_proposals[last_index]
+        revalidated_proposals[index] = moved_id
+        revalidated_index[moved_id] = index
+
+    revalidated_proposals[last_index] = None
+    revalidated_index[proposal_id] = None
+    revalidated_count.set(last_index)
+
+
+def tally_current_votes(proposal_id: str, choices: list, rebase_weights: bool = False):
     """
     Private method to calculate current vote counts and power
-    Returns both raw vote counts and power-weighted totals
+    Returns both raw vote counts and power-weighted totals, packed as in proposal_metrics
     Only counts votes from users who currently hold tokens
+    With rebase_weights, the weights used by incremental tallies are reset to current balances
+    """
+    return tally_voter_range(proposal_id, choices, 0, proposal_vote_counts[proposal_id], empty_tally(choices), rebase_weights)
+
+
+def tally_recorded_weights(proposal_id: str, choices: list):
+    """
+    Private method recounting a snapshot-weighted proposal from the weights recorded at vote time
+    """
+    return tally_voter_range(proposal_id, choices, 0, proposal_vote_counts[proposal_id], empty_tally(choices), False, True)
+
+
+def empty_tally(choices: list):
+    """
+    Private method returning a packed tally with no votes counted: a count then a power per choice
+    """
+    return [0] * (2 * len(choices))
+
+
+def tally_voter_range(proposal_id: str, choices: list, start: int, end: int, tally: list, rebase_weights: bool = False,
+                      recorded_weights: bool = False):
+    """
+    Private method adding the votes of voters start..end-1 to a partial packed tally
+    Only counts votes from users who currently hold tokens, or held tokens when voting
+    if recorded_weights is set
     """
     token_balances = ForeignHash(foreign_contract="currency", foreign_name="balances")
-    
-    total_for = 0
-    total_against = 0
-    total_abstain = 0
-    pow_for = 0
-    pow_against = 0
-    pow_abstain = 0
 
-    voter_count = proposal_vote_counts[proposal_id]
-    for i in range(voter_count):
+    tally = list(tally)
+    choice_count = len(choices)
+
+    for i in range(start, end):
         voter = proposal_voters[proposal_id, i]
         vote = proposal_votes[proposal_id, voter]
-        voter_weight = token_balances[voter]
+        if recorded_weights:
+            voter_weight = proposal_vote_weights[proposal_id, voter]
+        else:
+            voter_weight = token_balances[voter]
+        if rebase_weights:
+            proposal_vote_weights[proposal_id, voter] = voter_weight
 
         # Only count votes from users who still have tokens
         if voter_weight > 0:
-            if vote == "y":
-                total_for += 1
-                pow_for += voter_weight
-            elif vote == "n":
-                total_against += 1
-                pow_against += voter_weight
-            else:  # vote == '-'
-                total_abstain += 1
-                pow_abstain += voter_weight
+            index = choices.index(vote)
+            tally[index] += 1
+            tally[choice_count + index] += voter_weight
+
+    return tally
+
+
+def reweigh_voter_range(proposal_id: str, choices: list, start: int, end: int):
+    """
+    Private method moving the weights of voters start..end-1 to their current balances in a copy
+    of the stored tallies of an incremental proposal, keeping proposal_vote_weights in step
+    Returns the updated packed tally, which the caller must store
+    """
+    token_balances = ForeignHash(foreign_contract="currency", foreign_name="balances")
+
+    metrics = packed_metrics(proposal_id)
+    for i in range(start, end):
+        voter = proposal_voters[proposal_id, i]
+        choice = proposal_votes[proposal_id, voter]
+        move_vote_weight(metrics, choices, proposal_id, voter, choice, choice, token_balances[voter])
+
+    return metrics
+
+
+def tally_result(proposal_id: str, proposal: dict, tally: list):
+    """
+    Private method presenting a packed tally: the for/against/abstain counts and power of
+    yes/no proposals, or the counts and power per option, in the order of "options"
+    """
+    if not is_option_proposal(proposal):
+        return dict(zip(TALLY_FIELDS, tally))
 
+    options = proposal_options[proposal_id]
     return {
-        "for": total_for,
-        "against": total_against,
-        "abstain": total_abstain,
-        "pow_for": pow_for,
-        "pow_against": pow_against,
-        "pow_abstain": pow_abstain
+        "options": options,
+        "counts": tally[:len(options)],
+        "power": tally[len(options):]
     }
 
 
 @export
 def finalize_proposal(proposal_id: str):
     """
-    Calculate final vote tallies after proposal expiry using current token balances
+    Calculate final vote tallies after proposal expiry using current token balances,
+    or the balances recorded at vote time for snapshot-weighted proposals
+    Continues from any progress made by finalize_step, counting at most max_tally_batch voters
+    Returns the tally with the progress: "finalized" stays False until a later call counts
+    the last voter, and "next_index" and "voter_count" show how far the count got
     """
         
     proposal = proposals[proposal_id]
@@ -298,104 +793,816 @@ def finalize_proposal(proposal_id: str):
     assert now > proposal["expires_at"], "Proposal voting period has not ended"
     assert proposal["status"] == "active", "Proposal already finalized"
 
-    # Get final vote tallies
-    final_tally = tally_current_votes(proposal_id)
+    # Count the remaining voters, one batch at a time when max_tally_batch is set
+    batch_limit = load_settings()["max_tally_batch"]
+    progress = finalize_batch(proposal_id, proposal, batch_limit or proposal_vote_counts[proposal_id])
+
+    return {
+        **progress["tally"],
+        "finalized": progress["finalized"],
+        "next_index": progress["next_index"],
+        "voter_count": progress["voter_count"]
+    }
+
+
+@export
+def finalize_step(proposal_id: str, batch_size: int):
+    """
+    Count the next batch of voters towards the final tally of an expired proposal
+    Partial tallies and the next voter index are kept in contract state, so anyone can call
+    this repeatedly until the last batch finalizes the proposal
+    Args:
+        proposal_id: The ID of the proposal
+        batch_size: Maximum number of voters to count in this call
+    """
+    assert isinstance(batch_size, int) and batch_size > 0, "Batch size must be a positive integer"
+
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert now > proposal["expires_at"], "Proposal voting period has not ended"
+    assert proposal["status"] == "active", "Proposal already finalized"
+
+    return finalize_batch(proposal_id, proposal, batch_size)
+
+
+def finalize_batch(proposal_id: str, proposal: dict, batch_size: int):
+    """
+    Private method counting up to batch_size voters from the stored finalization progress
+    Finalizes the proposal once every voter has been counted
+    Returns the progress, including the tally counted so far
+    """
+    voter_count = proposal_vote_counts[proposal_id]
+    choices = proposal_choices(proposal_id, proposal)
+
+    if uses_snapshot_weights(proposal) or tallies_are_revalidated(proposal_id, proposal):
+        # Running sums kept by vote(), and by revalidate_tallies, already hold the final tally
+        start = voter_count
+        end = voter_count
+        tally = packed_metrics(proposal_id)
+    else:
+        progress = finalization_progress[proposal_id]
+        if progress is None:
+            progress = {"next_index": 0, "tally": empty_tally(choices)}
+        elif isinstance(progress["tally"], dict):
+            # Progress saved before tallies were packed
+            progress["tally"] = [progress["tally"][field] for field in TALLY_FIELDS]
+
+        start = progress["next_index"]
+        end = min(start + batch_size, voter_count)
+        tally = tally_voter_range(proposal_id, choices, start, end, progress["tally"])
+
+    if end < voter_count:
+        finalization_progress[proposal_id] = {"next_index": end, "tally": tally}
+        return {"finalized": False, "next_index": end, "voter_count": voter_count, "counted": end - start,
+                "tally": tally_result(proposal_id, proposal, tally)}
+
+    finalization_progress[proposal_id] = None
 
     # Store final tallies in proposal_metrics
-    proposal_metrics[proposal_id, "total_for"] = final_tally["for"]
-    proposal_metrics[proposal_id, "total_against"] = final_tally["against"]
-    proposal_metrics[proposal_id, "total_abstain"] = final_tally["abstain"]
-    proposal_metrics[proposal_id, "pow_for"] = final_tally["pow_for"]
-    proposal_metrics[proposal_id, "pow_against"] = final_tally["pow_against"]
-    proposal_metrics[proposal_id, "pow_abstain"] = final_tally["pow_abstain"]
+    store_tally(proposal_id, tally)
 
     # Update proposal status
     proposal["status"] = "finalized"
     proposals[proposal_id] = proposal
+    remove_from_status_index(proposal_id, "active")
+    add_to_status_index(proposal_id, "finalized")
+    if is_revalidated(proposal):
+        remove_from_revalidated_index(proposal_id)
+        revalidation_cursors[proposal_id] = None
 
     # Emit finalized event
-    ProposalFinalizedEvent({
-        "proposal_id": str(proposal_id),
-        "total_for": final_tally["for"],
-        "total_against": final_tally["against"],
-        "total_abstain": final_tally["abstain"],
-        "pow_for": final_tally["pow_for"],
-        "pow_against": final_tally["pow_against"],
-        "pow_abstain": final_tally["pow_abstain"]
-    })
+    if not is_option_proposal(proposal):
+        ProposalFinalizedEvent({
+            "proposal_id": str(proposal_id),
+            "total_for": tally[0],
+            "total_against": tally[1],
+            "total_abstain": tally[2],
+            "pow_for": tally[3],
+            "pow_against": tally[4],
+            "pow_abstain": tally[5]
+        })
+    else:
+        option_count = len(choices)
+        OptionProposalFinalizedEvent({
+            "proposal_id": str(proposal_id),
+            "options": ",".join(choices),
+            "counts": ",".join([str(value) for value in tally[:option_count]]),
+            "power": ",".join([str(value) for value in tally[option_count:]])
+        })
 
-    return final_tally
+    return {"finalized": True, "next_index": end, "voter_count": voter_count, "counted": end - start,
+            "tally": tally_result(proposal_id, proposal, tally)}
+
+
+@export
+def finalize_expired(limit: int, batch_size: int = 1000):
+    """
+    Finalize expired proposals in order of expiry, in a single transaction
+    Args:
+        limit: Maximum number of expiry queue entries to process, including entries of
+               proposals that were already finalized directly
+        batch_size: Maximum number of voters to count across all proposals in this call;
+                    a proposal with more voters is counted in part and completed by a later call
+    Returns the ids of the proposals finalized
+    """
+    assert isinstance(limit, int) and limit > 0, "Limit must be a positive integer"
+    assert isinstance(batch_size, int) and batch_size > 0, "Batch size must be a positive integer"
+
+    finalized_ids = []
+    remaining_batch = batch_size
+    for i in range(limit):
+        if expiry_queue_size.get() == 0:
+            break
+
+        expires_at, proposal_id = expiry_queue[0]
+        if now <= expires_at:
+            break
+
+        proposal = proposals[proposal_id]
+        if proposal["status"] == "active":
+            progress = finalize_batch(proposal_id, proposal, remaining_batch)
+            remaining_batch -= progress["counted"]
+            if not progress["finalized"]:
+                break
+            finalized_ids.append(proposal_id)
+
+        pop_expiry()
+
+    return finalized_ids
+
+
+@export
+def archive_votes(proposal_id: str, batch_size: int):
+    """
+    Replace the per-voter entries of a finalized proposal with a compact commitment
+    Each call folds the next batch of voters, in voting order, into a hash chain and removes
+    their proposal_voters, proposal_votes and proposal_vote_weights entries, so a large
+    proposal can be archived over several calls
+    The finished archive keeps the digest and the number of ballots per choice, enough to
+    verify an off-chain copy of the voter roll exported with get_voters beforehand
+    Args:
+        proposal_id: The ID of the proposal
+        batch_size: Maximum number of voters to archive in this call
+    Returns the archive record
+    """
+    assert ctx.caller == owner.get(), "Only owner can archive votes"
+    assert isinstance(batch_size, int) and batch_size > 0, "Batch size must be a positive integer"
+
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert proposal["status"] == "finalized", "Proposal is not finalized"
+
+    archive = proposal_archives[proposal_id]
+    if archive is None:
+        archive = {
+            "complete": False,
+            "next_index": 0,
+            "voter_count": proposal_vote_counts[proposal_id],
+            "digest": "",
+            "ballots": {choice: 0 for choice in proposal_choices(proposal_id, proposal)}
+        }
+    assert not archive["complete"], "Votes are already archived"
+
+    start = archive["next_index"]
+    end = min(start + batch_size, archive["voter_count"])
+    digest = archive["digest"]
+    ballots = archive["ballots"]
+
+    for i in range(start, end):
+        voter = proposal_voters[proposal_id, i]
+        choice = proposal_votes[proposal_id, voter]
+        digest = archive_link(digest, voter, choice)
+        ballots[choice] += 1
+
+        proposal_voters[proposal_id, i] = None
+        proposal_votes[proposal_id, voter] = None
+        proposal_vote_weights[proposal_id, voter] = None
+        if proposal.get("ballot_buckets"):
+            choice_voters[proposal_id, choice, choice_voter_index[proposal_id, voter]] = None
+            choice_voter_index[proposal_id, voter] = None
+
+    archive["next_index"] = end
+    archive["digest"] = digest
+    archive["ballots"] = ballots
+    archive["complete"] = end == archive["voter_count"]
+    proposal_archives[proposal_id] = archive
+
+    if archive["complete"]:
+        VotesArchivedEvent({
+            "proposal_id": str(proposal_id),
+            "digest": digest,
+            "voter_count": archive["voter_count"]
+        })
+
+    return archive
+
+
+def archive_link(digest: str, voter: str, choice: str):
+    """
+    Private method extending an archive hash chain by one voter
+    """
+    return hashlib.sha3(digest + ":" + voter + ":" + choice)
 
 
 @export
 def get_proposal(proposal_id: str):
     """
-    Get proposal details including current metrics
+    Get proposal details including description, metadata, current metrics and vote digest
     """
     proposal = proposals[proposal_id]
     assert proposal is not None, "Proposal does not exist"
     
-    # Add metrics to the proposal data
+    # Proposals stored before descriptions were split out have no separate details
+    details = proposal_details[proposal_id] or {}
+
+    # Add details and metrics to the proposal data
+    metrics = packed_metrics(proposal_id)
+    if is_option_proposal(proposal):
+        metric_data = tally_result(proposal_id, proposal, metrics)
+    else:
+        metric_data = dict(zip(METRIC_FIELDS, metrics))
+
     proposal_data = {
         **proposal,
-        "total_for": proposal_metrics[proposal_id, "total_for"],
-        "total_against": proposal_metrics[proposal_id, "total_against"],
-        "total_abstain": proposal_metrics[proposal_id, "total_abstain"],
-        "pow_for": proposal_metrics[proposal_id, "pow_for"],
-        "pow_against": proposal_metrics[proposal_id, "pow_against"],
-        "pow_abstain": proposal_metrics[proposal_id, "pow_abstain"]
+        **details,
+        **metric_data,
+        "vote_digest": proposal_vote_digests[proposal_id]
     }
+
+    archive = proposal_archives[proposal_id]
+    if archive is not None:
+        proposal_data["archive"] = archive
     
     return proposal_data
 
 
 @export
-def get_vote_count(proposal_id: str):
+def get_vote_count(proposal_id: str, start: int = 0):
     """
     Get the current vote count for a proposal
+    Stored tallies are returned when they are final, snapshot-weighted, fully revalidated or
+    recently recounted
+    A recount of more voters than the max_tally_batch setting returns one page instead:
+    the tally of voters start..next_index-1 under "tally", with "partial" set. Callers add up
+    the pages, passing next_index as start until it reaches voter_count
+    Pages of snapshot-weighted proposals count recorded weights, as their stored tallies do.
+    Finalized proposals only return their final tally, so start must be 0
+    Args:
+        proposal_id: The ID of the proposal
+        start: Index of the first voter to count when paging through a recount
     """
+    assert isinstance(start, int) and start >= 0, "Start must be a non-negative integer"
+
     proposal = proposals[proposal_id]
     assert proposal is not None, "Proposal does not exist"
+    assert start == 0 or proposal["status"] == "active", "Finalized proposals are not paged, start must be 0"
 
-    if proposal["status"] == "finalized":
-        return {
-            "for": proposal_metrics[proposal_id, "total_for"],
-            "against": proposal_metrics[proposal_id, "total_against"],
-            "abstain": proposal_metrics[proposal_id, "total_abstain"],
-            "pow_for": proposal_metrics[proposal_id, "pow_for"],
-            "pow_against": proposal_metrics[proposal_id, "pow_against"],
-            "pow_abstain": proposal_metrics[proposal_id, "pow_abstain"]
-        }
-    else:
+    current_settings = load_settings()
+    if start == 0 and (proposal["status"] == "finalized" or uses_snapshot_weights(proposal) or
+                       tallies_are_revalidated(proposal_id, proposal) or
+                       tallies_are_fresh(proposal_id, current_settings["tally_max_age"])):
+        return stored_tally(proposal_id, proposal)
+
+    choices = proposal_choices(proposal_id, proposal)
+    voter_count = proposal_vote_counts[proposal_id]
+    batch_limit = current_settings["max_tally_batch"]
+    if start == 0 and (not batch_limit or voter_count <= batch_limit):
         # Get current vote counts and power
-        current_tally = tally_current_votes(proposal_id)
-        return current_tally
+        current_tally = tally_current_votes(proposal_id, choices)
+        return tally_result(proposal_id, proposal, current_tally)
+
+    assert start <= voter_count, "Start is past the last voter"
+    end = min(start + (batch_limit or voter_count), voter_count)
+    return {
+        "partial": True,
+        "start": start,
+        "next_index": end,
+        "voter_count": voter_count,
+        "tally": tally_result(proposal_id, proposal, tally_voter_range(proposal_id, choices, start, end, empty_tally(choices),
+                                                          recorded_weights=uses_snapshot_weights(proposal)))
+    }
 
 
 @export
 def update_current_tallies(proposal_id: str):
     """
     Calculate and update current vote tallies in the proposal hash
+    Skips the recount if no vote was cast since the last one and it is under tally_max_age seconds old
     Returns the current tallies
+    A recount of more voters than the max_tally_batch setting is done over several calls, each
+    counting the next batch and returning "complete" set to False until the last one
+    Recount proposals keep the partial tally in contract state. Voters who vote for the first
+    time between calls are counted when the recount reaches them, while a changed vote restarts it
+    Incremental proposals instead reweigh each voter of the batch in the stored tallies, so votes
+    cast between calls are applied by vote() as usual
+    """
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert proposal["status"] == "active", "Proposal is not active"
+
+    return update_tallies(proposal_id, proposal, load_settings())
+
+
+def update_tallies(proposal_id: str, proposal: dict, current_settings: dict):
+    """
+    Private method behind update_current_tallies, also used by vote() when auto_update_tallies is on
     """
     token_balances = ForeignHash(foreign_contract="currency", foreign_name="balances")
     
     # Check if caller has tokens
     assert token_balances[ctx.caller] > 0, "Must have tokens to update tallies"
-    
+
+    # Snapshot-weighted tallies are kept current by vote(), and a fresh recount can be reused
+    if uses_snapshot_weights(proposal) or tallies_are_fresh(proposal_id, current_settings["tally_max_age"]):
+        return stored_tally(proposal_id, proposal)
+
+    batch_limit = current_settings["max_tally_batch"]
+
+    # Revalidated tallies only need the balance changes logged since they were last updated
+    if is_revalidated(proposal) and balance_listener_registered():
+        pending = balance_change_count.get() - revalidation_cursors[proposal_id]
+        progress = revalidate_batch(proposal_id, proposal, min(pending, batch_limit or pending))
+        if progress["pending"] > 0:
+            return {"complete": False, **progress}
+        return progress["tally"]
+
+    choices = proposal_choices(proposal_id, proposal)
+    voter_count = proposal_vote_counts[proposal_id]
+    if batch_limit and voter_count > batch_limit and is_incremental(proposal):
+        # Stored tallies are reweighed in place, so they stay in step with the weights vote() moves
+        progress = tally_progress[proposal_id]
+        start = 0 if progress is None else progress["next_index"]
+        end = min(start + batch_limit, voter_count)
+        current_tally = reweigh_voter_range(proposal_id, choices, start, end)
+
+        if end < voter_count:
+            store_tally(proposal_id, current_tally)
+            tally_progress[proposal_id] = {"next_index": end}
+            return {"complete": False, "next_index": end, "voter_count": voter_count,
+                    "tally": tally_result(proposal_id, proposal, current_tally)}
+
+        tally_progress[proposal_id] = None
+    elif batch_limit and voter_count > batch_limit:
+        # Every vote adds one to the epoch, so votes beyond the voter count are changed votes
+        changed_votes = proposal_epochs[proposal_id] - voter_count
+        progress = tally_progress[proposal_id]
+        if progress is None or progress.get("changed_votes") != changed_votes:
+            progress = {"changed_votes": changed_votes, "next_index": 0, "tally": empty_tally(choices)}
+
+        start = progress["next_index"]
+        end = min(start + batch_limit, voter_count)
+        current_tally = tally_voter_range(proposal_id, choices, start, end, progress["tally"])
+
+        if end < voter_count:
+            progress["next_index"] = end
+            progress["tally"] = current_tally
+            tally_progress[proposal_id] = progress
+            return {"complete": False, "next_index": end, "voter_count": voter_count,
+                    "tally": tally_result(proposal_id, proposal, current_tally)}
+
+        tally_progress[proposal_id] = None
+    else:
+        # Get current tallies, resetting the weights behind incremental tallies to match
+        current_tally = tally_current_votes(proposal_id, choices, is_incremental(proposal))
+
+    # Update proposal tallies in proposal_metrics
+    store_tally(proposal_id, current_tally)
+    tally_cache[proposal_id] = {"epoch": proposal_epochs[proposal_id], "computed_at": now}
+
+    return tally_result(proposal_id, proposal, current_tally)
+
+
+@export
+def reconcile_tallies(proposal_id: str, start: int = 0):
+    """
+    Compare the stored tallies against a full recount using current token balances,
+    or the balances recorded at vote time for snapshot-weighted proposals
+    Lets operators check incrementally maintained tallies without modifying them;
+    update_current_tallies applies the recount
+    A recount of more voters than the max_tally_batch setting returns one page instead, as
+    get_vote_count does: the stored tallies and the recount of voters start..next_index-1, with
+    "partial" set. Callers add up the pages and compare the sum with "stored"
+    Args:
+        proposal_id: The ID of the proposal
+        start: Index of the first voter to count when paging through a recount
+    """
+    assert isinstance(start, int) and start >= 0, "Start must be a non-negative integer"
+
     proposal = proposals[proposal_id]
     assert proposal is not None, "Proposal does not exist"
-    assert proposal["status"] == "active", "Proposal is not active"
+    assert proposal_archives[proposal_id] is None, "Votes of this proposal have been archived"
 
-    # Get current tallies
-    current_tally = tally_current_votes(proposal_id)
+    choices = proposal_choices(proposal_id, proposal)
+    stored = stored_tally(proposal_id, proposal)
+    voter_count = proposal_vote_counts[proposal_id]
+    batch_limit = load_settings()["max_tally_batch"]
+    if start > 0 or (batch_limit and voter_count > batch_limit):
+        assert start <= voter_count, "Start is past the last voter"
+        end = min(start + (batch_limit or voter_count), voter_count)
+        page = tally_voter_range(proposal_id, choices, start, end, empty_tally(choices), False,
+                                 uses_snapshot_weights(proposal))
+        return {
+            "partial": True,
+            "start": start,
+            "next_index": end,
+            "voter_count": voter_count,
+            "stored": stored,
+            "recount": tally_result(proposal_id, proposal, page)
+        }
 
-    # Update proposal tallies in proposal_metrics
-    proposal_metrics[proposal_id, "total_for"] = current_tally["for"]
-    proposal_metrics[proposal_id, "total_against"] = current_tally["against"]
-    proposal_metrics[proposal_id, "total_abstain"] = current_tally["abstain"]
-    proposal_metrics[proposal_id, "pow_for"] = current_tally["pow_for"]
-    proposal_metrics[proposal_id, "pow_against"] = current_tally["pow_against"]
-    proposal_metrics[proposal_id, "pow_abstain"] = current_tally["pow_abstain"]
-
-    return current_tally
+    if uses_snapshot_weights(proposal):
+        recount = tally_result(proposal_id, proposal, tally_recorded_weights(proposal_id, choices))
+    else:
+        recount = tally_result(proposal_id, proposal, tally_current_votes(proposal_id, choices))
+
+    return {
+        "stored": stored,
+        "recount": recount,
+        "in_sync": stored == recount
+    }
+
+
+@export
+def get_ballot_counts(proposal_id: str):
+    """
+    Get the number of voters currently on each choice of a proposal from per-choice counters,
+    without reading any voter's entries
+    Unlike total_for, total_against and total_abstain, these include voters who hold no tokens
+    """
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert proposal.get("ballot_buckets"), "Proposal has no per-choice voter buckets"
+
+    return {choice: choice_voter_counts[proposal_id, choice] for choice in proposal_choices(proposal_id, proposal)}
+
+
+@export
+def tally_choice(proposal_id: str, choice: str, start: int = 0):
+    """
+    Count the voting power on one choice by reading only that choice's voter bucket, for example
+    to recompute pow_for alone
+    Uses current token balances, or the balances recorded at vote time for snapshot-weighted
+    proposals. At most max_tally_batch voters are read per call; callers add up the pages,
+    passing next_index as start until it reaches ballots
+    Args:
+        proposal_id: The ID of the proposal
+        choice: The choice to count
+        start: Index within the choice's bucket of the first voter to count
+    Returns the number of ballots on the choice, the range counted, and the number and power
+    of the voters in that range who hold tokens
+    """
+    assert isinstance(start, int) and start >= 0, "Start must be a non-negative integer"
+
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert choice in proposal_choices(proposal_id, proposal), "Invalid vote choice"
+    assert proposal.get("ballot_buckets"), "Proposal has no per-choice voter buckets"
+    assert proposal_archives[proposal_id] is None, "Votes of this proposal have been archived"
+
+    token_balances = ForeignHash(foreign_contract="currency", foreign_name="balances")
+    recorded_weights = uses_snapshot_weights(proposal)
+
+    ballots = choice_voter_counts[proposal_id, choice]
+    batch_limit = load_settings()["max_tally_batch"]
+    end = min(start + (batch_limit or ballots), ballots)
+
+    count = 0
+    power = 0
+    for i in range(start, end):
+        voter = choice_voters[proposal_id, choice, i]
+        if recorded_weights:
+            voter_weight = proposal_vote_weights[proposal_id, voter]
+        else:
+            voter_weight = token_balances[voter]
+        if voter_weight > 0:
+            count += 1
+            power += voter_weight
+
+    return {
+        "choice": choice,
+        "ballots": ballots,
+        "start": start,
+        "next_index": max(start, end),
+        "count": count,
+        "power": power
+    }
+
+
+def stored_tally(proposal_id: str, proposal: dict):
+    """
+    Private method to read the tallies currently stored in proposal_metrics
+    """
+    return tally_result(proposal_id, proposal, packed_metrics(proposal_id))
+
+
+def store_tally(proposal_id: str, tally: list):
+    """
+    Private method to store a packed tally in proposal_metrics as a single record
+    """
+    proposal_metrics[proposal_id] = tally
+
+
+def packed_metrics(proposal_id: str):
+    """
+    Private method to read the packed metrics of a proposal
+    Falls back to the per-field entries used before metrics were packed
+    """
+    metrics = proposal_metrics[proposal_id]
+    if metrics is None:
+        metrics = [proposal_metrics[proposal_id, field] or 0 for field in METRIC_FIELDS]
+    return metrics
+
+
+@export
+def migrate_metrics(proposal_id: str):
+    """
+    Pack the per-field metrics of a proposal created before metrics were packed into a single
+    record and remove the per-field entries
+    """
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert proposal_metrics[proposal_id] is None, "Metrics are already packed"
+
+    proposal_metrics[proposal_id] = packed_metrics(proposal_id)
+    for field in METRIC_FIELDS:
+        proposal_metrics[proposal_id, field] = None
+
+    return stored_tally(proposal_id, proposal)
+
+
+def tallies_are_fresh(proposal_id: str, tally_max_age: int):
+    """
+    Private method telling whether the stored tallies can be returned without a recount
+    They must have been recounted since the last vote, and less than tally_max_age seconds ago,
+    since voting weight follows balances that can change without a vote being cast
+    """
+    cache = tally_cache[proposal_id]
+    if cache is None or cache["epoch"] != proposal_epochs[proposal_id]:
+        return False
+    return now - cache["computed_at"] < datetime.timedelta(seconds=tally_max_age)
+
+
+@export
+def list_proposals(status: str, offset: int = 0, limit: int = 20):
+    """
+    List compact summaries of proposals with a given status, without descriptions or metadata
+    Args:
+        status: "active" or "finalized"
+        offset: Index of the first proposal to return
+        limit: Maximum number of proposals to return (at most 100)
+    Active proposals are not kept in creation order, since finalizing one moves the last
+    active proposal into its place
+    """
+    assert status in ["active", "finalized"], "Status must be 'active' or 'finalized'"
+    assert isinstance(offset, int) and offset >= 0, "Offset must be a non-negative integer"
+    assert isinstance(limit, int) and 0 < limit <= 100, "Limit must be between 1 and 100"
+
+    total = status_counts[status]
+    summaries = []
+    for i in range(offset, min(offset + limit, total)):
+        proposal_id = status_proposals[status, i]
+        proposal = proposals[proposal_id]
+        summaries.append({
+            "proposal_id": proposal_id,
+            "title": proposal["title"],
+            "creator": proposal["creator"],
+            "created_at": proposal["created_at"],
+            "expires_at": proposal["expires_at"],
+            "status": proposal["status"],
+            "voters": proposal_vote_counts[proposal_id],
+            **stored_tally(proposal_id, proposal)
+        })
+
+    return {
+        "total": total,
+        "offset": offset,
+        "proposals": summaries
+    }
+
+
+@export
+def index_legacy_proposal(proposal_id: str):
+    """
+    Add a proposal created before proposals were indexed by status to the index of its status,
+    so that list_proposals includes it. Anyone can call this, once per proposal
+    Active proposals are also added to the expiry queue, so that finalize_expired reaches them
+    """
+    proposal = proposals[proposal_id]
+    assert proposal is not None, "Proposal does not exist"
+    assert not in_status_index(proposal_id, proposal["status"]), "Proposal is already indexed"
+
+    add_to_status_index(proposal_id, proposal["status"])
+    if proposal["status"] == "active":
+        push_expiry(proposal["expires_at"], proposal_id)
+
+    return {"proposal_id": proposal_id, "status": proposal["status"]}
+
+
+def in_status_index(proposal_id: int, status: str):
+    """
+    Private method telling whether a proposal is in the index of a status
+    Proposals created before the index existed are not
+    """
+    index = proposal_status_index[proposal_id]
+    return index < status_counts[status] and status_proposals[status, index] == proposal_id
+
+
+def add_to_status_index(proposal_id: int, status: str):
+    """
+    Private method appending a proposal to the index of proposals with a given status
+    """
+    index = status_counts[status]
+    status_proposals[status, index] = proposal_id
+    proposal_status_index[proposal_id] = index
+    status_counts[status] = index + 1
+
+
+def remove_from_status_index(proposal_id: int, status: str):
+    """
+    Private method removing a proposal from a status index by moving the last entry into its place
+    Does nothing for proposals that were never indexed
+    """
+    if not in_status_index(proposal_id, status):
+        return
+
+    last_index = status_counts[status] - 1
+    index = proposal_status_index[proposal_id]
+    if index != last_index:
+        moved_id = status_proposals[status, last_index]
+        status_proposals[status, index] = moved_id
+        proposal_status_index[moved_id] = index
+
+    status_proposals[status, last_index] = None
+    status_counts[status] = last_index
+
+
+def push_expiry(expires_at: datetime.datetime, proposal_id: int):
+    """
+    Private method adding a proposal to the expiry queue
+    """
+    index = expiry_queue_size.get()
+    expiry_queue_size.set(index + 1)
+
+    # Move later-expiring parents down until the new entry is in place
+    while index > 0:
+        parent_index = (index - 1) // 2
+        parent = expiry_queue[parent_index]
+        if parent[0] <= expires_at:
+            break
+        expiry_queue[index] = parent
+        index = parent_index
+
+    expiry_queue[index] = [expires_at, proposal_id]
+
+
+def pop_expiry():
+    """
+    Private method removing the earliest-expiring entry from the expiry queue
+    """
+    size = expiry_queue_size.get() - 1
+    last = expiry_queue[size]
+    expiry_queue[size] = None
+    expiry_queue_size.set(size)
+
+    if size == 0:
+        return
+
+    # Move earlier-expiring children up until the last entry fits
+    index = 0
+    child_index = 1
+    while child_index < size:
+        child = expiry_queue[child_index]
+        if child_index + 1 < size:
+            sibling = expiry_queue[child_index + 1]
+            if sibling[0] < child[0]:
+                child_index += 1
+                child = sibling
+        if last[0] <= child[0]:
+            break
+        expiry_queue[index] = child
+        index = child_index
+        child_index = 2 * index + 1
+
+    expiry_queue[index] = last
+
+
+@export
+def get_voter_history(voter: str, offset: int = 0, limit: int = 20):
+    """
+    List the proposals a voter has voted on, with their current choice
+    Choices on proposals whose votes have been archived read as the archive marker
+    Args:
+        voter: Address of the voter
+        offset: Index of the first entry to return
+        limit: Maximum number of entries to return (at most 100)
+    """
+    assert isinstance(offset, int) and offset >= 0, "Offset must be a non-negative integer"
+    assert isinstance(limit, int) and 0 < limit <= 100, "Limit must be between 1 and 100"
+
+    total = voter_history_counts[voter]
+    votes = []
+    for i in range(offset, min(offset + limit, total)):
+        proposal_id = voter_history[voter, i]
+        votes.append({
+            "proposal_id": proposal_id,
+            "choice": recorded_choice(proposal_id, voter, True)
+        })
+
+    return {
+        "total": total,
+        "offset": offset,
+        "votes": votes
+    }
+
+
+@export
+def get_voters(proposal_id: str, start: int = 0, count: int = 100):
+    """
+    Export a page of a proposal's voter roll
+    Args:
+        proposal_id: The ID of the proposal
+        start: Index of the first voter to return
+        count: Maximum number of voters to return (at most 500)
+    Returns the total number of voters and [index, voter, choice] entries in voting order
+    """
+    assert proposals[proposal_id] is not None, "Proposal does not exist"
+    assert proposal_archives[proposal_id] is None, "Votes of this proposal have been archived"
+    assert isinstance(start, int) and start >= 0, "Start must be a non-negative integer"
+    assert isinstance(count, int) and 0 < count <= 500, "Count must be between 1 and 500"
+
+    total = proposal_vote_counts[proposal_id]
+    voters = []
+    for i in range(start, min(start + count, total)):
+        voter = proposal_voters[proposal_id, i]
+        voters.append([i, voter, proposal_votes[proposal_id, voter]])
+
+    return {
+        "total": total,
+        "start": start,
+        "voters": voters
+    }
+
+
+@export
+def get_choices(proposal_id: str, voters: list):
+    """
+    Get the current choices of several voters on one proposal
+    Args:
+        proposal_id: The ID of the proposal
+        voters: Addresses to look up (at most 500)
+    Returns a dict mapping each address to its choice, or None if it has not voted
+    Once the proposal's votes have been archived, addresses that have voted on any proposal map
+    to the archive marker, with "voted" set to "unknown"
+    """
+    assert isinstance(voters, list) and len(voters) <= 500, "Voters must be a list of at most 500 addresses"
+
+    choices = {}
+    for voter in voters:
+        choices[voter] = recorded_choice(proposal_id, voter)
+
+    return choices
+
+
+@export
+def has_voted_many(voter: str, proposal_ids: list):
+    """
+    Get one voter's current choices on several proposals
+    Args:
+        voter: Address of the voter
+        proposal_ids: IDs of the proposals to look up (at most 500)
+    Returns a dict mapping each proposal id, as a string, to the choice, or None if not voted
+    Proposals whose votes have been archived map to the archive marker, with "voted" set to
+    "unknown", unless the voter has never voted
+    """
+    assert isinstance(proposal_ids, list) and len(proposal_ids) <= 500, "Proposal ids must be a list of at most 500 ids"
+
+    choices = {}
+    for proposal_id in proposal_ids:
+        choices[str(proposal_id)] = recorded_choice(proposal_id, voter)
+
+    return choices
+
+
+def recorded_choice(proposal_id: str, voter: str, known_voter: bool = False):
+    """
+    Get a voter's choice on a proposal, or the archive marker once the voter's entry is archived
+    Archival removes the per-voter entries, so an archived choice cannot be told apart from no
+    vote by those entries alone. Callers reading the voter's history pass known_voter, and an
+    address with no history never voted; otherwise the marker's "voted" is "unknown".
+    The marker carries the archive digest to check an exported roll against, which is only
+    final once the archive is complete
+    """
+    choice = proposal_votes[proposal_id, voter]
+    if choice is not None:
+        return choice
+
+    archive = proposal_archives[proposal_id]
+    if archive is None:
+        return None
+    if known_voter:
+        voted = True
+    elif voter_history_counts[voter] == 0:
+        return None
+    else:
+        voted = "unknown"
+    return {"archived": True, "voted": voted, "digest": archive["digest"], "complete": archive["complete"]}
@@ -0,0 +1,3 @@
+"""
+Off-chain indexer for the voting contract's events
+"""
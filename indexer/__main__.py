@@ -0,0 +1,152 @@
+"""
+Command line entry point for the voting indexer
+
+Usage:
+    python -m indexer sync --events events.jsonl --db voting.sqlite [--follow]
+    python -m indexer serve --db voting.sqlite --port 8080
+    python -m indexer verify --events events.jsonl --state state.jsonl
+"""
+import argparse
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from indexer.replay import StateSnapshot, verify_stream
+from indexer.sources import JsonlEventSource
+from indexer.store import VotingIndex
+
+
+def sync(args):
+    index = VotingIndex(args.db, contract=args.contract)
+    source = JsonlEventSource(args.events)
+
+    while True:
+        applied = index.sync(args.events, source)
+        print(f"Applied {applied} events, checkpoint {index.get_checkpoint(args.events)}")
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+
+    index.close()
+
+
+def make_handler(db_path):
+    class Handler(BaseHTTPRequestHandler):
+        """Read-only JSON API: /proposals?status=&offset=&limit=, /proposals/<id>, /voters/<address>"""
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            parts = [part for part in url.path.split("/") if part]
+            index = VotingIndex(db_path)
+
+            try:
+                if parts == ["proposals"]:
+                    body = index.list_proposals(
+                        status=query.get("status"),
+                        offset=int(query.get("offset", 0)),
+                        limit=int(query.get("limit", 20))
+                    )
+                elif len(parts) == 2 and parts[0] == "proposals":
+                    body = index.get_proposal(parts[1])
+                elif len(parts) == 3 and parts[0] == "proposals" and parts[2] == "votes":
+                    body = index.get_votes(
+                        parts[1],
+                        offset=int(query.get("offset", 0)),
+                        limit=int(query.get("limit", 100))
+                    )
+                elif len(parts) == 2 and parts[0] == "voters":
+                    body = index.get_voter_history(
+                        parts[1],
+                        offset=int(query.get("offset", 0)),
+                        limit=int(query.get("limit", 20))
+                    )
+                else:
+                    body = None
+            except (AssertionError, ValueError) as e:
+                self.respond(400, {"error": str(e)})
+                return
+            finally:
+                index.close()
+
+            if body is None:
+                self.respond(404, {"error": "Not found"})
+            else:
+                self.respond(200, body)
+
+        def respond(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def serve(args):
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.db))
+    print(f"Serving {args.db} on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+def verify(args):
+    snapshot = StateSnapshot.load(args.state, voting_contract=args.contract,
+                                  include_finalized=not args.skip_finalized)
+    report = verify_stream(
+        JsonlEventSource(args.events),
+        snapshot,
+        include_finalized=not args.skip_finalized
+    )
+
+    for mismatch in report["mismatches"]:
+        print(json.dumps(mismatch))
+    for stale in report["stale"]:
+        print(json.dumps({**stale, "stale": True}), file=sys.stderr)
+    for anomaly in report["anomalies"]:
+        print(json.dumps(anomaly), file=sys.stderr)
+    print(f"Replayed {report['events']} events, verified {report['proposals_verified']} proposals, "
+          f"checked {report['proposals_checked']} against their finalization, "
+          f"{len(report['mismatches'])} mismatches, {len(report['stale'])} stale, "
+          f"{len(report['anomalies'])} anomalies", file=sys.stderr)
+
+    if report["mismatches"] or report["anomalies"]:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and verify voting contract events")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = subcommands.add_parser("sync", help="apply new events from a JSONL feed")
+    sync_parser.add_argument("--events", required=True, help="path of the JSONL event feed")
+    sync_parser.add_argument("--db", required=True, help="path of the SQLite database")
+    sync_parser.add_argument("--contract", default="con_voting",
+                             help="only index events emitted by this contract")
+    sync_parser.add_argument("--follow", action="store_true", help="keep polling the feed")
+    sync_parser.add_argument("--interval", type=float, default=2.0, help="seconds between polls")
+    sync_parser.set_defaults(func=sync)
+
+    serve_parser = subcommands.add_parser("serve", help="serve list and detail queries over HTTP")
+    serve_parser.add_argument("--db", required=True, help="path of the SQLite database")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.set_defaults(func=serve)
+
+    verify_parser = subcommands.add_parser("verify", help="replay Vote events and diff tallies against state")
+    verify_parser.add_argument("--events", required=True, help="path of the JSONL event feed")
+    verify_parser.add_argument("--state", required=True, help="path of a JSONL state dump of key/value entries")
+    verify_parser.add_argument("--contract", default="con_voting", help="name of the voting contract")
+    verify_parser.add_argument("--skip-finalized", action="store_true",
+                               help="only verify proposals still open at the end of the feed")
+    verify_parser.set_defaults(func=verify)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
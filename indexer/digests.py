@@ -0,0 +1,32 @@
+"""
+Off-chain counterparts of the commitments the voting contract keeps over its votes
+"""
+import hashlib
+
+VOTE_DIGEST_MODULUS = 2 ** 256
+
+
+def sha3(text):
+    return hashlib.sha3_256(text.encode()).hexdigest()
+
+
+def vote_digest(proposal_id, votes):
+    """
+    Return the contract's vote_digest for an iterable of (voter, choice) current votes: the sum,
+    modulo 2**256, of sha3("proposal_id:voter:choice"), as a hex string. Order does not matter.
+    """
+    digest = 0
+    for voter, choice in votes:
+        digest += int(sha3(f"{proposal_id}:{voter}:{choice}"), 16)
+    return hex(digest % VOTE_DIGEST_MODULUS)
+
+
+def archive_digest(votes):
+    """
+    Return the digest archive_votes publishes for (voter, choice) pairs in voting order: a hash
+    chain of sha3("digest:voter:choice") starting from ""
+    """
+    digest = ""
+    for voter, choice in votes:
+        digest = sha3(f"{digest}:{voter}:{choice}")
+    return digest
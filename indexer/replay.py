@@ -0,0 +1,367 @@
+"""
+Offline replay of Vote events to audit the tallies stored by the voting contract
+
+The verifier reads the event stream once, keeping only the current choice of each voter on
+proposals that are still open. Voter addresses are interned to integers, and choices are
+stored as small integer codes. When a ProposalFinalized or OptionProposalFinalized event
+arrives, that proposal's choices are checked and dropped. Memory therefore grows with the
+number of distinct voters and with the votes on open proposals, not with the length of the
+stream.
+
+The snapshot keeps the recorded weights only of proposals that will be recomputed, and currency
+balances only while some open proposal is weighted by them. Proposal records are read in a first
+pass over the dump for that purpose, so its memory grows with the voters of those proposals and
+with the number of accounts, not with every weight ever recorded.
+
+The snapshot is a JSON Lines dump of {"key": ..., "value": ...} state entries, in the same
+shape as the node's allStates query. It supplies currency balances, the proposal records and options,
+the stored proposal_metrics and vote digests, and the recorded weights of incremental,
+revalidated or snapshot proposals.
+Proposals created with a list of options are replayed against their packed counts and power per
+option, taken from the labels stored in proposal_options.
+Replayed tallies follow the contract. A voter counts only if their weight is positive. The
+weight is the recorded weight for incremental, revalidated or snapshot proposals, and the
+current balance otherwise.
+
+What is compared depends on the proposal:
+- Finalized snapshot-weighted proposals: the stored metrics against the tally replayed from their
+  recorded weights, and against the totals of the finalization event
+- Other finalized proposals: the stored metrics against the finalization event only, since the
+  balances they were weighted by are not in the snapshot. They are reported as checked rather
+  than verified, as are archived proposals, whose recorded weights have been deleted
+- Open proposals with recorded weights: the stored metrics against the replayed tally
+- Open recount proposals: their metrics are only refreshed by update_current_tallies, so
+  differences from the replayed tally are reported as stale rather than as mismatches
+The vote digest of every proposal is checked against the replayed votes.
+"""
+import json
+from decimal import Decimal
+
+from indexer.digests import vote_digest
+
+CHOICES = ["y", "n", "-"]
+CHOICE_CODES = {choice: code for code, choice in enumerate(CHOICES)}
+METRIC_FIELDS = ["total_for", "total_against", "total_abstain", "pow_for", "pow_against", "pow_abstain"]
+
+
+def state_number(value):
+    """Convert a state or event value to a Decimal, unwrapping {"__fixed__": ...}"""
+    if value is None:
+        return Decimal(0)
+    if isinstance(value, dict) and "__fixed__" in value:
+        return Decimal(str(value["__fixed__"]))
+    return Decimal(str(value))
+
+
+def finalized_metrics(event):
+    """Return the packed metrics reported by a finalization event, in the order the contract stores them"""
+    data = event["data"]
+    if event["event"] == "OptionProposalFinalized":
+        # Counts then power per option, each list joined with commas
+        return [state_number(value) for value in data["counts"].split(",") + data["power"].split(",")]
+    return [state_number(data.get(field)) for field in METRIC_FIELDS]
+
+
+def split_key(key):
+    """Split a state key such as "currency.balances:alice" into (contract, variable, [parts])"""
+    name, _, rest = key.partition(":")
+    contract, _, variable = name.partition(".")
+    return contract, variable, rest.split(":") if rest else []
+
+
+class StateSnapshot:
+    """
+    The subset of chain state the verifier needs, indexed for lookups during replay
+
+    Proposal records are read before anything else, so that only the recorded weights of
+    proposals that will be recomputed are kept, and currency balances only when an open
+    proposal is weighted by them.
+    """
+
+    def __init__(self, voting_contract="con_voting", include_finalized=True):
+        self.voting_contract = voting_contract
+        self.include_finalized = include_finalized
+        self.balances = {}
+        self.metrics = {}
+        self.legacy_metrics = {}
+        self.statuses = {}
+        self.recorded_weight_proposals = set()
+        self.snapshot_weighted = set()
+        self.archived = set()
+        self.weights = {}
+        self.vote_digests = {}
+        self.options = {}
+        self.balances_needed = None
+
+    @classmethod
+    def load(cls, path, voting_contract="con_voting", include_finalized=True):
+        snapshot = cls(voting_contract, include_finalized)
+        # The dump is sorted by key, so proposal records come after the weights they describe
+        for proposals_pass in (True, False):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if snapshot.is_proposal_entry(entry["key"]) == proposals_pass:
+                            snapshot.add(entry["key"], entry["value"])
+        return snapshot
+
+    @classmethod
+    def from_items(cls, items, voting_contract="con_voting", include_finalized=True):
+        snapshot = cls(voting_contract, include_finalized)
+        items = list(items)
+        for proposals_pass in (True, False):
+            for key, value in items:
+                if snapshot.is_proposal_entry(key) == proposals_pass:
+                    snapshot.add(key, value)
+        return snapshot
+
+    def is_proposal_entry(self, key):
+        """Return whether a state entry describes a proposal as a whole, read before the rest of the dump"""
+        contract, variable, _ = split_key(key)
+        return contract == self.voting_contract and variable in ("proposals", "proposal_archives", "proposal_options")
+
+    def add(self, key, value):
+        contract, variable, parts = split_key(key)
+
+        if contract == "currency" and variable == "balances" and len(parts) == 1:
+            if self.balances_needed is None:
+                self.balances_needed = self.needs_balances()
+            if self.balances_needed:
+                self.balances[parts[0]] = state_number(value)
+            return
+
+        if contract != self.voting_contract:
+            return
+
+        if variable == "proposal_metrics":
+            if len(parts) == 1:
+                self.metrics[int(parts[0])] = [state_number(v) for v in value]
+            elif len(parts) == 2 and parts[1] in METRIC_FIELDS:
+                self.legacy_metrics.setdefault(int(parts[0]), {})[parts[1]] = state_number(value)
+        elif variable == "proposals" and len(parts) == 1 and isinstance(value, dict):
+            proposal_id = int(parts[0])
+            self.statuses[proposal_id] = value.get("status", "active")
+            if value.get("tally_mode") in ("incremental", "revalidate") or value.get("vote_weighting") == "snapshot":
+                self.recorded_weight_proposals.add(proposal_id)
+            if value.get("vote_weighting") == "snapshot":
+                self.snapshot_weighted.add(proposal_id)
+        elif variable == "proposal_options" and len(parts) == 1 and value:
+            self.options[int(parts[0])] = list(value)
+        elif variable == "proposal_archives" and len(parts) == 1 and value is not None:
+            self.archived.add(int(parts[0]))
+        elif variable == "proposal_vote_weights" and len(parts) == 2:
+            if self.keeps_weights(int(parts[0])):
+                self.weights[int(parts[0]), parts[1]] = state_number(value)
+        elif variable == "proposal_vote_digests" and len(parts) == 1:
+            self.vote_digests[int(parts[0])] = value
+
+    def is_finalized(self, proposal_id):
+        return self.statuses.get(proposal_id) == "finalized"
+
+    def recomputes_finalized(self, proposal_id):
+        """
+        Return whether a finalized proposal's tally can be recomputed from the snapshot
+        Only snapshot-weighted proposals are finalized from their recorded weights, and archiving
+        deletes those weights
+        """
+        return (self.include_finalized and proposal_id in self.snapshot_weighted
+                and proposal_id not in self.archived)
+
+    def keeps_weights(self, proposal_id):
+        """Return whether the recorded weights of a proposal will be read during replay"""
+        if proposal_id not in self.statuses:
+            # Without its record the proposal's type is unknown
+            return True
+        if self.is_finalized(proposal_id):
+            return self.recomputes_finalized(proposal_id)
+        return proposal_id in self.recorded_weight_proposals
+
+    def needs_balances(self):
+        """Return whether some open proposal may be weighted by current balances"""
+        if not self.statuses:
+            return True
+        return any(status != "finalized" and proposal_id not in self.recorded_weight_proposals
+                   for proposal_id, status in self.statuses.items())
+
+    def choices(self, proposal_id):
+        """Return a proposal's choices, in the order the contract packs their counts and power"""
+        return self.options.get(proposal_id, CHOICES)
+
+    def metric_fields(self, proposal_id):
+        """Return the name of each packed metric, METRIC_FIELDS for yes/no proposals"""
+        if proposal_id not in self.options:
+            return METRIC_FIELDS
+        options = self.options[proposal_id]
+        return [f"count:{option}" for option in options] + [f"power:{option}" for option in options]
+
+    def stored_metrics(self, proposal_id):
+        """Return the stored metrics as a list in metric_fields order, as the contract reads them"""
+        if proposal_id in self.metrics:
+            return self.metrics[proposal_id]
+        if proposal_id in self.options:
+            return [Decimal(0)] * len(self.metric_fields(proposal_id))
+        legacy = self.legacy_metrics.get(proposal_id, {})
+        return [legacy.get(field, Decimal(0)) for field in METRIC_FIELDS]
+
+    def weight(self, proposal_id, voter):
+        if proposal_id in self.recorded_weight_proposals:
+            return self.weights.get((proposal_id, voter), Decimal(0))
+        return self.balances.get(voter, Decimal(0))
+
+
+class ReplayVerifier:
+    """Replays a stream of normalized events and collects proposals whose stored metrics differ"""
+
+    def __init__(self, snapshot, include_finalized=True):
+        self.snapshot = snapshot
+        self.include_finalized = include_finalized
+        self.voter_ids = {}
+        self.voters = []
+        self.open_choices = {}
+        self.events = 0
+        self.proposals_verified = 0
+        self.proposals_checked = 0
+        self.mismatches = []
+        self.stale = []
+        self.anomalies = []
+
+    def intern(self, voter):
+        voter_id = self.voter_ids.get(voter)
+        if voter_id is None:
+            voter_id = len(self.voters)
+            self.voter_ids[voter] = voter_id
+            self.voters.append(voter)
+        return voter_id
+
+    def feed(self, event):
+        self.events += 1
+        data = event["data"]
+
+        if event["event"] == "ProposalCreated":
+            self.open_choices.setdefault(int(data["proposal_id"]), {})
+        elif event["event"] == "Vote":
+            self.replay_vote(data)
+        elif event["event"] in ("ProposalFinalized", "OptionProposalFinalized"):
+            proposal_id = int(data["proposal_id"])
+            choices = self.open_choices.pop(proposal_id, {})
+            if self.include_finalized:
+                self.verify_finalized(proposal_id, choices, finalized_metrics(event))
+
+    def choice_code(self, proposal_id, choice):
+        if proposal_id not in self.snapshot.options:
+            return CHOICE_CODES.get(choice)
+        options = self.snapshot.options[proposal_id]
+        return options.index(choice) if choice in options else None
+
+    def replay_vote(self, data):
+        proposal_id = int(data["proposal_id"])
+        voter_id = self.intern(data["voter"])
+        choices = self.open_choices.setdefault(proposal_id, {})
+
+        code = self.choice_code(proposal_id, data["choice"])
+        if code is None:
+            self.anomalies.append({
+                "proposal_id": proposal_id,
+                "voter": data["voter"],
+                "reason": "choice is not one of the proposal's choices",
+            })
+            return
+
+        previous_code = choices.get(voter_id)
+        expected_code = self.choice_code(proposal_id, data.get("previous_choice") or "")
+        if previous_code != expected_code:
+            self.anomalies.append({
+                "proposal_id": proposal_id,
+                "voter": data["voter"],
+                "reason": "previous_choice does not match the replayed choice",
+            })
+
+        choices[voter_id] = code
+
+    def finish(self):
+        """Verify every proposal still open at the end of the stream and return the report"""
+        for proposal_id in sorted(self.open_choices):
+            self.verify(proposal_id, self.open_choices[proposal_id])
+        self.open_choices = {}
+
+        return {
+            "events": self.events,
+            "proposals_verified": self.proposals_verified,
+            "proposals_checked": self.proposals_checked,
+            "mismatches": self.mismatches,
+            "stale": self.stale,
+            "anomalies": self.anomalies,
+        }
+
+    def replay_tally(self, proposal_id, choices):
+        choice_count = len(self.snapshot.choices(proposal_id))
+        tally = [Decimal(0)] * (2 * choice_count)
+        for voter_id, code in choices.items():
+            weight = self.snapshot.weight(proposal_id, self.voters[voter_id])
+            if weight > 0:
+                tally[code] += 1
+                tally[choice_count + code] += weight
+        return tally
+
+    def verify(self, proposal_id, choices):
+        """Check an open proposal's stored metrics and vote digest against the replayed votes"""
+        self.proposals_verified += 1
+        replayed = self.replay_tally(proposal_id, choices)
+
+        # Recount proposals only store what their last update_current_tallies counted
+        if proposal_id in self.snapshot.recorded_weight_proposals:
+            differences = self.mismatches
+        else:
+            differences = self.stale
+        self.compare_metrics(proposal_id, replayed, differences)
+        self.verify_digest(proposal_id, choices)
+
+    def verify_finalized(self, proposal_id, choices, final_metrics):
+        """
+        Check a finalized proposal's stored metrics against its finalization event
+        Snapshot-weighted proposals are also recomputed from their recorded weights. Other proposals
+        were weighted by balances at finalization, which the snapshot does not hold, so they only
+        count as checked
+        """
+        if self.snapshot.recomputes_finalized(proposal_id):
+            self.proposals_verified += 1
+            self.compare_metrics(proposal_id, self.replay_tally(proposal_id, choices), self.mismatches)
+        else:
+            self.proposals_checked += 1
+        self.compare_metrics(proposal_id, final_metrics, self.mismatches)
+        self.verify_digest(proposal_id, choices)
+
+    def compare_metrics(self, proposal_id, expected, differences):
+        stored = self.snapshot.stored_metrics(proposal_id)
+        for field, stored_value, expected_value in zip(self.snapshot.metric_fields(proposal_id), stored, expected):
+            if stored_value != expected_value:
+                differences.append({
+                    "proposal_id": proposal_id,
+                    "field": field,
+                    "stored": str(stored_value),
+                    "replayed": str(expected_value),
+                })
+
+    def verify_digest(self, proposal_id, choices):
+        stored_digest = self.snapshot.vote_digests.get(proposal_id)
+        if stored_digest is not None:
+            proposal_choices = self.snapshot.choices(proposal_id)
+            votes = [(self.voters[voter_id], proposal_choices[code]) for voter_id, code in choices.items()]
+            replayed_digest = vote_digest(proposal_id, votes)
+            if stored_digest != replayed_digest:
+                self.mismatches.append({
+                    "proposal_id": proposal_id,
+                    "field": "vote_digest",
+                    "stored": stored_digest,
+                    "replayed": replayed_digest,
+                })
+
+
+def verify_stream(source, snapshot, include_finalized=True):
+    """Replay every event from the source in a single pass and return the verification report"""
+    verifier = ReplayVerifier(snapshot, include_finalized=include_finalized)
+    for _, event in source.events():
+        if event.get("contract") in (None, snapshot.voting_contract):
+            verifier.feed(event)
+    return verifier.finish()
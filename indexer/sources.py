@@ -0,0 +1,71 @@
+"""
+Event sources for the voting indexer
+
+A source yields (position, event) pairs in chain order. A position is an opaque string that
+the same source can resume after, so the indexer can checkpoint as it goes. Events are
+normalized to:
+
+    {"id": str, "contract": str, "event": str, "data": dict}
+
+where "data" merges the indexed and non-indexed parameters of the contract's LogEvent.
+"""
+import json
+
+
+def normalize_event(raw, position):
+    """Flatten a raw event record into the shape the indexer consumes"""
+    data = dict(raw.get("data_indexed") or {})
+    data.update(raw.get("data") or {})
+
+    if raw.get("id") is not None:
+        event_id = str(raw["id"])
+    elif raw.get("tx_hash") is not None:
+        event_id = f"{raw['tx_hash']}:{raw.get('event_index', 0)}"
+    else:
+        event_id = position
+
+    return {
+        "id": event_id,
+        "contract": raw.get("contract"),
+        "event": raw["event"],
+        "data": data,
+    }
+
+
+class JsonlEventSource:
+    """
+    Reads events from a JSON Lines file with one raw event per line, such as a fixture feed
+    or an export of the node's event log. The position is the byte offset after each line,
+    so resuming does not re-read the start of the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def events(self, after=None):
+        with open(self.path, "rb") as f:
+            if after is not None:
+                f.seek(int(after))
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                # A line without a newline may still be being written
+                if not line.endswith(b"\n"):
+                    break
+                position = str(f.tell())
+                if line.strip():
+                    yield position, normalize_event(json.loads(line), position)
+
+
+class IterableEventSource:
+    """Serves events from an in-memory sequence; the position is the index of the next event"""
+
+    def __init__(self, raw_events):
+        self.raw_events = list(raw_events)
+
+    def events(self, after=None):
+        start = int(after) if after is not None else 0
+        for index in range(start, len(self.raw_events)):
+            position = str(index + 1)
+            yield position, normalize_event(self.raw_events[index], position)
@@ -0,0 +1,368 @@
+"""
+SQLite materialization of the voting contract's events
+
+Tables:
+    proposals   one row per ProposalCreated, updated by ProposalFinalized
+    votes       the current choice of every voter on every proposal
+    tallies     live ballot counts per choice, plus the weighted totals once finalized
+    option_tallies  the same per option, for proposals created with a list of options, with
+                    each option's position in that list
+    archives    commitments published when a finalized proposal's votes are archived on-chain
+    events      ids of applied events, so re-applying a feed is a no-op
+    checkpoints last applied position per source
+
+Live tallies count ballots as they are cast. Voting power depends on balances at
+finalization, so the pow_* columns stay NULL until the ProposalFinalized event arrives.
+"""
+import sqlite3
+
+from indexer.digests import archive_digest, vote_digest
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proposals (
+    proposal_id INTEGER PRIMARY KEY,
+    creator TEXT NOT NULL,
+    title TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    metadata TEXT,
+    status TEXT NOT NULL DEFAULT 'active'
+);
+CREATE INDEX IF NOT EXISTS proposals_by_status ON proposals (status, proposal_id);
+
+CREATE TABLE IF NOT EXISTS votes (
+    proposal_id INTEGER NOT NULL,
+    voter TEXT NOT NULL,
+    choice TEXT NOT NULL,
+    PRIMARY KEY (proposal_id, voter)
+);
+CREATE INDEX IF NOT EXISTS votes_by_voter ON votes (voter, proposal_id);
+
+CREATE TABLE IF NOT EXISTS tallies (
+    proposal_id INTEGER PRIMARY KEY,
+    total_for INTEGER NOT NULL DEFAULT 0,
+    total_against INTEGER NOT NULL DEFAULT 0,
+    total_abstain INTEGER NOT NULL DEFAULT 0,
+    pow_for TEXT,
+    pow_against TEXT,
+    pow_abstain TEXT
+);
+
+CREATE TABLE IF NOT EXISTS option_tallies (
+    proposal_id INTEGER NOT NULL,
+    choice TEXT NOT NULL,
+    position INTEGER,
+    ballots INTEGER NOT NULL DEFAULT 0,
+    power TEXT,
+    PRIMARY KEY (proposal_id, choice)
+);
+
+CREATE TABLE IF NOT EXISTS archives (
+    proposal_id INTEGER PRIMARY KEY,
+    digest TEXT NOT NULL,
+    voter_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    source TEXT PRIMARY KEY,
+    position TEXT NOT NULL
+);
+"""
+
+# Vote choices mapped to the tally column they count towards
+CHOICE_COLUMNS = {
+    "y": "total_for",
+    "n": "total_against",
+    "-": "total_abstain",
+}
+
+POWER_FIELDS = ["pow_for", "pow_against", "pow_abstain"]
+MAX_PAGE_SIZE = 100
+
+
+def decimal_text(value):
+    """Render an event number as text, unwrapping the {"__fixed__": ...} JSON encoding of decimals"""
+    if isinstance(value, dict) and "__fixed__" in value:
+        return str(value["__fixed__"])
+    return str(value)
+
+
+class VotingIndex:
+    """Materialized view of one voting contract, backed by a SQLite database"""
+
+    def __init__(self, path=":memory:", contract=None):
+        self.contract = contract
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    # Ingestion
+
+    def get_checkpoint(self, source):
+        row = self.db.execute("SELECT position FROM checkpoints WHERE source = ?", (source,)).fetchone()
+        return row["position"] if row else None
+
+    def sync(self, source_name, source, batch_size=500):
+        """
+        Apply every event the source has after this index's checkpoint for it. Events and the
+        checkpoint are committed together every batch_size events, so an interrupted sync
+        resumes cleanly. Returns the number of events applied.
+        """
+        applied = 0
+        pending = 0
+        position = None
+
+        for position, event in source.events(after=self.get_checkpoint(source_name)):
+            if self.apply(event):
+                applied += 1
+            pending += 1
+            if pending >= batch_size:
+                self.set_checkpoint(source_name, position)
+                self.db.commit()
+                pending = 0
+
+        if pending:
+            self.set_checkpoint(source_name, position)
+            self.db.commit()
+
+        return applied
+
+    def set_checkpoint(self, source, position):
+        self.db.execute(
+            "INSERT INTO checkpoints (source, position) VALUES (?, ?) "
+            "ON CONFLICT (source) DO UPDATE SET position = excluded.position",
+            (source, position)
+        )
+
+    def apply(self, event):
+        """Apply one normalized event inside the current transaction; returns False if it was skipped"""
+        if self.contract is not None and event.get("contract") not in (None, self.contract):
+            return False
+
+        handler = {
+            "ProposalCreated": self.apply_proposal_created,
+            "Vote": self.apply_vote,
+            "ProposalFinalized": self.apply_proposal_finalized,
+            "OptionProposalFinalized": self.apply_option_proposal_finalized,
+            "VotesArchived": self.apply_votes_archived,
+        }.get(event["event"])
+
+        if handler is None:
+            return False
+
+        inserted = self.db.execute("INSERT OR IGNORE INTO events (event_id) VALUES (?)", (event["id"],))
+        if inserted.rowcount == 0:
+            return False
+
+        handler(event["data"])
+        return True
+
+    def apply_proposal_created(self, data):
+        proposal_id = int(data["proposal_id"])
+        self.db.execute(
+            "INSERT OR REPLACE INTO proposals (proposal_id, creator, title, expires_at, metadata) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (proposal_id, data["creator"], data["title"], data["expires_at"], data.get("metadata"))
+        )
+        self.db.execute("INSERT OR IGNORE INTO tallies (proposal_id) VALUES (?)", (proposal_id,))
+
+        # The contract joins the options with commas, or leaves the field empty for yes/no proposals
+        if data.get("options"):
+            for position, option in enumerate(data["options"].split(",")):
+                self.db.execute(
+                    "INSERT INTO option_tallies (proposal_id, choice, position) VALUES (?, ?, ?) "
+                    "ON CONFLICT (proposal_id, choice) DO UPDATE SET position = excluded.position",
+                    (proposal_id, option, position)
+                )
+
+    def apply_vote(self, data):
+        proposal_id = int(data["proposal_id"])
+        voter = data["voter"]
+        choice = data["choice"]
+
+        row = self.db.execute(
+            "SELECT choice FROM votes WHERE proposal_id = ? AND voter = ?", (proposal_id, voter)
+        ).fetchone()
+        previous_choice = row["choice"] if row else None
+
+        if previous_choice == choice:
+            return
+
+        self.db.execute(
+            "INSERT INTO votes (proposal_id, voter, choice) VALUES (?, ?, ?) "
+            "ON CONFLICT (proposal_id, voter) DO UPDATE SET choice = excluded.choice",
+            (proposal_id, voter, choice)
+        )
+        self.db.execute("INSERT OR IGNORE INTO tallies (proposal_id) VALUES (?)", (proposal_id,))
+
+        has_options = self.has_options(proposal_id, choice)
+        if previous_choice is not None:
+            self.adjust_ballots(proposal_id, previous_choice, -1, has_options)
+        self.adjust_ballots(proposal_id, choice, 1, has_options)
+
+    def has_options(self, proposal_id, choice):
+        """
+        Tell whether a proposal is voted on with options, from the option rows its ProposalCreated
+        event created. Events from before the event listed options only reveal it through a
+        choice that is not a yes/no choice
+        """
+        row = self.db.execute("SELECT 1 FROM option_tallies WHERE proposal_id = ? LIMIT 1", (proposal_id,)).fetchone()
+        return row is not None or choice not in CHOICE_COLUMNS
+
+    def adjust_ballots(self, proposal_id, choice, delta, has_options):
+        """Add delta to the live ballot count of a yes/no choice, or of an option if the proposal has options"""
+        if not has_options:
+            column = CHOICE_COLUMNS[choice]
+            self.db.execute(f"UPDATE tallies SET {column} = {column} + ? WHERE proposal_id = ?", (delta, proposal_id))
+        else:
+            self.db.execute(
+                "INSERT INTO option_tallies (proposal_id, choice, ballots) VALUES (?, ?, ?) "
+                "ON CONFLICT (proposal_id, choice) DO UPDATE SET ballots = ballots + excluded.ballots",
+                (proposal_id, choice, delta)
+            )
+
+    def apply_proposal_finalized(self, data):
+        proposal_id = int(data["proposal_id"])
+        self.db.execute("UPDATE proposals SET status = 'finalized' WHERE proposal_id = ?", (proposal_id,))
+        self.db.execute(
+            "INSERT OR REPLACE INTO tallies "
+            "(proposal_id, total_for, total_against, total_abstain, pow_for, pow_against, pow_abstain) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                proposal_id,
+                int(data["total_for"]),
+                int(data["total_against"]),
+                int(data["total_abstain"]),
+                decimal_text(data["pow_for"]),
+                decimal_text(data["pow_against"]),
+                decimal_text(data["pow_abstain"]),
+            )
+        )
+
+    def apply_option_proposal_finalized(self, data):
+        proposal_id = int(data["proposal_id"])
+        self.db.execute("UPDATE proposals SET status = 'finalized' WHERE proposal_id = ?", (proposal_id,))
+
+        # The contract joins each list with commas, in the order of the proposal's options
+        options = data["options"].split(",")
+        counts = data["counts"].split(",")
+        powers = data["power"].split(",")
+        for position, (option, count, power) in enumerate(zip(options, counts, powers)):
+            self.db.execute(
+                "INSERT INTO option_tallies (proposal_id, choice, position, ballots, power) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (proposal_id, choice) DO UPDATE SET "
+                "position = excluded.position, ballots = excluded.ballots, power = excluded.power",
+                (proposal_id, option, position, int(count), power)
+            )
+
+    def apply_votes_archived(self, data):
+        self.db.execute(
+            "INSERT OR REPLACE INTO archives (proposal_id, digest, voter_count) VALUES (?, ?, ?)",
+            (int(data["proposal_id"]), data["digest"], int(data["voter_count"]))
+        )
+
+    # Queries
+
+    def list_proposals(self, status=None, offset=0, limit=20):
+        """Return a page of proposals with their tallies, newest first"""
+        assert 0 < limit <= MAX_PAGE_SIZE, f"Limit must be between 1 and {MAX_PAGE_SIZE}"
+        assert offset >= 0, "Offset cannot be negative"
+
+        query = (
+            "SELECT p.*, t.total_for, t.total_against, t.total_abstain, "
+            "t.pow_for, t.pow_against, t.pow_abstain "
+            "FROM proposals p LEFT JOIN tallies t USING (proposal_id)"
+        )
+        params = []
+        if status is not None:
+            query += " WHERE p.status = ?"
+            params.append(status)
+        query += " ORDER BY p.proposal_id DESC LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        return [dict(row) for row in self.db.execute(query, params)]
+
+    def get_proposal(self, proposal_id):
+        """
+        Return one proposal with its tally and voter count, or None if it is unknown. Proposals
+        with options also get an "options" list of {"choice", "ballots", "power"} records, in the
+        order the options were given at creation
+        """
+        row = self.db.execute(
+            "SELECT p.*, t.total_for, t.total_against, t.total_abstain, "
+            "t.pow_for, t.pow_against, t.pow_abstain "
+            "FROM proposals p LEFT JOIN tallies t USING (proposal_id) WHERE p.proposal_id = ?",
+            (int(proposal_id),)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        proposal = dict(row)
+        proposal["voter_count"] = self.db.execute(
+            "SELECT COUNT(*) FROM votes WHERE proposal_id = ?", (int(proposal_id),)
+        ).fetchone()[0]
+
+        options = self.db.execute(
+            "SELECT choice, ballots, power FROM option_tallies WHERE proposal_id = ? ORDER BY position, rowid",
+            (int(proposal_id),)
+        ).fetchall()
+        if options:
+            proposal["options"] = [dict(option) for option in options]
+        return proposal
+
+    def get_votes(self, proposal_id, offset=0, limit=MAX_PAGE_SIZE):
+        """Return a page of [voter, choice] pairs for a proposal, ordered by voter"""
+        assert 0 < limit <= MAX_PAGE_SIZE, f"Limit must be between 1 and {MAX_PAGE_SIZE}"
+        rows = self.db.execute(
+            "SELECT voter, choice FROM votes WHERE proposal_id = ? ORDER BY voter LIMIT ? OFFSET ?",
+            (int(proposal_id), limit, offset)
+        )
+        return [[row["voter"], row["choice"]] for row in rows]
+
+    def get_voter_history(self, voter, offset=0, limit=20):
+        """Return a page of {"proposal_id", "choice"} records for a voter, newest proposal first"""
+        assert 0 < limit <= MAX_PAGE_SIZE, f"Limit must be between 1 and {MAX_PAGE_SIZE}"
+        rows = self.db.execute(
+            "SELECT proposal_id, choice FROM votes WHERE voter = ? "
+            "ORDER BY proposal_id DESC LIMIT ? OFFSET ?",
+            (voter, limit, offset)
+        )
+        return [dict(row) for row in rows]
+
+    def archive_commitment(self, proposal_id):
+        """
+        Recompute the contract's archive commitment from the indexed votes, in the order voters
+        first voted, which is the order rows were inserted
+        """
+        votes = self.db.execute(
+            "SELECT voter, choice FROM votes WHERE proposal_id = ? ORDER BY rowid", (int(proposal_id),)
+        ).fetchall()
+        return {"digest": archive_digest(votes), "voter_count": len(votes)}
+
+    def vote_digest(self, proposal_id):
+        """Recompute the contract's vote_digest for a proposal from the indexed votes"""
+        votes = self.db.execute("SELECT voter, choice FROM votes WHERE proposal_id = ?", (int(proposal_id),))
+        return vote_digest(int(proposal_id), votes)
+
+    def verify_archive(self, proposal_id):
+        """Compare the indexed votes with the commitment published on-chain; None if not archived"""
+        row = self.db.execute(
+            "SELECT digest, voter_count FROM archives WHERE proposal_id = ?", (int(proposal_id),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        local = self.archive_commitment(proposal_id)
+        return {
+            "chain": dict(row),
+            "local": local,
+            "matches": local["digest"] == row["digest"] and local["voter_count"] == row["voter_count"],
+        }
@@ -0,0 +1,323 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from indexer.sources import IterableEventSource, JsonlEventSource
+from indexer.store import VotingIndex
+
+CONTRACT = "con_voting"
+
+
+def created(proposal_id, creator="alice", tx_hash=None, options=()):
+    return {
+        "contract": CONTRACT,
+        "event": "ProposalCreated",
+        "tx_hash": tx_hash or f"create-{proposal_id}",
+        "event_index": 0,
+        "data_indexed": {"proposal_id": str(proposal_id), "creator": creator},
+        "data": {
+            "title": f"Proposal number {proposal_id}",
+            "expires_at": "2030-01-01 00:00:00",
+            "metadata": "{}",
+            "options": ",".join(options)
+        }
+    }
+
+
+def voted(proposal_id, voter, choice, previous_choice="", tx_hash=None):
+    return {
+        "contract": CONTRACT,
+        "event": "Vote",
+        "tx_hash": tx_hash or f"vote-{proposal_id}-{voter}-{choice}",
+        "event_index": 0,
+        "data_indexed": {"proposal_id": str(proposal_id), "voter": voter},
+        "data": {"choice": choice, "previous_choice": previous_choice}
+    }
+
+
+def finalized(proposal_id, totals, powers):
+    return {
+        "contract": CONTRACT,
+        "event": "ProposalFinalized",
+        "tx_hash": f"finalize-{proposal_id}",
+        "event_index": 0,
+        "data_indexed": {"proposal_id": str(proposal_id)},
+        "data": {
+            "total_for": totals[0],
+            "total_against": totals[1],
+            "total_abstain": totals[2],
+            "pow_for": powers[0],
+            "pow_against": powers[1],
+            "pow_abstain": powers[2]
+        }
+    }
+
+
+def option_finalized(proposal_id, options, counts, powers):
+    return {
+        "contract": CONTRACT,
+        "event": "OptionProposalFinalized",
+        "tx_hash": f"finalize-{proposal_id}",
+        "event_index": 0,
+        "data_indexed": {"proposal_id": str(proposal_id)},
+        "data": {"options": ",".join(options), "counts": ",".join(counts), "power": ",".join(powers)}
+    }
+
+
+class TestVotingIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = VotingIndex(contract=CONTRACT)
+
+    def tearDown(self):
+        self.index.close()
+
+    def test_materializes_proposals_votes_and_tallies(self):
+        # GIVEN a feed with a proposal and three votes
+        source = IterableEventSource([
+            created(1),
+            voted(1, "bob", "y"),
+            voted(1, "carol", "n"),
+            voted(1, "dave", "-"),
+        ])
+
+        # WHEN the index syncs it
+        applied = self.index.sync("feed", source)
+
+        # THEN the proposal, its tally and its votes are queryable
+        self.assertEqual(applied, 4)
+        proposal = self.index.get_proposal(1)
+        self.assertEqual(proposal["title"], "Proposal number 1")
+        self.assertEqual(proposal["status"], "active")
+        self.assertEqual(proposal["voter_count"], 3)
+        self.assertEqual((proposal["total_for"], proposal["total_against"], proposal["total_abstain"]), (1, 1, 1))
+        self.assertIsNone(proposal["pow_for"])
+        self.assertEqual(self.index.get_votes(1), [["bob", "y"], ["carol", "n"], ["dave", "-"]])
+
+    def test_vote_changes_move_the_ballot(self):
+        # GIVEN a voter who changes their vote
+        source = IterableEventSource([
+            created(1),
+            voted(1, "bob", "y"),
+            voted(1, "bob", "n", previous_choice="y"),
+        ])
+
+        # WHEN the index syncs the feed
+        self.index.sync("feed", source)
+
+        # THEN only the latest choice is counted
+        proposal = self.index.get_proposal(1)
+        self.assertEqual((proposal["total_for"], proposal["total_against"]), (0, 1))
+        self.assertEqual(self.index.get_votes(1), [["bob", "n"]])
+
+    def test_finalization_records_weighted_totals(self):
+        # GIVEN a finalized proposal whose powers are encoded decimals
+        source = IterableEventSource([
+            created(1),
+            voted(1, "bob", "y"),
+            finalized(1, (1, 0, 0), ({"__fixed__": "1000.5"}, 0, 0)),
+        ])
+
+        # WHEN the index syncs the feed
+        self.index.sync("feed", source)
+
+        # THEN the proposal is finalized with the contract's totals
+        proposal = self.index.get_proposal(1)
+        self.assertEqual(proposal["status"], "finalized")
+        self.assertEqual(proposal["pow_for"], "1000.5")
+        self.assertEqual(proposal["pow_against"], "0")
+        self.assertEqual([p["proposal_id"] for p in self.index.list_proposals(status="finalized")], [1])
+        self.assertEqual(self.index.list_proposals(status="active"), [])
+
+    def test_reapplying_events_is_idempotent(self):
+        # GIVEN events already applied from one feed
+        events = [created(1), voted(1, "bob", "y")]
+        self.index.sync("first", IterableEventSource(events))
+
+        # WHEN the same events arrive again through another feed
+        applied = self.index.sync("second", IterableEventSource(events))
+
+        # THEN nothing is counted twice
+        self.assertEqual(applied, 0)
+        self.assertEqual(self.index.get_proposal(1)["total_for"], 1)
+
+    def test_ignores_other_contracts_and_unknown_events(self):
+        # GIVEN events from another contract and an event type the index does not handle
+        other = created(2)
+        other["contract"] = "con_other"
+        unknown = {"contract": CONTRACT, "event": "Transfer", "tx_hash": "t", "data": {}}
+
+        # WHEN the index syncs them
+        applied = self.index.sync("feed", IterableEventSource([created(1), other, unknown]))
+
+        # THEN only the voting contract's proposal is indexed
+        self.assertEqual(applied, 1)
+        self.assertIsNone(self.index.get_proposal(2))
+
+    def test_list_and_history_pages(self):
+        # GIVEN several proposals voted on by the same voter
+        events = []
+        for proposal_id in range(1, 6):
+            events.append(created(proposal_id))
+            events.append(voted(proposal_id, "bob", "y"))
+        self.index.sync("feed", IterableEventSource(events))
+
+        # WHEN pages are requested
+        first_page = self.index.list_proposals(limit=2)
+        second_page = self.index.list_proposals(offset=2, limit=2)
+        history = self.index.get_voter_history("bob", limit=3)
+
+        # THEN results are ordered newest first
+        self.assertEqual([p["proposal_id"] for p in first_page], [5, 4])
+        self.assertEqual([p["proposal_id"] for p in second_page], [3, 2])
+        self.assertEqual([h["proposal_id"] for h in history], [5, 4, 3])
+
+        with self.assertRaises(AssertionError):
+            self.index.list_proposals(limit=101)
+
+    def test_verifies_archived_votes(self):
+        # GIVEN votes on a proposal, including a changed vote
+        events = [created(1), voted(1, "bob", "y"), voted(1, "carol", "n"), voted(1, "bob", "-", previous_choice="y")]
+        self.index.sync("feed", IterableEventSource(events))
+
+        # WHEN the contract publishes an archive commitment over its voter roll
+        digest = ""
+        for voter, choice in [("bob", "-"), ("carol", "n")]:
+            digest = hashlib.sha3_256(f"{digest}:{voter}:{choice}".encode()).hexdigest()
+        archived = {
+            "contract": CONTRACT,
+            "event": "VotesArchived",
+            "tx_hash": "archive-1",
+            "data_indexed": {"proposal_id": "1"},
+            "data": {"digest": digest, "voter_count": 2}
+        }
+        self.index.sync("archive", IterableEventSource([archived]))
+
+        # THEN the indexed votes match it in voting order
+        self.assertTrue(self.index.verify_archive(1)["matches"])
+        self.assertIsNone(self.index.verify_archive(2))
+
+        # AND a missing vote is detected
+        self.index.db.execute("DELETE FROM votes WHERE voter = 'carol'")
+        self.assertFalse(self.index.verify_archive(1)["matches"])
+
+    def test_vote_digest_matches_final_votes(self):
+        # GIVEN votes on a proposal, including a changed vote
+        self.index.sync("feed", IterableEventSource([
+            created(1), voted(1, "bob", "y"), voted(1, "carol", "n"), voted(1, "bob", "-", previous_choice="y"),
+        ]))
+
+        # WHEN the digest is recomputed from the index
+        digest = self.index.vote_digest(1)
+
+        # THEN it is the modular sum of the sha3 of every current proposal:voter:choice
+        expected = sum(
+            int(hashlib.sha3_256(f"1:{voter}:{choice}".encode()).hexdigest(), 16)
+            for voter, choice in [("carol", "n"), ("bob", "-")]
+        ) % 2 ** 256
+        self.assertEqual(digest, hex(expected))
+        self.assertEqual(self.index.vote_digest(2), "0x0")
+
+    def test_option_proposals_tally_per_option(self):
+        # GIVEN an option proposal, listed with its options before any vote
+        self.index.sync("create", IterableEventSource([created(1, options=["red", "green", "blue"])]))
+        self.assertEqual([(o["choice"], o["ballots"]) for o in self.index.get_proposal(1)["options"]],
+                         [("red", 0), ("green", 0), ("blue", 0)])
+
+        # AND votes on its options, including a changed vote
+        self.index.sync("feed", IterableEventSource([
+            voted(1, "bob", "red"),
+            voted(1, "carol", "blue"),
+            voted(1, "bob", "green", previous_choice="red"),
+        ]))
+
+        # WHEN the proposal is read before finalization
+        proposal = self.index.get_proposal(1)
+
+        # THEN live ballots are counted per option, in the order the options were given
+        self.assertEqual(
+            [(o["choice"], o["ballots"]) for o in proposal["options"]],
+            [("red", 0), ("green", 1), ("blue", 1)]
+        )
+
+        # AND finalization records the contract's counts and power per option
+        self.index.sync("finalize", IterableEventSource([
+            option_finalized(1, ["red", "green", "blue"], ["0", "1", "1"], ["0", "100", "20.5"]),
+        ]))
+        proposal = self.index.get_proposal(1)
+        self.assertEqual(proposal["status"], "finalized")
+        self.assertEqual(
+            {o["choice"]: (o["ballots"], o["power"]) for o in proposal["options"]},
+            {"red": (0, "0"), "green": (1, "100"), "blue": (1, "20.5")}
+        )
+        self.assertEqual(proposal["total_for"], 0)
+
+
+    def test_option_labels_matching_yes_no_choices(self):
+        # GIVEN an option proposal with an option named like a yes/no choice
+        self.index.sync("feed", IterableEventSource([
+            created(1, options=["y", "maybe"]),
+            voted(1, "bob", "y"),
+            voted(1, "carol", "maybe"),
+            voted(1, "carol", "y", previous_choice="maybe"),
+        ]))
+
+        # WHEN the proposal is read
+        proposal = self.index.get_proposal(1)
+
+        # THEN ballots are counted on the options, not on the yes/no tally
+        self.assertEqual([(o["choice"], o["ballots"]) for o in proposal["options"]], [("y", 2), ("maybe", 0)])
+        self.assertEqual(proposal["total_for"], 0)
+
+
+class TestJsonlResume(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.feed_path = os.path.join(self.tmp.name, "events.jsonl")
+        self.db_path = os.path.join(self.tmp.name, "voting.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def append(self, *raw_events):
+        with open(self.feed_path, "a") as f:
+            for raw_event in raw_events:
+                f.write(json.dumps(raw_event) + "\n")
+
+    def test_resumes_from_checkpoint(self):
+        # GIVEN a feed that has been synced into a database
+        self.append(created(1), voted(1, "bob", "y"))
+        index = VotingIndex(self.db_path, contract=CONTRACT)
+        self.assertEqual(index.sync("feed", JsonlEventSource(self.feed_path)), 2)
+        index.close()
+
+        # WHEN more events are appended and a fresh process syncs again
+        self.append(voted(1, "carol", "y"))
+        index = VotingIndex(self.db_path, contract=CONTRACT)
+        applied = index.sync("feed", JsonlEventSource(self.feed_path))
+
+        # THEN only the new event is read and applied
+        self.assertEqual(applied, 1)
+        self.assertEqual(index.get_proposal(1)["total_for"], 2)
+        self.assertEqual(index.get_checkpoint("feed"), str(os.path.getsize(self.feed_path)))
+        index.close()
+
+    def test_partial_line_is_left_for_the_next_sync(self):
+        # GIVEN a feed whose last line is still being written
+        self.append(created(1))
+        with open(self.feed_path, "a") as f:
+            f.write(json.dumps(voted(1, "bob", "y"))[:10])
+
+        # WHEN it is synced
+        index = VotingIndex(self.db_path, contract=CONTRACT)
+        applied = index.sync("feed", JsonlEventSource(self.feed_path))
+
+        # THEN the incomplete line is not consumed
+        self.assertEqual(applied, 1)
+        self.assertEqual(index.get_proposal(1)["voter_count"], 0)
+        index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
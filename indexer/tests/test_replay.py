@@ -0,0 +1,258 @@
+import unittest
+
+from indexer.digests import vote_digest
+from indexer.replay import StateSnapshot, verify_stream
+from indexer.sources import IterableEventSource
+from indexer.tests.test_indexer import created, finalized, option_finalized, voted
+
+
+def snapshot(metrics, balances, proposals=None, weights=None, legacy=False, options=None):
+    items = [(f"currency.balances:{voter}", amount) for voter, amount in balances.items()]
+    for proposal_id, record in (proposals or {}).items():
+        items.append((f"con_voting.proposals:{proposal_id}", record))
+    for proposal_id, labels in (options or {}).items():
+        items.append((f"con_voting.proposal_options:{proposal_id}", labels))
+    for (proposal_id, voter), weight in (weights or {}).items():
+        items.append((f"con_voting.proposal_vote_weights:{proposal_id}:{voter}", weight))
+    for proposal_id, packed in metrics.items():
+        if legacy:
+            fields = ["total_for", "total_against", "total_abstain", "pow_for", "pow_against", "pow_abstain"]
+            for field, value in zip(fields, packed):
+                items.append((f"con_voting.proposal_metrics:{proposal_id}:{field}", value))
+        else:
+            items.append((f"con_voting.proposal_metrics:{proposal_id}", packed))
+    return StateSnapshot.from_items(items)
+
+
+class TestReplayVerifier(unittest.TestCase):
+    def test_matching_metrics_report_no_mismatches(self):
+        # GIVEN stored metrics that agree with the votes and balances
+        events = [created(1), voted(1, "bob", "y"), voted(1, "carol", "n"), voted(1, "dave", "-")]
+        state = snapshot({1: [1, 1, 1, 100, 200, {"__fixed__": "0.5"}]},
+                         {"bob": 100, "carol": 200, "dave": {"__fixed__": "0.5"}})
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN nothing is reported
+        self.assertEqual(report["events"], 4)
+        self.assertEqual(report["proposals_verified"], 1)
+        self.assertEqual(report["mismatches"], [])
+        self.assertEqual(report["anomalies"], [])
+
+    def test_vote_changes_and_zero_balances_follow_the_contract(self):
+        # GIVEN a changed vote and a voter who no longer holds tokens
+        events = [
+            created(1),
+            voted(1, "bob", "y"),
+            voted(1, "bob", "n", previous_choice="y"),
+            voted(1, "carol", "y"),
+        ]
+        state = snapshot({1: [0, 1, 0, 0, 100, 0]}, {"bob": 100, "carol": 0})
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the stored metrics match
+        self.assertEqual(report["mismatches"], [])
+
+    def test_reports_stale_metrics(self):
+        # GIVEN recount metrics that were not refreshed after a vote
+        events = [created(1), voted(1, "bob", "y"), voted(1, "carol", "y")]
+        state = snapshot({1: [1, 0, 0, 100, 0, 0]}, {"bob": 100, "carol": 50})
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the differing fields are reported as stale rather than as mismatches
+        self.assertEqual(report["stale"], [
+            {"proposal_id": 1, "field": "total_for", "stored": "1", "replayed": "2"},
+            {"proposal_id": 1, "field": "pow_for", "stored": "100", "replayed": "150"},
+        ])
+        self.assertEqual(report["mismatches"], [])
+
+    def test_reports_wrong_incremental_metrics(self):
+        # GIVEN incremental metrics that disagree with the recorded weights
+        events = [created(1), voted(1, "bob", "y"), voted(1, "carol", "y")]
+        state = snapshot(
+            {1: [1, 0, 0, 100, 0, 0]},
+            {"bob": 100, "carol": 50},
+            proposals={1: {"tally_mode": "incremental", "vote_weighting": "finalization"}},
+            weights={(1, "bob"): 100, (1, "carol"): 50}
+        )
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the differing fields are reported as mismatches
+        self.assertEqual([m["field"] for m in report["mismatches"]], ["total_for", "pow_for"])
+        self.assertEqual(report["stale"], [])
+
+    def test_recorded_weights_and_legacy_metrics(self):
+        # GIVEN a snapshot-weighted proposal with per-field metrics
+        events = [created(1), voted(1, "bob", "y")]
+        state = snapshot(
+            {1: [1, 0, 0, 40, 0, 0]},
+            {"bob": 100},
+            proposals={1: {"vote_weighting": "snapshot", "tally_mode": "recount"}},
+            weights={(1, "bob"): 40},
+            legacy=True
+        )
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the recorded weight is used instead of the current balance
+        self.assertEqual(report["mismatches"], [])
+
+    def test_finalized_proposals_are_released_or_skipped(self):
+        # GIVEN a finalized proposal and a finalized option proposal whose voters' balances have since changed
+        events = [
+            created(1),
+            voted(1, "bob", "y"),
+            finalized(1, (1, 0, 0), (100, 0, 0)),
+            created(2),
+            created(3, options=["red", "blue"]),
+            voted(3, "bob", "blue"),
+            option_finalized(3, ["red", "blue"], ["0", "1"], ["0", "100"]),
+        ]
+        state = snapshot({1: [1, 0, 0, 100, 0, 0], 2: [0, 0, 0, 0, 0, 0], 3: [0, 1, 0, 100]}, {"bob": 80},
+                         proposals={3: {"tally_mode": "recount", "option_count": 2}}, options={3: ["red", "blue"]})
+
+        # WHEN the stream is replayed with and without finalized proposals
+        full = verify_stream(IterableEventSource(events), state)
+        open_only = verify_stream(IterableEventSource(events), state, include_finalized=False)
+
+        # THEN finalized proposals are checked against their finalization events, not current balances
+        self.assertEqual(full["proposals_verified"], 1)
+        self.assertEqual(full["proposals_checked"], 2)
+        self.assertEqual(full["mismatches"], [])
+        self.assertEqual(full["stale"], [])
+
+        # AND without finalized proposals only the open one is verified
+        self.assertEqual(open_only["proposals_verified"], 1)
+        self.assertEqual(open_only["proposals_checked"], 0)
+        self.assertEqual(open_only["mismatches"], [])
+        self.assertEqual(open_only["stale"], [])
+
+        # AND stored metrics that differ from the event are reported
+        state.add("con_voting.proposal_metrics:1", [1, 0, 0, 80, 0, 0])
+        full = verify_stream(IterableEventSource(events), state)
+        self.assertEqual(full["mismatches"], [{"proposal_id": 1, "field": "pow_for", "stored": "80", "replayed": "100"}])
+
+    def test_recomputes_finalized_snapshot_proposals(self):
+        # GIVEN a finalized snapshot-weighted proposal whose stored metrics and event agree, but not with the recorded weights
+        events = [
+            created(1),
+            voted(1, "bob", "y"),
+            voted(1, "carol", "n"),
+            finalized(1, (1, 1, 0), (100, 50, 0)),
+        ]
+        state = snapshot({1: [1, 1, 0, 100, 50, 0]}, {"bob": 10, "carol": 10},
+                         proposals={1: {"status": "finalized", "vote_weighting": "snapshot", "tally_mode": "recount"}},
+                         weights={(1, "bob"): 100, (1, "carol"): 40})
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the proposal is recomputed from its recorded weights and the difference is a mismatch
+        self.assertEqual(report["proposals_verified"], 1)
+        self.assertEqual(report["proposals_checked"], 0)
+        self.assertEqual(report["mismatches"],
+                         [{"proposal_id": 1, "field": "pow_against", "stored": "50", "replayed": "40"}])
+
+        # AND an archived proposal, whose weights are gone, is only checked against its event
+        state = StateSnapshot.from_items([
+            ("con_voting.proposal_archives:1", {"complete": True, "digest": "abc", "voter_count": 2}),
+            ("con_voting.proposal_metrics:1", [1, 1, 0, 100, 50, 0]),
+            ("con_voting.proposals:1", {"status": "finalized", "vote_weighting": "snapshot", "tally_mode": "recount"}),
+        ])
+        report = verify_stream(IterableEventSource(events), state)
+        self.assertEqual(report["proposals_checked"], 1)
+        self.assertEqual(report["mismatches"], [])
+
+    def test_keeps_only_weights_and_balances_that_are_read(self):
+        # GIVEN a sorted dump where weights come before the proposal records, with one open incremental proposal,
+        # a finalized incremental proposal and a finalized snapshot proposal
+        items = [
+            ("con_voting.proposal_vote_weights:1:bob", 10),
+            ("con_voting.proposal_vote_weights:2:bob", 20),
+            ("con_voting.proposal_vote_weights:3:bob", 30),
+            ("con_voting.proposals:1", {"status": "active", "tally_mode": "incremental", "vote_weighting": "finalization"}),
+            ("con_voting.proposals:2", {"status": "finalized", "tally_mode": "incremental", "vote_weighting": "finalization"}),
+            ("con_voting.proposals:3", {"status": "finalized", "tally_mode": "recount", "vote_weighting": "snapshot"}),
+            ("currency.balances:bob", 100),
+        ]
+
+        # WHEN the snapshot is built with and without finalized proposals
+        full = StateSnapshot.from_items(items)
+        open_only = StateSnapshot.from_items(items, include_finalized=False)
+
+        # THEN only the weights that will be recomputed are kept, and no balances since no open proposal reads them
+        self.assertEqual(sorted(full.weights), [(1, "bob"), (3, "bob")])
+        self.assertEqual(sorted(open_only.weights), [(1, "bob")])
+        self.assertEqual(full.balances, {})
+
+        # AND balances are kept once an open proposal is weighted by them
+        recount = StateSnapshot.from_items(items + [("con_voting.proposals:4", {"status": "active", "tally_mode": "recount"})])
+        self.assertEqual(recount.balances, {"bob": 100})
+
+    def test_flags_inconsistent_previous_choice(self):
+        # GIVEN a vote whose previous_choice disagrees with the replayed stream
+        events = [created(1), voted(1, "bob", "y"), voted(1, "bob", "-", previous_choice="n")]
+        state = snapshot({1: [0, 0, 1, 0, 0, 10]}, {"bob": 10})
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the anomaly is reported and the latest choice still wins
+        self.assertEqual(len(report["anomalies"]), 1)
+        self.assertEqual(report["anomalies"][0]["voter"], "bob")
+        self.assertEqual(report["mismatches"], [])
+
+    def test_checks_vote_digests(self):
+        # GIVEN a snapshot with the digest of the final votes, reached through a vote change
+        events = [created(1), voted(1, "bob", "y"), voted(1, "carol", "n"), voted(1, "bob", "-", previous_choice="y")]
+        state = snapshot({1: [0, 1, 1, 0, 20, 10]}, {"bob": 10, "carol": 20})
+        state.add("con_voting.proposal_vote_digests:1", vote_digest(1, [("carol", "n"), ("bob", "-")]))
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the digest matches regardless of voting order
+        self.assertEqual(report["mismatches"], [])
+
+        # AND a digest over different votes is reported
+        state.add("con_voting.proposal_vote_digests:1", vote_digest(1, [("carol", "n"), ("bob", "y")]))
+        report = verify_stream(IterableEventSource(events), state)
+        self.assertEqual([m["field"] for m in report["mismatches"]], ["vote_digest"])
+
+    def test_option_proposals_replay_per_option(self):
+        # GIVEN an option proposal whose packed metrics hold counts, then power, per option
+        events = [
+            created(1),
+            voted(1, "bob", "red"),
+            voted(1, "carol", "blue"),
+            voted(1, "bob", "green", previous_choice="red"),
+        ]
+        options = ["red", "green", "blue"]
+        state = snapshot({1: [0, 1, 1, 0, 100, 20]}, {"bob": 100, "carol": 20},
+                         proposals={1: {"tally_mode": "recount", "option_count": 3}}, options={1: options})
+        state.add("con_voting.proposal_vote_digests:1", vote_digest(1, [("bob", "green"), ("carol", "blue")]))
+
+        # WHEN the stream is replayed
+        report = verify_stream(IterableEventSource(events), state)
+
+        # THEN the metrics and the digest match
+        self.assertEqual(report["mismatches"], [])
+        self.assertEqual(report["anomalies"], [])
+
+        # AND a stale option is reported by name, and a vote for an unknown option is flagged
+        state.add("con_voting.proposal_metrics:1", [0, 1, 1, 0, 90, 20])
+        report = verify_stream(IterableEventSource(events + [voted(1, "dave", "purple")]), state)
+        self.assertEqual([m["field"] for m in report["stale"]], ["power:green"])
+        self.assertEqual([a["voter"] for a in report["anomalies"]], ["dave"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,6 @@
 import { formatDateTime } from "../utils";
-import { getAllProposalsQuery, getAllProposalMetricsQuery, getProposalQuery, getProposalMetricsQuery, hasVotedQuery } from "./queries";
+import { getAllProposalsQuery, getAllProposalMetricsQuery, getAllProposalOptionsQuery, getProposalQuery, getProposalDetailsQuery, getProposalMetricsQuery, getProposalOptionsQuery, hasVotedQuery } from "./queries";
+import { VOTING_CONTRACT_NAME } from "../config";
 import { TransactionBuilder, type I_NetworkSettings, type I_TxInfo } from "xian-js"
 
 const graphql_endpoint = 'https://node.xian.org/graphql'
@@ -39,15 +40,55 @@ export function formatProposal(nodes: any) {
 }
 
 export async function getAllProposals() {
-    const query = getAllProposalsQuery();
-    const response = await fetchValues(query);
-    return formatProposal(response);
+    const [response, options] = await Promise.all([
+        fetchValues(getAllProposalsQuery()),
+        fetchValues(getAllProposalOptionsQuery()),
+    ]);
+    // Option labels are only stored for proposals created with options
+    const optionsById: Record<string, string[]> = {};
+    for (const node of options || []) {
+        optionsById[node.key.split(":")[1]] = node.value;
+    }
+    return formatProposal(response).map((proposal: any) => ({
+        ...proposal,
+        ...(optionsById[proposal.id] ? { options: optionsById[proposal.id] } : {})
+    }));
+}
+
+export async function getProposalDetails(ids: string[]) {
+    // Newer contracts keep the description and metadata apart from the proposal record.
+    // They are fetched per proposal, so the list only loads them for the proposals it shows
+    const responses = await Promise.all(ids.map((id) => fetchValues(getProposalDetailsQuery(id))));
+    const detailsById: Record<string, any> = {};
+    ids.forEach((id, i) => {
+        const detailsNode = (responses[i] || []).find(
+            (node: any) => node.key === `${VOTING_CONTRACT_NAME}.proposal_details:${id}`
+        );
+        if (detailsNode) {
+            detailsById[id] = detailsNode.value;
+        }
+    });
+    return detailsById;
 }
 
 export async function getProposal(id: string) {
-    const query = getProposalQuery(id);
-    const response = await fetchValues(query);
-    return formatProposal(response);
+    const [response, details, options] = await Promise.all([
+        fetchValues(getProposalQuery(id)),
+        fetchValues(getProposalDetailsQuery(id)),
+        fetchValues(getProposalOptionsQuery(id)),
+    ]);
+    // Newer contracts keep the description and metadata apart from the proposal record
+    const detailsNode = (details || []).find(
+        (node: any) => node.key === `${VOTING_CONTRACT_NAME}.proposal_details:${id}`
+    );
+    const optionsNode = (options || []).find(
+        (node: any) => node.key === `${VOTING_CONTRACT_NAME}.proposal_options:${id}`
+    );
+    return formatProposal(response).map((proposal: any) => ({
+        ...proposal,
+        ...(detailsNode ? detailsNode.value : {}),
+        ...(optionsNode ? { options: optionsNode.value } : {})
+    }));
 }
 
 export async function getAllProposalMetrics() {
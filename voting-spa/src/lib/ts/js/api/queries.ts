@@ -36,6 +36,57 @@ export const getProposalQuery = (id: string) => {
     `;
 };
 
+export const getProposalDetailsQuery = (id: string) => {
+  return `
+    query GetProposalDetails {
+        allStates(
+          filter: {
+            key: { startsWith: "${VOTING_CONTRACT_NAME}.proposal_details:${id}"}
+          }
+        ) {
+          nodes {
+            key
+            value
+          }
+        }
+      }
+    `;
+};
+
+export const getProposalOptionsQuery = (id: string) => {
+  return `
+    query GetProposalOptions {
+        allStates(
+          filter: {
+            key: { startsWith: "${VOTING_CONTRACT_NAME}.proposal_options:${id}"}
+          }
+        ) {
+          nodes {
+            key
+            value
+          }
+        }
+      }
+    `;
+};
+
+export const getAllProposalOptionsQuery = () => {
+  return `
+    query GetProposalOptions {
+        allStates(
+          filter: {
+            key: { startsWith: "${VOTING_CONTRACT_NAME}.proposal_options"}
+          }
+        ) {
+          nodes {
+            key
+            value
+          }
+        }
+      }
+    `;
+};
+
 export const getAllProposalMetricsQuery = (offset = 0, take = 10) => {
   return `
     query GetProposals {
@@ -142,6 +142,33 @@ export function truncateHtml(html: string, maxLength: number): string {
     return tempDiv.innerHTML;
 }
 
+/**
+ * Order of the values in a packed proposal_metrics record
+ */
+const PACKED_METRIC_KEYS = [
+    "total_for",
+    "total_against",
+    "total_abstain",
+    "pow_for",
+    "pow_against",
+    "pow_abstain",
+];
+
+/**
+ * Maps the packed metrics of an option proposal to its labels: the first half of the record
+ * holds the ballot count of each option and the second half its power, in the order of the options
+ * @param options - Option labels of the proposal
+ * @param packed - Packed proposal_metrics record
+ * @returns Array of { label, count, power } objects in option order
+ */
+function optionMetrics(options: string[], packed: any[]): any[] {
+    return options.map((label, i) => ({
+        label,
+        count: Number(packed[i] || 0),
+        power: Number(packed[options.length + i] || 0),
+    }));
+}
+
 /**
  * Processes proposal metrics data and returns formatted proposal data
  * @param proposals - Array of proposal objects
@@ -156,7 +183,17 @@ export function processProposalMetrics(proposals: any[], metrics: any[]): any[]
         );
         acc[proposal.id].metrics = proposal_metrics.reduce((acc, metric) => {
             const metric_key = metric.key.split(":")[2];
-            acc[metric_key] = metric.value;
+            if (metric_key === undefined && Array.isArray(metric.value) && Array.isArray(proposal.options)) {
+                // Option proposals pack a count then a power per option
+                acc.options = optionMetrics(proposal.options, metric.value);
+            } else if (metric_key === undefined && Array.isArray(metric.value)) {
+                // Packed record holding every count and power in one entry
+                PACKED_METRIC_KEYS.forEach((key, i) => {
+                    acc[key] = metric.value[i];
+                });
+            } else {
+                acc[metric_key] = metric.value;
+            }
             return acc;
         }, {});
         return acc;
@@ -177,6 +214,12 @@ export function processProposalMetrics(proposals: any[], metrics: any[]): any[]
         //     };
         // }
         
+        if (proposal.metrics.options) {
+            proposal.metrics.total_votes = proposal.metrics.options.reduce((sum: number, option: any) => sum + option.count, 0);
+            proposal.metrics.pow_total = proposal.metrics.options.reduce((sum: number, option: any) => sum + option.power, 0);
+            continue;
+        }
+
         proposal.metrics.total_votes =
             Number(proposal.metrics.total_for) +
             Number(proposal.metrics.total_against) +